@@ -3,11 +3,20 @@ import re
 import os
 from pathlib import Path
 
+# Shared NC helpers live in the MLPS application next to this script
+MLPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'MLPS')
+if not os.path.isfile(os.path.join(MLPS_DIR, 'utils', 'tool_segments.py')):
+    print(f"MLPS folder not found next to this script: {MLPS_DIR}")
+    sys.exit(1)
+sys.path.insert(0, MLPS_DIR)
+from utils.tool_segments import ToolSegmentTracker
+
 # Version 2.1 4/21/2024 B.Sihler- added Stock Dimensions from BLK FORM.
 # Version 2.2 4/21/2024 B.Sihler- CUTTER COMP reading.
 # Version 2.3 8/2/2024 B.Sihler- Added Preset Values, Saved Tool List File With The NC Program.
 # Version 2.4 10/16/2024 - Added F value check for values exceeding 80000.
 # Version 2.5 10/16/2024 - Removed F_ERRORS file, using console output and exit codes instead.
+# Version 2.6 10/16/2026 - CUTTER COMP found in one pass with the MLPS tool segment tracker.
 
 # Get the input file name from command line arguments
 if len(sys.argv) != 3:
@@ -27,10 +36,6 @@ preset_values = []
 current_tool_number = None
 f_value_errors = []  # List to store F value errors
 
-# Function to check if a tool call is real
-def is_real_tool_call(line):
-    return bool(re.search(r'TOOL CALL (\d+)', line))
-
 # Function to check F values
 def check_f_value(line, line_number):
     f_matches = re.findall(r'F(\d+(?:\.\d*)?)', line)
@@ -43,26 +48,19 @@ def check_f_value(line, line_number):
             pass
     return None
 
+# Tracks cutter comp indicators between real TOOL CALLs in a single pass
+tool_segments = ToolSegmentTracker()
+
 # Read the input file for TOOL CALL, BLK FORM lines, cutter comp indicators, and F values
 with open(input_file_path1, 'r', encoding='utf-8', errors='ignore') as file:
     lines = file.readlines()
 
 # Process lines to capture TOOL CALLs, cutter comp indicators, Q339 values, and check F values
 for i, line in enumerate(lines, 1):
-    if is_real_tool_call(line):
-        current_tool_number = re.search(r'TOOL CALL (\d+)', line).group(1)
+    current_tool_number = tool_segments.feed(i, line)
+    if current_tool_number:
         tool_numbers.append(current_tool_number)
         
-        # Initialize cutter comp as off
-        cutter_comp_info[current_tool_number] = 'Cutter Comp: Off'
-        
-        # Search for RR and RL between the current and next real TOOL CALL
-        for subsequent_line in lines[i:]:
-            if is_real_tool_call(subsequent_line):
-                break
-            if ' RR' in subsequent_line or ' RL' in subsequent_line:
-                cutter_comp_info[current_tool_number] = 'Cutter Comp: On'
-        
     blk_form_match = re.search(r'BLK FORM \d+\.?\d* (?:Z )?X([-+]?\d+\.?\d*) Y([-+]?\d+\.?\d*) Z([-+]?\d+\.?\d*)', line)
     if blk_form_match:
         blk_form_data.append(blk_form_match.groups())
@@ -77,6 +75,10 @@ for i, line in enumerate(lines, 1):
     if f_error:
         f_value_errors.append(f_error)
 
+# Cutter comp is On if RR or RL appears between a TOOL CALL and the next one
+for segment in tool_segments.finish():
+    cutter_comp_info[segment.tool_number] = 'Cutter Comp: On' if segment.compensated else 'Cutter Comp: Off'
+
 # Assuming we always get two BLK FORM lines, calculate the rectangle dimensions
 if len(blk_form_data) == 2:
     x1, y1, z1 = float(blk_form_data[0][0]), float(blk_form_data[0][1]), float(blk_form_data[0][2])
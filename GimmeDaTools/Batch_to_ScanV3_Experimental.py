@@ -3,7 +3,16 @@ import re
 import os
 from pathlib import Path
 
+# Shared NC helpers live in the MLPS application next to this script
+MLPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'MLPS')
+if not os.path.isfile(os.path.join(MLPS_DIR, 'utils', 'tool_segments.py')):
+    print(f"MLPS folder not found next to this script: {MLPS_DIR}")
+    sys.exit(1)
+sys.path.insert(0, MLPS_DIR)
+from utils.tool_segments import ToolSegmentTracker
+
 # Version 3.3 - Fix: Parse spindle/feedrate from TOOL CALL line itself
+# Version 3.4 - Cutter comp, spindle and feedrate found in one pass with the MLPS tool segment tracker
 
 if len(sys.argv) != 3:
     print("Usage: script.py <input_file_path> <machine_name>")
@@ -22,37 +31,15 @@ tool_diameters = {}
 tool_flutes = {}
 tool_params = {}
 
-def is_real_tool_call(line):
-    return bool(re.search(r'TOOL CALL (\d+)', line))
+tool_segments = ToolSegmentTracker()
 
 with open(input_file_path1, 'r', encoding='utf-8', errors='ignore') as file:
     lines = file.readlines()
 
-for i, line in enumerate(lines):
-    if is_real_tool_call(line):
-        current_tool_number = re.search(r'TOOL CALL (\d+)', line).group(1)
+for i, line in enumerate(lines, 1):
+    current_tool_number = tool_segments.feed(i, line)
+    if current_tool_number:
         tool_numbers.append(current_tool_number)
-        spindle_speed = None
-        feedrate = None
-        cutter_comp_info[current_tool_number] = 'Cutter Comp: Off'
-
-        lines_to_scan = [line] + lines[i+1:]
-        for subsequent_line in lines_to_scan:
-            if subsequent_line != line and is_real_tool_call(subsequent_line):
-                break
-            if ' RR' in subsequent_line or ' RL' in subsequent_line:
-                cutter_comp_info[current_tool_number] = 'Cutter Comp: On'
-            s_match = re.search(r'S(\d+)', subsequent_line)
-            f_match = re.search(r'F(\d+\.?\d*)', subsequent_line)
-            if s_match and spindle_speed is None:
-                spindle_speed = int(s_match.group(1))
-            if f_match and feedrate is None:
-                try:
-                    feedrate = float(f_match.group(1))
-                except ValueError:
-                    feedrate = None
-
-        tool_params[current_tool_number] = {'spindle': spindle_speed, 'feedrate': feedrate}
 
     blk_form_match = re.search(r'BLK FORM \d+\.?\d* (?:Z )?X([-+]?\d+\.?\d*) Y([-+]?\d+\.?\d*) Z([-+]?\d+\.?\d*)', line)
     if blk_form_match:
@@ -62,6 +49,11 @@ for i, line in enumerate(lines):
     if q339_match:
         preset_values.append(f'Preset - {q339_match.group(1)}')
 
+# Cutter comp, spindle speed and feedrate of each tool come from the segment of its last call
+for segment in tool_segments.finish():
+    cutter_comp_info[segment.tool_number] = 'Cutter Comp: On' if segment.compensated else 'Cutter Comp: Off'
+    tool_params[segment.tool_number] = {'spindle': segment.spindle_speed, 'feedrate': segment.feedrate}
+
 if len(blk_form_data) == 2:
     x1, y1, z1 = map(float, blk_form_data[0])
     x2, y2, z2 = map(float, blk_form_data[1])
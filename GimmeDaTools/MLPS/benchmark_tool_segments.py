@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tool Segment Benchmark
+Regression benchmark for the single-pass tool segment tracker on a 500k-line program.
+
+Compares ToolSegmentTracker against the previous per-TOOL CALL rescan used by
+AnalysisService and the batch scripts: both must find the same cutter comp,
+spindle speed and feedrate per tool, and the tracker must stay linear.
+"""
+
+import os
+import re
+import sys
+import tempfile
+import time
+
+# Add the MLPS directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.tool_segments import ToolSegmentTracker
+
+PROGRAM_LINES = 500_000
+TOOL_CALLS = 2_000
+
+# Seconds allowed per 100k lines before the benchmark fails
+MAX_SECONDS_PER_100K_LINES = 1.0
+
+
+def write_program(file_path, line_count=PROGRAM_LINES, tool_calls=TOOL_CALLS):
+    """Write a synthetic Heidenhain program with evenly spaced tool calls."""
+    segment_lines = line_count // tool_calls
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for line_num in range(line_count):
+            segment, offset = divmod(line_num, segment_lines)
+            tool = segment % 40 + 1
+            if offset == 0:
+                f.write(f"{line_num} TOOL CALL {tool} Z S{8000 + tool * 100}\n")
+            elif offset == 1:
+                f.write(f"{line_num} ; T{tool} SEM_06.35_P15-120_L19O25_0.00AL3\n")
+            elif offset == 2:
+                # Every third segment uses cutter compensation
+                comp = ' RL' if segment % 3 == 0 else ' R0'
+                f.write(f"{line_num} L X+{offset % 90}.5 Y-{offset % 70}.25{comp} F{1000 + tool} M3\n")
+            else:
+                f.write(f"{line_num} L X+{offset % 90}.5 Y-{offset % 70}.25 Z-{offset % 5}.1\n")
+
+
+def legacy_tool_params(lines):
+    """The previous rescan: every TOOL CALL scans forward to the next one."""
+    cutter_comp_info = {}
+    tool_params = {}
+    for i, line in enumerate(lines):
+        tool_match = re.search(r'TOOL CALL (\d+)', line)
+        if not tool_match:
+            continue
+        tool_number = tool_match.group(1)
+        spindle_speed = None
+        feedrate = None
+        cutter_comp_info[tool_number] = 'Cutter Comp: Off'
+        for subsequent_line in [line] + lines[i + 1:]:
+            if subsequent_line is not line and re.search(r'TOOL CALL (\d+)', subsequent_line):
+                break
+            if subsequent_line is not line and (' RR' in subsequent_line or ' RL' in subsequent_line):
+                cutter_comp_info[tool_number] = 'Cutter Comp: On'
+            s_match = re.search(r'S(\d+)', subsequent_line)
+            f_match = re.search(r'F(\d+\.?\d*)', subsequent_line)
+            if s_match and spindle_speed is None:
+                spindle_speed = int(s_match.group(1))
+            if f_match and feedrate is None:
+                feedrate = float(f_match.group(1))
+        tool_params[tool_number] = {'spindle': spindle_speed, 'feedrate': feedrate}
+    return cutter_comp_info, tool_params
+
+
+def tracker_tool_params(lines):
+    """The single pass with ToolSegmentTracker."""
+    tracker = ToolSegmentTracker()
+    for line_num, line in enumerate(lines, 1):
+        tracker.feed(line_num, line)
+    cutter_comp_info = {}
+    tool_params = {}
+    for segment in tracker.finish():
+        cutter_comp_info[segment.tool_number] = 'Cutter Comp: On' if segment.compensated else 'Cutter Comp: Off'
+        tool_params[segment.tool_number] = {'spindle': segment.spindle_speed, 'feedrate': segment.feedrate}
+    return cutter_comp_info, tool_params
+
+
+def main():
+    """Run the benchmark, returning a process exit code."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, 'benchmark.h')
+        write_program(file_path)
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            lines = f.readlines()
+
+    print(f"Program: {len(lines)} lines, {TOOL_CALLS} tool calls")
+
+    start = time.perf_counter()
+    expected = legacy_tool_params(lines)
+    legacy_seconds = time.perf_counter() - start
+    print(f"Legacy rescan:      {legacy_seconds:.2f}s")
+
+    start = time.perf_counter()
+    result = tracker_tool_params(lines)
+    tracker_seconds = time.perf_counter() - start
+    print(f"Tool segment pass:  {tracker_seconds:.2f}s ({legacy_seconds / tracker_seconds:.1f}x)")
+
+    if result != expected:
+        print("❌ Tool segment results differ from the legacy rescan")
+        return 1
+
+    budget = MAX_SECONDS_PER_100K_LINES * len(lines) / 100_000
+    if tracker_seconds > budget:
+        print(f"❌ Tool segment pass took longer than {budget:.1f}s")
+        return 1
+
+    print("✅ Tool segment results match and stay within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -75,4 +75,5 @@ class AnalysisTabModule(TabModuleInterface):
     def shutdown(self) -> None:
         """Shutdown the module and release resources"""
         logger.info("Shutting down analysis tab module")
-        # No specific shutdown needed for analysis tab
\ No newline at end of file
+        if self.analysis_tab:
+            self.analysis_tab.shutdown()
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+NC Program model for NC Tool Analyzer
+Everything the analyzers read from an NC file, collected in one pass
+"""
+from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ToolCall:
+    """A TOOL CALL line"""
+    line: int
+    tool_number: str
+    in_comment: bool = False  # The call appears inside a comment line
+
+
+@dataclass
+class CommentLine:
+    """A comment line (; ( * REM //) with the tool called before it"""
+    line: int
+    text: str
+    current_tool: Optional[str] = None
+
+
+@dataclass
+class FeedValue:
+    """An F word"""
+    line: int
+    value: float
+    text: str
+
+
+@dataclass
+class ProgramBlock:
+    """
+    A non-comment line that calls a tool, moves, sets a feed or dwells
+
+    Coordinates are the first X/Y/Z words of the line (None if absent),
+    feed is its first F word and tool is the tool active after the line.
+    """
+    line: int
+    tool: Optional[str] = None
+    tool_call: Optional[str] = None
+    x: Optional[float] = None
+    y: Optional[float] = None
+    z: Optional[float] = None
+    feed: Optional[float] = None
+    rapid: bool = False
+    cutting: bool = False
+    dwell: Optional[float] = None
+
+    @property
+    def has_coordinates(self) -> bool:
+        """Check if the line has any X/Y/Z word"""
+        return self.x is not None or self.y is not None or self.z is not None
+
+
+@dataclass
+class ToolSegment:
+    """
+    A TOOL CALL line and the lines up to the next one
+
+    compensated tells whether a line after the call uses RR/RL; spindle_speed
+    and feedrate are the first S and F words from the call line on.
+    """
+    tool_number: str
+    start_line: int
+    end_line: int
+    compensated: bool = False
+    spindle_speed: Optional[int] = None
+    feedrate: Optional[float] = None
+
+
+@dataclass
+class NCProgram:
+    """
+    Represents an NC file as read by the analyzers
+
+    Built once per file by NCProgramParser and shared by the analysis
+    service, tool comment parser, material removal and cycle time calculators.
+    """
+    file_path: str
+    line_count: int = 0
+    tool_calls: List[ToolCall] = field(default_factory=list)
+    comments: List[CommentLine] = field(default_factory=list)
+    blk_forms: List[Dict[str, float]] = field(default_factory=list)
+    preset_values: List[float] = field(default_factory=list)
+    feed_values: List[FeedValue] = field(default_factory=list)
+    blocks: List[ProgramBlock] = field(default_factory=list)
+    tool_segments: List[ToolSegment] = field(default_factory=list)
+
+    @property
+    def tool_numbers(self) -> List[str]:
+        """
+        Get the called tool numbers in order of first call
+
+        Returns:
+            List of tool numbers
+        """
+        seen = {}
+        for call in self.tool_calls:
+            seen.setdefault(call.tool_number, None)
+        return list(seen)
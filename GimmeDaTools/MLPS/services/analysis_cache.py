@@ -0,0 +1,161 @@
+"""
+Analysis Cache for NC Tool Analyzer
+Persists NC analysis results keyed by file content hash
+"""
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+from models.analysis_result import AnalysisResult
+from services.nc_program_parser import PARSER_VERSION
+from utils.file_utils import ensure_directory_exists
+
+
+# Number of analyses kept; the least recently used are dropped beyond it
+MAX_CACHED_ANALYSES = 5000
+
+# The cache file is compacted once it holds this many lines per kept record (and at least COMPACT_MIN_LINES)
+COMPACT_RATIO = 2
+COMPACT_MIN_LINES = 100
+
+
+@dataclass
+class CachedAnalysis:
+    """An analysis result and the machine tool table version it was checked against"""
+    result: AnalysisResult
+    tool_table_version: Optional[str] = None
+
+
+class AnalysisCache:
+    """
+    JSON-lines store of NC analysis results
+
+    Each line holds one {"hash": ..., "parser_version": ..., "tool_table_version": ...,
+    "result": ...} record, keyed by content hash and parser version: records
+    of another PARSER_VERSION are dropped. Records are appended as files are
+    analyzed; a later record for the same hash replaces an earlier one. At
+    most max_entries records are kept, the least recently used are dropped
+    first, and the file is rewritten without replaced or dropped records
+    when it is loaded or once it grows past the compaction threshold.
+    """
+    def __init__(self, cache_path: str = "analysis_cache.jsonl", max_entries: int = MAX_CACHED_ANALYSES):
+        """
+        Initialize the analysis cache
+
+        Args:
+            cache_path: Path to the JSON-lines cache file
+            max_entries: Number of analyses kept
+        """
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self._records: Dict[str, Dict[str, Any]] = {}  # Least recently used first
+        self._line_count = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """Load cached results from the cache file"""
+        records = {}
+        line_count = 0
+        if os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line_count += 1
+                        try:
+                            record = json.loads(line)
+                            if record.get('parser_version') != PARSER_VERSION:
+                                continue  # Analyzed by another parser version
+                            records.pop(record['hash'], None)
+                            records[record['hash']] = record
+                        except (ValueError, KeyError, TypeError, AttributeError):
+                            continue  # Skip lines cut short by an interrupted write
+            except Exception as e:
+                print(f"Error loading analysis cache {self.cache_path}: {e}")
+
+        with self._lock:
+            self._records = records
+            self._line_count = line_count
+            self._evict()
+            if self._line_count > len(records):
+                self._rewrite()
+
+    def get(self, content_hash: str) -> Optional[CachedAnalysis]:
+        """
+        Get a cached analysis result
+
+        Args:
+            content_hash: SHA-256 hash of the NC file contents
+
+        Returns:
+            CachedAnalysis with a new AnalysisResult, or None if the hash has not been analyzed
+        """
+        with self._lock:
+            record = self._records.pop(content_hash, None)
+            if not record:
+                return None
+            self._records[content_hash] = record
+        return CachedAnalysis(result=AnalysisResult.from_dict(record['result']),
+                              tool_table_version=record.get('tool_table_version'))
+
+    def put(self, content_hash: str, analysis_result: AnalysisResult,
+            tool_table_version: Optional[str] = None) -> None:
+        """
+        Store an analysis result
+
+        Args:
+            content_hash: SHA-256 hash of the NC file contents
+            analysis_result: Result of analyzing the file
+            tool_table_version: Machine tool table version its compatibility was checked against
+        """
+        record = {
+            'hash': content_hash,
+            'parser_version': PARSER_VERSION,
+            'tool_table_version': tool_table_version,
+            'result': analysis_result.to_dict()
+        }
+        with self._lock:
+            self._records.pop(content_hash, None)
+            self._records[content_hash] = record
+            self._evict()
+            try:
+                ensure_directory_exists(self.cache_path)
+                with open(self.cache_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + '\n')
+                self._line_count += 1
+            except Exception as e:
+                print(f"Error saving analysis cache {self.cache_path}: {e}")
+            if self._line_count > max(COMPACT_RATIO * len(self._records), COMPACT_MIN_LINES):
+                self._rewrite()
+
+    def clear(self) -> None:
+        """Remove all cached results"""
+        with self._lock:
+            self._records.clear()
+            self._line_count = 0
+            if os.path.exists(self.cache_path):
+                os.remove(self.cache_path)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    def _evict(self) -> None:
+        """Drop the least recently used records beyond max_entries (caller holds the lock)"""
+        while len(self._records) > self.max_entries:
+            del self._records[next(iter(self._records))]
+
+    def _rewrite(self) -> None:
+        """Rewrite the cache file with one record per kept hash, least recently used first (caller holds the lock)"""
+        temp_path = self.cache_path + '.tmp'
+        try:
+            ensure_directory_exists(self.cache_path)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for record in self._records.values():
+                    f.write(json.dumps(record) + '\n')
+            os.replace(temp_path, self.cache_path)
+            self._line_count = len(self._records)
+        except Exception as e:
+            print(f"Error compacting analysis cache {self.cache_path}: {e}")
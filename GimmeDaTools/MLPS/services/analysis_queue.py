@@ -0,0 +1,253 @@
+"""
+Analysis Queue for NC Tool Analyzer
+Analyzes many NC files at once on a process pool
+"""
+import heapq
+import itertools
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional
+
+from models.analysis_result import AnalysisResult
+from services.analysis_service import AnalysisService
+from utils.event_system import event_system
+from utils.file_utils import file_content_hash
+
+
+# Queued analysis states
+PENDING = "Pending"
+RUNNING = "Running"
+DONE = "Done"
+CACHED = "Cached"
+FAILED = "Failed"
+CANCELLED = "Cancelled"
+
+
+def _parse_nc_file_task(file_path: str) -> Dict[str, Any]:
+    """Parse one NC file in a worker process (returns a picklable dict)"""
+    return AnalysisService.parse_nc_file(file_path).to_dict()
+
+
+@dataclass
+class QueuedAnalysis:
+    """An NC file waiting for, undergoing or finished with analysis"""
+    file_path: str
+    priority: int = 0
+    status: str = PENDING
+    content_hash: Optional[str] = None
+    result: Optional[AnalysisResult] = None
+    error: Optional[str] = None
+    sequence: int = 0  # Submission order, breaks priority ties
+
+    @property
+    def file_name(self) -> str:
+        """Get the NC file name"""
+        return os.path.basename(self.file_path)
+
+    @property
+    def is_finished(self) -> bool:
+        """Check if the analysis will not change any more"""
+        return self.status in (DONE, CACHED, FAILED, CANCELLED)
+
+
+class AnalysisQueue:
+    """
+    Priority queue of NC files parsed on a process pool
+
+    Files are dispatched highest priority first (then in submission order)
+    and only as many are handed to the pool as it has workers, so priorities
+    and cancellations still apply to everything not yet running. Files whose
+    contents were analyzed before are taken from the analysis service's
+    result cache instead.
+
+    Every status change is published as an "analysis_queue_updated" event
+    with the QueuedAnalysis; events come from background threads.
+    """
+    def __init__(self, analysis_service, max_workers: Optional[int] = None):
+        """
+        Initialize the analysis queue
+
+        Args:
+            analysis_service: AnalysisService used for machine compatibility and cached results
+            max_workers: Number of worker processes (None = CPU count)
+        """
+        self.analysis_service = analysis_service
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.download_info: Optional[str] = None
+
+        self._items: Dict[str, QueuedAnalysis] = {}
+        self._heap: List[tuple] = []  # (-priority, sequence, file_path)
+        self._running: Dict[str, Any] = {}  # file_path -> Future
+        self._sequence = itertools.count()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.RLock()
+
+    def submit(self, file_path: str, priority: int = 0) -> QueuedAnalysis:
+        """
+        Queue an NC file for analysis
+
+        Hashes the file first, so call this off the UI thread.
+
+        Args:
+            file_path: Path to the NC file
+            priority: Higher priorities are analyzed first
+
+        Returns:
+            The QueuedAnalysis tracking the file
+        """
+        file_path = os.path.abspath(file_path)
+        with self._lock:
+            item = self._items.get(file_path)
+            if item and not item.is_finished:
+                return item
+            item = QueuedAnalysis(file_path=file_path, priority=priority, sequence=next(self._sequence))
+            self._items[file_path] = item
+
+        try:
+            item.content_hash = file_content_hash(file_path)
+        except Exception as e:
+            self._finish(item, FAILED, error=str(e))
+            return item
+
+        cached = self.analysis_service.get_cached_analysis(item.content_hash, item.file_name, self.download_info)
+        if cached:
+            self._finish(item, CACHED, result=cached)
+            return item
+
+        with self._lock:
+            if item.status != PENDING:
+                return item  # Cancelled while hashing
+            heapq.heappush(self._heap, (-item.priority, item.sequence, file_path))
+        self._publish(item)
+        self._dispatch()
+        return item
+
+    def prioritize(self, file_path: str, priority: int) -> bool:
+        """
+        Change the priority of a pending file
+
+        Args:
+            file_path: Path to the NC file
+            priority: New priority
+
+        Returns:
+            True if the file was still pending
+        """
+        with self._lock:
+            item = self._items.get(os.path.abspath(file_path))
+            if not item or item.status != PENDING:
+                return False
+            # The old heap entry no longer matches the item and is skipped when popped
+            item.priority = priority
+            item.sequence = next(self._sequence)
+            heapq.heappush(self._heap, (-item.priority, item.sequence, item.file_path))
+        self._publish(item)
+        return True
+
+    def cancel(self, file_path: str) -> bool:
+        """
+        Cancel the analysis of a file
+
+        A file already running in a worker process is left to finish there,
+        but its result is discarded.
+
+        Args:
+            file_path: Path to the NC file
+
+        Returns:
+            True if the file was pending or running
+        """
+        with self._lock:
+            item = self._items.get(os.path.abspath(file_path))
+            if not item or item.is_finished:
+                return False
+            future = self._running.pop(item.file_path, None)
+            if future:
+                future.cancel()
+        self._finish(item, CANCELLED)
+        self._dispatch()
+        return True
+
+    def cancel_all(self) -> int:
+        """
+        Cancel every pending and running file
+
+        Returns:
+            Number of files cancelled
+        """
+        with self._lock:
+            file_paths = [path for path, item in self._items.items() if not item.is_finished]
+        return sum(1 for path in file_paths if self.cancel(path))
+
+    def get_items(self) -> List[QueuedAnalysis]:
+        """
+        Get all files in the queue
+
+        Returns:
+            List of QueuedAnalysis in submission order
+        """
+        with self._lock:
+            return list(self._items.values())
+
+    def clear_finished(self) -> None:
+        """Forget files whose analysis is finished"""
+        with self._lock:
+            self._items = {path: item for path, item in self._items.items() if not item.is_finished}
+
+    def shutdown(self) -> None:
+        """Cancel everything and stop the worker processes"""
+        self.cancel_all()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _dispatch(self) -> None:
+        """Hand the highest priority pending files to free workers"""
+        with self._lock:
+            while self._heap and len(self._running) < self.max_workers:
+                _, sequence, file_path = heapq.heappop(self._heap)
+                item = self._items.get(file_path)
+                if not item or item.status != PENDING or item.sequence != sequence:
+                    continue  # Cancelled, re-prioritized or resubmitted
+
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                item.status = RUNNING
+                future = self._executor.submit(_parse_nc_file_task, file_path)
+                self._running[file_path] = future
+                future.add_done_callback(lambda f, item=item: self._task_done(item, f))
+                self._publish(item)
+
+    def _task_done(self, item: QueuedAnalysis, future) -> None:
+        """Collect the result of a worker process"""
+        with self._lock:
+            if self._running.get(item.file_path) is not future:
+                return  # Cancelled while running
+            del self._running[item.file_path]
+
+        try:
+            result = self.analysis_service.add_machine_compatibility(
+                AnalysisResult.from_dict(future.result()), self.download_info)
+            self.analysis_service.store_analysis(item.content_hash, result)
+            self._finish(item, DONE, result=result)
+        except Exception as e:
+            self._finish(item, FAILED, error=str(e))
+        self._dispatch()
+
+    def _finish(self, item: QueuedAnalysis, status: str, result: Optional[AnalysisResult] = None,
+                error: Optional[str] = None) -> None:
+        """Record the outcome of a file and notify listeners"""
+        with self._lock:
+            if item.is_finished:
+                return
+            item.status = status
+            item.result = result
+            item.error = error
+        self._publish(item)
+
+    def _publish(self, item: QueuedAnalysis) -> None:
+        """Notify listeners of a status change"""
+        event_system.publish("analysis_queue_updated", item)
@@ -3,27 +3,31 @@ Analysis Service for NC Tool Analyzer
 Handles NC file analysis and machine compatibility checks
 """
 import os
-import re
 from typing import Dict, List, Any, Optional, Tuple
 
 from models.machine import Machine
 from models.analysis_result import AnalysisResult, FValueError, StockDimensions, MachineCompatibility
 from utils.event_system import event_system
+from utils.file_utils import file_content_hash
+from services.nc_program_parser import nc_program_cache
+from services.analysis_cache import AnalysisCache
 
 
 class AnalysisService:
     """
     Service for analyzing NC files and checking machine compatibility
     """
-    def __init__(self, machine_service):
+    def __init__(self, machine_service, cache_path: str = "analysis_cache.jsonl"):
         """
         Initialize the analysis service
         
         Args:
             machine_service: MachineService instance for accessing machine data
+            cache_path: Path to the persistent analysis result cache
         """
         self.machine_service = machine_service
         self.current_analysis: Optional[AnalysisResult] = None
+        self.analysis_cache = AnalysisCache(cache_path)
         
     def analyze_nc_file(self, file_path: str, refresh_tools: bool = False) -> AnalysisResult:
         """
@@ -47,29 +51,97 @@ class AnalysisService:
         else:
             download_info = "Using existing tool data (not refreshed)"
         
-        # Parse NC file
-        file_name = os.path.basename(file_path)
-        tool_numbers, cutter_comp_info, preset_values, f_value_errors, dimensions = self._parse_nc_file(file_path)
+        # Reuse the stored result of identical file contents, else parse and analyze
+        content_hash = file_content_hash(file_path)
+        analysis_result = self.get_cached_analysis(content_hash, os.path.basename(file_path), download_info)
+        if analysis_result is None:
+            analysis_result = self.add_machine_compatibility(self.parse_nc_file(file_path), download_info)
+            self.store_analysis(content_hash, analysis_result)
+        self.current_analysis = analysis_result
         
-        # Analyze machine compatibility
-        machine_analysis = self._analyze_machine_compatibility(tool_numbers)
+        # Notify listeners that analysis is complete
+        event_system.publish("analysis_complete", self.current_analysis)
+        
+        return self.current_analysis
+    
+    @staticmethod
+    def parse_nc_file(file_path: str) -> AnalysisResult:
+        """
+        Parse an NC file into an analysis result without machine compatibility
         
-        # Create analysis result
-        self.current_analysis = AnalysisResult(
-            file_name=file_name,
+        Needs no machine data, so it can run in a worker process.
+        
+        Args:
+            file_path: Path to the NC file to parse
+            
+        Returns:
+            AnalysisResult with an empty machine analysis
+        """
+        tool_numbers, cutter_comp_info, preset_values, f_value_errors, dimensions = AnalysisService._parse_nc_file(file_path)
+        
+        return AnalysisResult(
+            file_name=os.path.basename(file_path),
             tool_numbers=tool_numbers,
             cutter_comp_info=cutter_comp_info,
             preset_values=preset_values,
             f_value_errors=f_value_errors,
-            dimensions=dimensions,
-            machine_analysis=machine_analysis,
-            download_info=download_info
+            dimensions=dimensions
         )
+    
+    def add_machine_compatibility(self, analysis_result: AnalysisResult, download_info: str = None) -> AnalysisResult:
+        """
+        Fill in the machine compatibility of a parsed NC file
         
-        # Notify listeners that analysis is complete
-        event_system.publish("analysis_complete", self.current_analysis)
+        Args:
+            analysis_result: Result of parse_nc_file
+            download_info: Information about tool data download
+            
+        Returns:
+            The same AnalysisResult, updated
+        """
+        analysis_result.machine_analysis = self._analyze_machine_compatibility(analysis_result.tool_numbers)
+        analysis_result.download_info = download_info
+        return analysis_result
+    
+    def get_cached_analysis(self, content_hash: str, file_name: str, download_info: str = None) -> Optional[AnalysisResult]:
+        """
+        Get the stored analysis of an NC file's contents
         
-        return self.current_analysis
+        The parsed part is served as stored. Machine compatibility is only
+        recomputed (and stored again) when the machine tool tables changed
+        since the result was stored.
+        
+        Args:
+            content_hash: SHA-256 hash of the NC file contents
+            file_name: Name of the NC file
+            download_info: Information about tool data download
+            
+        Returns:
+            AnalysisResult or None if the contents were never analyzed
+        """
+        cached = self.analysis_cache.get(content_hash)
+        if cached is None:
+            return None
+        
+        analysis_result = cached.result
+        analysis_result.file_name = file_name
+        tool_table_version = self.machine_service.get_tool_table_version()
+        if cached.tool_table_version != tool_table_version:
+            self.add_machine_compatibility(analysis_result, download_info)
+            self.analysis_cache.put(content_hash, analysis_result, tool_table_version)
+        else:
+            analysis_result.download_info = download_info
+        return analysis_result
+    
+    def store_analysis(self, content_hash: str, analysis_result: AnalysisResult) -> None:
+        """
+        Store the analysis of an NC file's contents
+        
+        Args:
+            content_hash: SHA-256 hash of the NC file contents
+            analysis_result: Result with machine compatibility for the current tool tables
+        """
+        self.analysis_cache.put(content_hash, analysis_result, self.machine_service.get_tool_table_version())
     
     def _refresh_all_machines(self) -> Tuple[int, int]:
         """
@@ -89,7 +161,8 @@ class AnalysisService:
                 
         return success_count, total_count
     
-    def _parse_nc_file(self, file_path: str) -> Tuple[List[str], Dict[str, str], List[float], List[FValueError], Optional[StockDimensions]]:
+    @staticmethod
+    def _parse_nc_file(file_path: str) -> Tuple[List[str], Dict[str, str], List[float], List[FValueError], Optional[StockDimensions]]:
         """
         Parse an NC file for tool calls, cutter compensation, preset values, F-value errors, and stock dimensions
         
@@ -99,64 +172,23 @@ class AnalysisService:
         Returns:
             Tuple of (tool_numbers, cutter_comp_info, preset_values, f_value_errors, dimensions)
         """
-        tool_numbers = []
+        program = nc_program_cache.get(file_path)
+        
+        tool_numbers = program.tool_numbers
+        for tool_number in tool_numbers:
+            print(f"NC File - Found tool call: {tool_number}")
+        
+        # Cutter comp of a tool is taken from the segment of its last call
         cutter_comp_info = {}
-        preset_values = []
-        f_value_errors = []
-        blk_form_data = []
-        
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-        
-        current_tool_number = None
-        
-        for i, line in enumerate(lines, 1):
-            # Check for TOOL CALL
-            tool_call_match = re.search(r'TOOL CALL (\d+)', line)
-            if tool_call_match:
-                current_tool_number = tool_call_match.group(1)
-                if current_tool_number not in tool_numbers:
-                    tool_numbers.append(current_tool_number)
-                    print(f"NC File - Found tool call: {current_tool_number}")
-                
-                # Initialize cutter comp as off
-                cutter_comp_info[current_tool_number] = 'Cutter Comp: Off'
-                
-                # Look for RR/RL in subsequent lines
-                for subsequent_line in lines[i:]:
-                    if re.search(r'TOOL CALL (\d+)', subsequent_line):
-                        break
-                    if ' RR' in subsequent_line or ' RL' in subsequent_line:
-                        cutter_comp_info[current_tool_number] = 'Cutter Comp: On'
-                        break
-            
-            # Check for BLK FORM
-            blk_form_match = re.search(r'BLK FORM \d+\.?\d* (?:Z )?X([-+]?\d+\.?\d*) Y([-+]?\d+\.?\d*) Z([-+]?\d+\.?\d*)', line)
-            if blk_form_match:
-                blk_form_data.append({
-                    'x': float(blk_form_match.group(1)),
-                    'y': float(blk_form_match.group(2)),
-                    'z': float(blk_form_match.group(3))
-                })
-            
-            # Check for Q339 (preset values)
-            q339_match = re.search(r'Q339=([-+]?\d+\.?\d*)', line)
-            if q339_match:
-                preset_values.append(float(q339_match.group(1)))
-            
-            # Check F values
-            f_matches = re.findall(r'F(\d+(?:\.\d*)?)', line)
-            for f_value_str in f_matches:
-                try:
-                    f_value = float(f_value_str)
-                    if f_value > 80000:
-                        f_value_errors.append(FValueError(
-                            line=i,
-                            value=f_value,
-                            text=line.strip()
-                        ))
-                except ValueError:
-                    pass
+        for segment in program.tool_segments:
+            cutter_comp_info[segment.tool_number] = 'Cutter Comp: On' if segment.compensated else 'Cutter Comp: Off'
+        
+        preset_values = list(program.preset_values)
+        blk_form_data = program.blk_forms
+        f_value_errors = [
+            FValueError(line=feed.line, value=feed.value, text=feed.text)
+            for feed in program.feed_values if feed.value > 80000
+        ]
         
         # Calculate stock dimensions
         dimensions = None
@@ -184,36 +216,14 @@ class AnalysisService:
         machine_analysis = []
         machines = self.machine_service.get_all_machines()
         
-        for machine_id, machine in machines.items():
+        # Split the required tools for all machines at once using the precompiled tool index
+        tool_matches = self.machine_service.get_tool_index().match(tool_numbers)
+        
+        for machine_id, (matching_tools, missing_tools, locked_required_tools) in tool_matches.items():
+            machine = machines[machine_id]
             physical_tools = machine.physical_tools
             locked_tools = machine.locked_tools
             
-            # Check each required tool individually
-            matching_tools = []
-            missing_tools = []
-            locked_required_tools = []
-            
-            for tool in tool_numbers:
-                if tool in physical_tools:
-                    matching_tools.append(tool)
-                elif tool in locked_tools:
-                    locked_required_tools.append(tool)
-                else:
-                    # Check if it exists as different type (string vs int)
-                    str_tool = str(tool)
-                    int_tool = int(tool) if str(tool).isdigit() else None
-                    
-                    if str_tool in physical_tools:
-                        matching_tools.append(tool)
-                    elif int_tool and int_tool in physical_tools:
-                        matching_tools.append(tool)
-                    elif str_tool in locked_tools:
-                        locked_required_tools.append(tool)
-                    elif int_tool and int_tool in locked_tools:
-                        locked_required_tools.append(tool)
-                    else:
-                        missing_tools.append(tool)
-            
             # Calculate match percentage
             match_percentage = (len(matching_tools) / len(tool_numbers) * 100) if tool_numbers else 0
             
@@ -8,6 +8,7 @@ from typing import Dict, List, Tuple, Any, Optional
 from pathlib import Path
 
 from models.machine import Machine
+from services.machine_tool_index import MachineToolIndex
 from utils.event_system import event_system
 from utils.file_utils import load_json_file, save_json_file
 
@@ -25,6 +26,7 @@ class MachineService:
         """
         self.database_path = database_path
         self.machines: Dict[str, Machine] = {}
+        self.tool_index = MachineToolIndex(self.machines)
         self.load_database()
         
     def load_database(self) -> None:
@@ -37,6 +39,7 @@ class MachineService:
         self.machines = {}
         for machine_id, machine_data in data.items():
             self.machines[machine_id] = Machine.from_dict(machine_data)
+        self.rebuild_tool_index()
             
         # Notify listeners that machines were loaded
         event_system.publish("machines_loaded", self.machines)
@@ -45,6 +48,9 @@ class MachineService:
         """
         Save the machine database to the JSON file
         """
+        # Every change to the machines is saved, so keep the tool index in step here
+        self.rebuild_tool_index()
+        
         # Convert Machine objects to dictionaries
         data = {}
         for machine_id, machine in self.machines.items():
@@ -65,6 +71,48 @@ class MachineService:
         """
         return self.machines
     
+    def rebuild_tool_index(self) -> None:
+        """
+        Precompile the machines' tool lists into the tool index
+        
+        Called on load and save; call it directly after changing machine
+        tools without saving.
+        """
+        self.tool_index = MachineToolIndex(self.machines)
+    
+    def get_tool_index(self) -> MachineToolIndex:
+        """
+        Get the precompiled tool index of all machines
+        
+        Returns:
+            MachineToolIndex for the current machines
+        """
+        return self.tool_index
+    
+    def get_tool_table_version(self) -> str:
+        """
+        Get a version string of the machines' tool tables
+        
+        The version changes whenever a machine is added or removed or its
+        tool lists or other details shown in compatibility results change.
+        
+        Returns:
+            Hex digest of the machine tool data
+        """
+        return self.tool_index.version
+    
+    def find_machines_with_tool(self, tool_number: str) -> List[str]:
+        """
+        Find the machines that have a tool available
+        
+        Args:
+            tool_number: Tool number to look up
+            
+        Returns:
+            List of machine IDs
+        """
+        return self.tool_index.machines_with_tool(tool_number)
+    
     def get_machine(self, machine_id: str) -> Optional[Machine]:
         """
         Get a specific machine by ID
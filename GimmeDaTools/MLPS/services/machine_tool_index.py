@@ -0,0 +1,115 @@
+"""
+Machine Tool Index for NC Tool Analyzer
+Precompiled tool inventories of all machines for fast compatibility matching
+"""
+import hashlib
+import json
+from typing import Dict, List, Any, Tuple
+
+from models.machine import Machine
+
+
+class MachineToolIndex:
+    """
+    Reverse index from tool number to the machines holding it
+
+    Every machine gets one bit; for each tool number the index keeps an
+    integer bitset of the machines listing it as physical and as locked.
+    Matching a program against the fleet is then a few bitwise operations
+    per required tool instead of list scans on every machine.
+
+    Tool lists may hold strings or integers, so both keys are indexed as
+    they appear, just as the list lookups they replace compared them.
+    """
+    def __init__(self, machines: Dict[str, Machine]):
+        """
+        Build the index from the current machines
+
+        Args:
+            machines: Dictionary of machine_id to Machine objects
+        """
+        self.machine_ids: List[str] = list(machines)
+        self.physical: Dict[Any, int] = {}
+        self.locked: Dict[Any, int] = {}
+
+        for bit, machine in enumerate(machines.values()):
+            mask = 1 << bit
+            for tool in machine.physical_tools:
+                self.physical[tool] = self.physical.get(tool, 0) | mask
+            for tool in machine.locked_tools:
+                self.locked[tool] = self.locked.get(tool, 0) | mask
+
+        # Version of everything a compatibility result depends on
+        tool_tables = [
+            [machine_id, machine.name, machine.machine_type, machine.location,
+             machine.physical_tools, machine.locked_tools, machine.last_updated]
+            for machine_id, machine in machines.items()
+        ]
+        self.version = hashlib.sha1(json.dumps(tool_tables, default=str).encode('utf-8')).hexdigest()
+
+    def tool_masks(self, tool: str) -> Tuple[int, int]:
+        """
+        Get the machines that have a tool and the machines that have it locked
+
+        A machine counts as having the tool if it lists the tool number
+        itself, or its integer value without also listing the number as
+        locked; otherwise it counts as locked if either form is locked.
+
+        Args:
+            tool: Tool number from the NC file
+
+        Returns:
+            Tuple of (matching machines bitset, locked machines bitset)
+        """
+        tool = str(tool)
+        int_tool = int(tool) if tool.isdigit() else None
+
+        str_physical = self.physical.get(tool, 0)
+        str_locked = self.locked.get(tool, 0)
+        int_physical = self.physical.get(int_tool, 0) if int_tool else 0
+        int_locked = self.locked.get(int_tool, 0) if int_tool else 0
+
+        matching = str_physical | (int_physical & ~str_locked)
+        locked = (str_locked | int_locked) & ~matching
+        return matching, locked
+
+    def machines_with_tool(self, tool: str) -> List[str]:
+        """
+        Get the machines that have a tool available
+
+        Args:
+            tool: Tool number
+
+        Returns:
+            List of machine IDs
+        """
+        matching, _ = self.tool_masks(tool)
+        return [machine_id for bit, machine_id in enumerate(self.machine_ids) if matching >> bit & 1]
+
+    def match(self, tool_numbers: List[str]) -> Dict[str, Tuple[List[str], List[str], List[str]]]:
+        """
+        Split the tools required by an NC file per machine
+
+        Args:
+            tool_numbers: List of tool numbers required by the NC file
+
+        Returns:
+            Dictionary of machine_id to (matching_tools, missing_tools, locked_required_tools)
+        """
+        masks = [(tool, *self.tool_masks(tool)) for tool in tool_numbers]
+
+        results = {}
+        for bit, machine_id in enumerate(self.machine_ids):
+            mask = 1 << bit
+            matching_tools = []
+            missing_tools = []
+            locked_required_tools = []
+            for tool, matching, locked in masks:
+                if matching & mask:
+                    matching_tools.append(tool)
+                elif locked & mask:
+                    locked_required_tools.append(tool)
+                else:
+                    missing_tools.append(tool)
+            results[machine_id] = (matching_tools, missing_tools, locked_required_tools)
+        return results
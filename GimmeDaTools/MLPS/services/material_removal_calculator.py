@@ -2,12 +2,13 @@
 Material Removal Rate Calculator for NC Tool Analyzer
 Calculates MRR based on proper machining formulas: MRR = DOC × WOC × F
 """
-import re
 import math
 from typing import Dict, List, Optional, NamedTuple, Tuple
 from dataclasses import dataclass
 
+from models.nc_program import ProgramBlock
 from .tool_parser import ToolInfo
+from .nc_program_parser import nc_program_cache
 
 
 @dataclass
@@ -111,18 +112,7 @@ class MaterialRemovalCalculator:
     def _extract_stock_boundary(self, nc_file_path: str) -> Optional[StockBoundary]:
         """Extract stock boundary information from BLK FORM commands"""
         try:
-            with open(nc_file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-            
-            blk_forms = []
-            for line in lines:
-                blk_match = re.search(r'BLK FORM \d+\.?\d* (?:Z )?X([-+]?\d+\.?\d*) Y([-+]?\d+\.?\d*) Z([-+]?\d+\.?\d*)', line)
-                if blk_match:
-                    blk_forms.append({
-                        'x': float(blk_match.group(1)),
-                        'y': float(blk_match.group(2)),
-                        'z': float(blk_match.group(3))
-                    })
+            blk_forms = nc_program_cache.get(nc_file_path).blk_forms
             
             if len(blk_forms) >= 2:
                 # Calculate boundaries
@@ -147,8 +137,7 @@ class MaterialRemovalCalculator:
         moves = []
         
         try:
-            with open(nc_file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
+            program = nc_program_cache.get(nc_file_path)
             
             self.current_position = {'X': 0, 'Y': 0, 'Z': 0}
             self.current_feedrate = 100
@@ -158,17 +147,10 @@ class MaterialRemovalCalculator:
             # Track previous positions for stepover calculation
             tool_paths = {}  # tool_number -> list of XY positions
             
-            for line_num, line in enumerate(lines, 1):
-                line = line.strip()
-                
-                # Skip comments and empty lines
-                if not line or line.startswith(';') or line.startswith('(') or line.startswith('*'):
-                    continue
-                
+            for block in program.blocks:
                 # Tool change
-                tool_match = re.search(r'TOOL CALL (\d+)', line)
-                if tool_match:
-                    self.current_tool = tool_match.group(1)
+                if block.tool_call:
+                    self.current_tool = block.tool_call
                     if self.current_tool not in tool_paths:
                         tool_paths[self.current_tool] = []
                     if self.current_tool not in self.z_levels:
@@ -179,18 +161,17 @@ class MaterialRemovalCalculator:
                     continue
                 
                 # Update feed rate
-                f_match = re.search(r'F(\d+\.?\d*)', line)
-                if f_match:
-                    self.current_feedrate = float(f_match.group(1))
+                if block.feed is not None:
+                    self.current_feedrate = block.feed
                 
                 # Skip rapid moves
-                if 'FMAX' in line:
-                    self._update_position(line)
+                if block.rapid:
+                    self._update_position(block)
                     continue
                 
                 # Process cutting moves (L, G01, G02, G03)
-                if self._is_cutting_move(line):
-                    move = self._process_cutting_move(line, tool_info, tool_paths)
+                if block.cutting:
+                    move = self._process_cutting_move(block, tool_info, tool_paths)
                     if move:
                         moves.append(move)
         
@@ -199,12 +180,7 @@ class MaterialRemovalCalculator:
         
         return moves
     
-    def _is_cutting_move(self, line: str) -> bool:
-        """Check if line represents a cutting move"""
-        cutting_commands = ['L ', 'G01', 'G1 ', 'G02', 'G2 ', 'G03', 'G3 ']
-        return any(line.startswith(cmd) or f' {cmd}' in line for cmd in cutting_commands)
-    
-    def _process_cutting_move(self, line: str, tool_info: Dict[str, ToolInfo], 
+    def _process_cutting_move(self, block: ProgramBlock, tool_info: Dict[str, ToolInfo], 
                              tool_paths: Dict[str, List]) -> Optional[CuttingMove]:
         """Process a single cutting move and calculate DOC, WOC, and MRR"""
         
@@ -212,7 +188,7 @@ class MaterialRemovalCalculator:
         self.previous_position = self.current_position.copy()
         
         # Update current position
-        new_position = self._update_position(line)
+        new_position = self._update_position(block)
         if not new_position:
             return None
         
@@ -264,14 +240,13 @@ class MaterialRemovalCalculator:
             move_type=strategy
         )
     
-    def _update_position(self, line: str) -> bool:
-        """Update current position from NC line"""
+    def _update_position(self, block: ProgramBlock) -> bool:
+        """Update current position from an NC block"""
         updated = False
         
-        for axis in ['X', 'Y', 'Z']:
-            match = re.search(rf'{axis}([+-]?\d+\.?\d*)', line)
-            if match:
-                self.current_position[axis] = float(match.group(1))
+        for axis, value in (('X', block.x), ('Y', block.y), ('Z', block.z)):
+            if value is not None:
+                self.current_position[axis] = value
                 updated = True
         
         return updated
@@ -0,0 +1,202 @@
+"""
+NC Program Parser for NC Tool Analyzer
+Reads an NC file once into the NCProgram model shared by all analyzers
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from models.nc_program import NCProgram, ToolCall, CommentLine, FeedValue, ProgramBlock
+from utils.tool_segments import ToolSegmentTracker
+
+
+BLK_FORM_PATTERN = re.compile(r'BLK FORM \d+\.?\d* (?:Z )?X([-+]?\d+\.?\d*) Y([-+]?\d+\.?\d*) Z([-+]?\d+\.?\d*)')
+Q339_PATTERN = re.compile(r'Q339=([-+]?\d+\.?\d*)')
+FEED_PATTERN = re.compile(r'F(\d+(?:\.\d*)?)')
+X_PATTERN = re.compile(r'X([+-]?\d+\.?\d*)')
+Y_PATTERN = re.compile(r'Y([+-]?\d+\.?\d*)')
+Z_PATTERN = re.compile(r'Z([+-]?\d+\.?\d*)')
+DWELL_PATTERN = re.compile(r'DWELL\s+[F](\d+\.?\d*)')
+
+# Lines starting with these are skipped as comments by the motion analyzers
+COMMENT_PREFIXES = (';', '(', '*')
+
+# Lines starting with these may hold tool descriptions
+TOOL_COMMENT_PREFIXES = (';', '(', '*', 'REM', '//')
+
+CUTTING_COMMANDS = ('L ', 'G01', 'G1 ', 'G02', 'G2 ', 'G03', 'G3 ')
+CUTTING_PATTERN = re.compile('(?:^| )(?:' + '|'.join(re.escape(cmd) for cmd in CUTTING_COMMANDS) + ')')
+
+# Number of parsed programs kept in memory
+MAX_CACHED_PROGRAMS = 8
+
+# Bumped whenever parsing or the stored analysis fields change, so stored analyses are redone
+PARSER_VERSION = 1
+
+
+def is_cutting_move(line: str) -> bool:
+    """
+    Check if a line represents a cutting move (L, G01, G02, G03)
+
+    Args:
+        line: Stripped NC line
+
+    Returns:
+        True if the line is a cutting move
+    """
+    return CUTTING_PATTERN.search(line) is not None
+
+
+class NCProgramParser:
+    """
+    Parser that reads an NC file line by line into an NCProgram
+    """
+    def parse(self, file_path: str) -> NCProgram:
+        """
+        Parse an NC file in a single streaming pass
+
+        Args:
+            file_path: Path to the NC file
+
+        Returns:
+            NCProgram with the file's tool calls, comments, stock, presets,
+            feeds, program blocks and tool segments
+        """
+        program = NCProgram(file_path=file_path)
+        current_tool = None  # Last tool called anywhere, including comments
+        block_tool = None  # Last tool called outside comments
+        segments = ToolSegmentTracker()
+        line_num = 0
+
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            for line_num, raw_line in enumerate(f, 1):
+                tool_call = segments.feed(line_num, raw_line)
+                if tool_call:
+                    current_tool = tool_call
+
+                # Substring checks first: most lines hold none of these words
+                blk_form_match = 'BLK FORM' in raw_line and BLK_FORM_PATTERN.search(raw_line)
+                if blk_form_match:
+                    program.blk_forms.append({
+                        'x': float(blk_form_match.group(1)),
+                        'y': float(blk_form_match.group(2)),
+                        'z': float(blk_form_match.group(3))
+                    })
+
+                q339_match = 'Q339=' in raw_line and Q339_PATTERN.search(raw_line)
+                if q339_match:
+                    program.preset_values.append(float(q339_match.group(1)))
+
+                line = raw_line.strip()
+                feeds = [float(value) for value in FEED_PATTERN.findall(raw_line)]
+                for value in feeds:
+                    program.feed_values.append(FeedValue(line=line_num, value=value, text=line))
+
+                is_comment = line.startswith(COMMENT_PREFIXES)
+                if tool_call:
+                    program.tool_calls.append(ToolCall(line=line_num, tool_number=current_tool, in_comment=is_comment))
+                elif line.startswith(TOOL_COMMENT_PREFIXES):
+                    program.comments.append(CommentLine(line=line_num, text=line, current_tool=current_tool))
+
+                if not line or is_comment:
+                    continue
+
+                if tool_call:
+                    block_tool = current_tool
+                    program.blocks.append(ProgramBlock(line=line_num, tool=block_tool, tool_call=block_tool))
+                    continue
+
+                block = self._parse_block(line, line_num, block_tool, feeds[0] if feeds else None)
+                if block:
+                    program.blocks.append(block)
+
+        program.tool_segments = segments.finish()
+        program.line_count = line_num
+        return program
+
+    def _parse_block(self, line: str, line_num: int, tool: Optional[str],
+                     feed: Optional[float]) -> Optional[ProgramBlock]:
+        """Parse a non-comment line into a ProgramBlock, or None if it has nothing the analyzers use"""
+        x_match = 'X' in line and X_PATTERN.search(line)
+        y_match = 'Y' in line and Y_PATTERN.search(line)
+        z_match = 'Z' in line and Z_PATTERN.search(line)
+        x = float(x_match.group(1)) if x_match else None
+        y = float(y_match.group(1)) if y_match else None
+        z = float(z_match.group(1)) if z_match else None
+        rapid = 'FMAX' in line
+        cutting = CUTTING_PATTERN.search(line) is not None
+        dwell_match = 'DWELL' in line and DWELL_PATTERN.search(line)
+        dwell = float(dwell_match.group(1)) if dwell_match else None
+
+        if x is None and y is None and z is None and feed is None and not rapid and not cutting and dwell is None:
+            return None
+        return ProgramBlock(line=line_num, tool=tool, x=x, y=y, z=z, feed=feed,
+                            rapid=rapid, cutting=cutting, dwell=dwell)
+
+
+class NCProgramCache:
+    """
+    Parsed NC programs keyed by file path
+
+    A program is parsed again when its file's modification time or size
+    changes; the least recently used programs are dropped beyond max_programs.
+    """
+    def __init__(self, max_programs: int = MAX_CACHED_PROGRAMS):
+        """
+        Initialize the cache
+
+        Args:
+            max_programs: Number of parsed programs kept in memory
+        """
+        self.max_programs = max_programs
+        self.parser = NCProgramParser()
+        self._programs = OrderedDict()  # abspath -> ((mtime_ns, size), NCProgram)
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str) -> NCProgram:
+        """
+        Get the parsed program of an NC file, parsing it if needed
+
+        Args:
+            file_path: Path to the NC file
+
+        Returns:
+            NCProgram for the file's current contents
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._programs.get(path)
+            if entry and entry[0] == stamp:
+                self._programs.move_to_end(path)
+                return entry[1]
+
+        program = self.parser.parse(file_path)
+
+        with self._lock:
+            self._programs[path] = (stamp, program)
+            self._programs.move_to_end(path)
+            while len(self._programs) > self.max_programs:
+                self._programs.popitem(last=False)
+        return program
+
+    def invalidate(self, file_path: Optional[str] = None) -> None:
+        """
+        Drop one cached program, or all of them
+
+        Args:
+            file_path: Path of the NC file to drop (None = all)
+        """
+        with self._lock:
+            if file_path is None:
+                self._programs.clear()
+            else:
+                self._programs.pop(os.path.abspath(file_path), None)
+
+
+# Global NC program cache instance
+nc_program_cache = NCProgramCache()
@@ -6,6 +6,8 @@ import re
 from typing import Dict, Optional, NamedTuple
 from dataclasses import dataclass
 
+from .nc_program_parser import nc_program_cache
+
 
 @dataclass
 class ToolInfo:
@@ -221,29 +223,21 @@ class ToolCommentParser:
             Dictionary mapping tool_number -> ToolInfo
         """
         tool_info = {}
-        current_tool = None
         
         try:
-            with open(nc_file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
+            program = nc_program_cache.get(nc_file_path)
             
-            for i, line in enumerate(lines):
-                line = line.strip()
-                
-                # Check for tool calls to track current tool
-                tool_call_match = re.search(r'TOOL CALL (\d+)', line)
-                if tool_call_match:
-                    current_tool = tool_call_match.group(1)
-                    continue
+            for comment in program.comments:
+                line = comment.text
                 
                 # Look for comments that might contain tool information
                 if self._is_tool_comment(line):
-                    # Try to find tool number in the comment
+                    # Try to find tool number in the comment, else use the tool called before it
                     tool_num_match = re.search(r'T(\d+)', line)
                     if tool_num_match:
                         tool_number = tool_num_match.group(1)
-                    elif current_tool:
-                        tool_number = current_tool
+                    elif comment.current_tool:
+                        tool_number = comment.current_tool
                     else:
                         continue
                     
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that stored analysis results are served, or get
+their machine compatibility recomputed, according to the tool table version,
+and that the cache drops old parser versions and stays within its bound
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+from unittest import mock
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models.machine import Machine
+from services import analysis_cache
+from services.analysis_cache import AnalysisCache
+from services.analysis_service import AnalysisService
+from services.machine_service import MachineService
+from services.nc_program_parser import nc_program_cache, PARSER_VERSION
+from utils.file_utils import file_content_hash
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_sample.nc')
+
+
+def make_services(temp_dir):
+    """Create a machine service with one machine and an analysis service, both on temp files"""
+    machine_service = MachineService(os.path.join(temp_dir, 'machine_database.json'))
+    machine = Machine('M1', 'Mill 1')
+    machine.physical_tools = ['9', '12']
+    machine_service.add_machine(machine)
+    analysis_service = AnalysisService(machine_service, os.path.join(temp_dir, 'analysis_cache.jsonl'))
+    return machine_service, analysis_service
+
+
+def not_reparsed(file_path):
+    raise AssertionError(f"{file_path} was parsed again")
+
+
+def test_version_invalidation():
+    """Test serving and recomputing stored results by tool table version"""
+    print("Testing analysis cache tool table versions...")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        machine_service, analysis_service = make_services(temp_dir)
+        content_hash = file_content_hash(SAMPLE_FILE)
+
+        first = analysis_service.analyze_nc_file(SAMPLE_FILE)
+        assert first.machine_analysis[0].missing_tools == ['15'], first.machine_analysis
+        version = machine_service.get_tool_table_version()
+        assert analysis_service.analysis_cache.get(content_hash).tool_table_version == version
+
+        with mock.patch.object(AnalysisService, 'parse_nc_file', side_effect=not_reparsed), \
+                mock.patch.object(AnalysisService, '_analyze_machine_compatibility',
+                                  wraps=analysis_service._analyze_machine_compatibility) as compatibility:
+            # Same version: the stored result is served as is
+            served = analysis_service.analyze_nc_file(SAMPLE_FILE)
+            assert compatibility.call_count == 0, "Compatibility was recomputed for an unchanged tool table"
+            assert served.to_dict()['machine_analysis'] == first.to_dict()['machine_analysis']
+
+            # Tool list changed: only compatibility is recomputed, and stored with the new version
+            machine_service.get_machine('M1').physical_tools.append('15')
+            machine_service.save_database()
+            new_version = machine_service.get_tool_table_version()
+            assert new_version != version, "Tool list change kept the tool table version"
+            updated = analysis_service.analyze_nc_file(SAMPLE_FILE)
+            assert compatibility.call_count == 1
+            assert updated.machine_analysis[0].missing_tools == [], updated.machine_analysis
+            assert updated.machine_analysis[0].match_percentage == 100
+            assert analysis_service.analysis_cache.get(content_hash).tool_table_version == new_version
+
+            # A reloaded service serves the updated result
+            reloaded = AnalysisService(machine_service, analysis_service.analysis_cache.cache_path)
+            assert reloaded.analyze_nc_file(SAMPLE_FILE).machine_analysis[0].match_percentage == 100
+            assert compatibility.call_count == 1
+
+            # Record without a tool table version: compatibility is recomputed
+            record = {'hash': content_hash, 'parser_version': PARSER_VERSION,
+                      'result': dict(first.to_dict(), machine_analysis=[])}
+            with open(reloaded.analysis_cache.cache_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+            reloaded.analysis_cache.load()
+            assert reloaded.analysis_cache.get(content_hash).tool_table_version is None
+            legacy = reloaded.analyze_nc_file(SAMPLE_FILE)
+            assert compatibility.call_count == 2
+            assert legacy.machine_analysis[0].match_percentage == 100, legacy.machine_analysis
+            assert reloaded.analysis_cache.get(content_hash).tool_table_version == new_version
+
+        # Records of another parser version are dropped, so the file is parsed again
+        with mock.patch.object(analysis_cache, 'PARSER_VERSION', PARSER_VERSION + 1):
+            bumped = AnalysisService(machine_service, analysis_service.analysis_cache.cache_path)
+            assert bumped.analysis_cache.get(content_hash) is None
+            with mock.patch.object(AnalysisService, 'parse_nc_file', wraps=AnalysisService.parse_nc_file) as parse:
+                bumped.analyze_nc_file(SAMPLE_FILE)
+            assert parse.call_count == 1
+            assert len(bumped.analysis_cache) == 1
+    finally:
+        nc_program_cache.invalidate()
+        shutil.rmtree(temp_dir)
+
+    print("✓ Tool table version test passed!")
+    return True
+
+
+def test_load_drops_replaced_records():
+    """Test that loading the cache file keeps only the last record of each hash"""
+    print("Testing analysis cache compaction on load...")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        result = AnalysisService.parse_nc_file(SAMPLE_FILE)
+        cache_path = os.path.join(temp_dir, 'compacted.jsonl')
+
+        cache = AnalysisCache(cache_path)
+        cache.put('a', result, 'v1')
+        cache.put('b', result, 'v1')
+        cache.put('a', result, 'v2')
+        with open(cache_path, 'a', encoding='utf-8') as f:
+            f.write('{"hash": "c", "res')  # Cut short by an interrupted write
+
+        reloaded = AnalysisCache(cache_path)
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        assert [(r['hash'], r['tool_table_version']) for r in records] == [('b', 'v1'), ('a', 'v2')], records
+        assert reloaded.get('a').tool_table_version == 'v2'
+        assert reloaded.get('c') is None
+        assert reloaded.get('b').result.tool_numbers == result.tool_numbers
+    finally:
+        shutil.rmtree(temp_dir)
+
+    print("✓ Compaction test passed!")
+    return True
+
+
+def test_bounded_lru_and_compaction():
+    """Test that the least recently used results are dropped and the file is compacted as it is written"""
+    print("Testing analysis cache bound and compaction on write...")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        result = AnalysisService.parse_nc_file(SAMPLE_FILE)
+        cache_path = os.path.join(temp_dir, 'bounded.jsonl')
+
+        def file_hashes():
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return [json.loads(line)['hash'] for line in f]
+
+        with mock.patch.object(analysis_cache, 'COMPACT_MIN_LINES', 6):
+            cache = AnalysisCache(cache_path, max_entries=3)
+            for content_hash in ('a', 'b', 'c'):
+                cache.put(content_hash, result)
+            assert cache.get('a') is not None  # Now the most recently used
+            cache.put('d', result)
+            assert len(cache) == 3 and cache.get('b') is None, "Least recently used result was kept"
+            assert [h for h in ('a', 'c', 'd') if cache.get(h) is None] == []
+            assert file_hashes() == ['a', 'b', 'c', 'd'], "Compacted before the threshold"
+
+            # Re-storing results grows the file until it holds twice the kept records
+            cache.put('c', result)
+            cache.put('a', result)
+            assert file_hashes() == ['a', 'b', 'c', 'd', 'c', 'a']
+            cache.put('e', result)
+            assert file_hashes() == ['c', 'a', 'e'], file_hashes()
+
+            reloaded = AnalysisCache(cache_path, max_entries=2)
+            assert [h for h in ('c', 'a', 'e') if reloaded.get(h) is not None] == ['a', 'e']
+            assert file_hashes() == ['a', 'e'], file_hashes()
+    finally:
+        shutil.rmtree(temp_dir)
+
+    print("✓ Bound and compaction test passed!")
+    return True
+
+
+def run_all_tests():
+    """Run all analysis cache tests"""
+    tests = [test_version_invalidation, test_load_drops_replaced_records, test_bounded_lru_and_compaction]
+    passed = 0
+    for test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ Test {test_func.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
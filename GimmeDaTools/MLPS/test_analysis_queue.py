@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the dispatch order, re-prioritization and
+cancellation of the batch analysis queue, and that the analysis tab
+only touches widgets on the UI thread, headlessly with stub services
+"""
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+from concurrent.futures import Future
+from unittest import mock
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models.analysis_result import AnalysisResult
+from services import analysis_queue
+from services.analysis_queue import AnalysisQueue, PENDING, RUNNING, DONE, CACHED, CANCELLED
+from ui.analysis_tab import AnalysisTab
+
+
+class StubAnalysisService:
+    """Analysis service without machines; contents listed in cached_hashes are served from its cache"""
+    def __init__(self):
+        self.cached_hashes = set()
+        self.stored = []
+
+    def get_cached_analysis(self, content_hash, file_name, download_info=None):
+        if content_hash in self.cached_hashes:
+            return AnalysisResult(file_name=file_name, tool_numbers=['1'])
+        return None
+
+    def add_machine_compatibility(self, analysis_result, download_info=None):
+        analysis_result.download_info = download_info
+        return analysis_result
+
+    def store_analysis(self, content_hash, analysis_result):
+        self.stored.append(analysis_result.file_name)
+
+
+class StubExecutor:
+    """Executor whose futures are completed by the test instead of worker processes"""
+    def __init__(self):
+        self.submitted = []  # (file name, future) in dispatch order
+
+    def submit(self, function, file_path):
+        future = Future()
+        self.submitted.append((os.path.basename(file_path), future))
+        return future
+
+    def names(self):
+        return [name for name, _ in self.submitted]
+
+    def finish(self, name):
+        """Complete the running future of a file as a worker would"""
+        assert name in self.names(), f"{name} was not dispatched: {self.names()}"
+        future = dict(self.submitted)[name]
+        if future.set_running_or_notify_cancel():
+            future.set_result(AnalysisResult(file_name=name, tool_numbers=['1']).to_dict())
+
+
+class QueueFixture:
+    """An AnalysisQueue with one stub worker and NC files in a temp directory"""
+    def __init__(self, names):
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = {}
+        for name in names:
+            path = os.path.join(self.temp_dir, name)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(f"TOOL CALL 1 ; {name}\n")
+            self.paths[name] = path
+        self.service = StubAnalysisService()
+        self.executor = StubExecutor()
+        self.queue = AnalysisQueue(self.service, max_workers=1)
+        self.queue._executor = self.executor
+
+    def status(self, name):
+        return self.queue._items[os.path.abspath(self.paths[name])].status
+
+    def heap_is_consistent(self):
+        """Every pending file has exactly one live heap entry; stale entries belong to no pending file"""
+        live = [entry for entry in self.queue._heap
+                if self.queue._items[entry[2]].status == PENDING and self.queue._items[entry[2]].sequence == entry[1]]
+        pending = [path for path, item in self.queue._items.items() if item.status == PENDING]
+        return sorted(entry[2] for entry in live) == sorted(pending)
+
+    def close(self):
+        shutil.rmtree(self.temp_dir)
+
+
+def test_priority_order():
+    """Test that files run highest priority first, then in submission order"""
+    print("Testing analysis queue priority order...")
+    fixture = QueueFixture(['a.h', 'b.h', 'c.h', 'd.h', 'e.h'])
+    try:
+        fixture.queue.submit(fixture.paths['a.h'])
+        fixture.queue.submit(fixture.paths['b.h'])
+        fixture.queue.submit(fixture.paths['c.h'], priority=5)
+        fixture.queue.submit(fixture.paths['d.h'], priority=1)
+        fixture.queue.submit(fixture.paths['e.h'], priority=1)
+        assert fixture.executor.names() == ['a.h'], fixture.executor.names()
+        assert fixture.status('a.h') == RUNNING and fixture.status('b.h') == PENDING
+
+        for name in ('a.h', 'c.h', 'd.h', 'e.h'):
+            fixture.executor.finish(name)
+        fixture.executor.finish('b.h')
+        assert fixture.executor.names() == ['a.h', 'c.h', 'd.h', 'e.h', 'b.h'], fixture.executor.names()
+        assert all(fixture.status(name) == DONE for name in fixture.paths)
+        assert fixture.service.stored == ['a.h', 'c.h', 'd.h', 'e.h', 'b.h'], fixture.service.stored
+        assert not fixture.queue._running and fixture.heap_is_consistent()
+    finally:
+        fixture.close()
+
+    print("✓ Priority order test passed!")
+    return True
+
+
+def test_prioritize_reheaps():
+    """Test that re-prioritized files move in the heap and stale entries are skipped"""
+    print("Testing analysis queue re-prioritization...")
+    fixture = QueueFixture(['a.h', 'b.h', 'c.h', 'd.h'])
+    try:
+        for name in ('a.h', 'b.h', 'c.h', 'd.h'):
+            fixture.queue.submit(fixture.paths[name], priority=1)
+
+        assert fixture.queue.prioritize(fixture.paths['d.h'], 10)
+        assert fixture.queue.prioritize(fixture.paths['b.h'], 0)
+        assert fixture.queue.prioritize(fixture.paths['c.h'], 1)  # Same priority, now after the others
+        assert not fixture.queue.prioritize(fixture.paths['a.h'], 20), "Running file was re-prioritized"
+        assert fixture.heap_is_consistent()
+        assert len(fixture.queue._heap) == 6  # Three stale entries left to be skipped
+
+        for name in ('a.h', 'd.h', 'c.h', 'b.h'):
+            fixture.executor.finish(name)
+        assert fixture.executor.names() == ['a.h', 'd.h', 'c.h', 'b.h'], fixture.executor.names()
+        assert not fixture.queue._heap, fixture.queue._heap
+    finally:
+        fixture.close()
+
+    print("✓ Re-prioritization test passed!")
+    return True
+
+
+def test_cancel_while_hashing():
+    """Test that a file cancelled while it is hashed never reaches the heap or a worker"""
+    print("Testing cancellation while hashing...")
+    fixture = QueueFixture(['a.h', 'b.h'])
+    try:
+        fixture.queue.submit(fixture.paths['a.h'])
+        hash_file = analysis_queue.file_content_hash
+
+        def cancel_during_hash(file_path):
+            content_hash = hash_file(file_path)
+            assert fixture.queue.cancel(file_path)
+            return content_hash
+
+        with mock.patch.object(analysis_queue, 'file_content_hash', side_effect=cancel_during_hash):
+            item = fixture.queue.submit(fixture.paths['b.h'])
+        assert item.status == CANCELLED, item.status
+        assert not fixture.queue._heap and fixture.heap_is_consistent()
+
+        fixture.executor.finish('a.h')
+        assert fixture.executor.names() == ['a.h'], fixture.executor.names()
+
+        # A cancelled file can be submitted again
+        fixture.queue.submit(fixture.paths['b.h'])
+        assert fixture.executor.names() == ['a.h', 'b.h'], fixture.executor.names()
+    finally:
+        fixture.close()
+
+    print("✓ Cancel while hashing test passed!")
+    return True
+
+
+def test_cancel_while_running():
+    """Test that a cancelled running file frees its worker and its late result is discarded"""
+    print("Testing cancellation while running...")
+    fixture = QueueFixture(['a.h', 'b.h', 'c.h'])
+    try:
+        for name in ('a.h', 'b.h', 'c.h'):
+            fixture.queue.submit(fixture.paths[name])
+        running = dict(fixture.executor.submitted)['a.h']
+        assert running.set_running_or_notify_cancel()  # Already in a worker, cannot be cancelled
+
+        assert fixture.queue.cancel(fixture.paths['a.h'])
+        assert fixture.status('a.h') == CANCELLED
+        assert fixture.executor.names() == ['a.h', 'b.h'], fixture.executor.names()
+
+        # The worker finishes anyway
+        running.set_result(AnalysisResult(file_name='a.h', tool_numbers=['1']).to_dict())
+        assert fixture.status('a.h') == CANCELLED
+        assert fixture.service.stored == [], fixture.service.stored
+        assert list(fixture.queue._running) == [os.path.abspath(fixture.paths['b.h'])]
+
+        # Cancelling a pending file leaves its heap entry to be skipped
+        fixture.queue.submit(fixture.paths['a.h'])
+        assert fixture.queue.cancel(fixture.paths['c.h'])
+        assert not fixture.queue.cancel(fixture.paths['c.h'])
+        fixture.executor.finish('b.h')
+        fixture.executor.finish('a.h')
+        assert fixture.executor.names() == ['a.h', 'b.h', 'a.h'], fixture.executor.names()
+        assert fixture.service.stored == ['b.h', 'a.h'], fixture.service.stored
+        assert not fixture.queue._heap and not fixture.queue._running
+    finally:
+        fixture.close()
+
+    print("✓ Cancel while running test passed!")
+    return True
+
+
+def test_cached_files_skip_workers():
+    """Test that files analyzed before are served from the cache without a worker"""
+    print("Testing cached files...")
+    fixture = QueueFixture(['a.h', 'b.h'])
+    try:
+        fixture.service.cached_hashes.add(analysis_queue.file_content_hash(fixture.paths['a.h']))
+        item = fixture.queue.submit(fixture.paths['a.h'])
+        assert item.status == CACHED and item.result.file_name == 'a.h'
+        fixture.queue.submit(fixture.paths['b.h'])
+        assert fixture.executor.names() == ['b.h'], fixture.executor.names()
+    finally:
+        fixture.close()
+
+    print("✓ Cached files test passed!")
+    return True
+
+
+class StubFrame:
+    """Tk frame that records the thread of every call made on it"""
+    def __init__(self):
+        self.threads = []
+
+    def after(self, delay, callback):
+        self.threads.append(threading.current_thread())
+        return 'poll'
+
+    def update_idletasks(self):
+        self.threads.append(threading.current_thread())
+
+
+def test_batch_task_reports_on_ui_thread():
+    """Test that a failing batch task reports its error and stops the progress bar on the UI thread"""
+    print("Testing batch task error handling on the UI thread...")
+    tab = AnalysisTab.__new__(AnalysisTab)  # Without Tk widgets
+    tab.frame = StubFrame()
+    tab.progress = mock.Mock()
+    tab.status_var = mock.Mock()
+    tab.ui_calls = queue.Queue()
+    tab._ui_poll_id = None
+    tab.analysis_queue = mock.Mock()
+    tab.analysis_queue.submit.side_effect = OSError("network share unavailable")
+    tab.analysis_queue.get_items.return_value = []
+
+    worker = threading.Thread(target=tab._batch_analyze_task, args=(['a.h'], False))
+    worker.start()
+    worker.join()
+    assert not tab.frame.threads, "The worker thread called into Tk"
+    assert not tab.progress.stop.called and not tab.status_var.set.called
+
+    with mock.patch('ui.analysis_tab.messagebox') as messagebox:
+        tab._process_ui_calls()
+    assert messagebox.showerror.call_count == 1
+    assert "network share unavailable" in messagebox.showerror.call_args[0][1]
+    assert tab.status_var.set.call_args_list[-1] == mock.call("Batch analysis failed")
+    assert tab.progress.stop.call_count == 1
+    assert tab.frame.threads and all(thread is threading.main_thread() for thread in tab.frame.threads)
+    assert tab._ui_poll_id == 'poll' and tab.ui_calls.empty()
+
+    print("✓ Batch task UI thread test passed!")
+    return True
+
+
+def run_all_tests():
+    """Run all analysis queue tests"""
+    tests = [test_priority_order, test_prioritize_reheaps, test_cancel_while_hashing,
+             test_cancel_while_running, test_cached_files_skip_workers, test_batch_task_reports_on_ui_thread]
+    passed = 0
+    for test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ Test {test_func.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the machine tool index against the
+per-machine tool list scan it replaced in the analysis service
+"""
+import os
+import random
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models.machine import Machine
+from services.machine_tool_index import MachineToolIndex
+
+RANDOM_FLEETS = 300
+
+
+def legacy_match(machines, tool_numbers):
+    """Tool split of AnalysisService._analyze_machine_compatibility before the tool index"""
+    results = {}
+    for machine_id, machine in machines.items():
+        physical_tools = machine.physical_tools
+        locked_tools = machine.locked_tools
+
+        matching_tools = []
+        missing_tools = []
+        locked_required_tools = []
+
+        for tool in tool_numbers:
+            if tool in physical_tools:
+                matching_tools.append(tool)
+            elif tool in locked_tools:
+                locked_required_tools.append(tool)
+            else:
+                str_tool = str(tool)
+                int_tool = int(tool) if str(tool).isdigit() else None
+
+                if str_tool in physical_tools:
+                    matching_tools.append(tool)
+                elif int_tool and int_tool in physical_tools:
+                    matching_tools.append(tool)
+                elif str_tool in locked_tools:
+                    locked_required_tools.append(tool)
+                elif int_tool and int_tool in locked_tools:
+                    locked_required_tools.append(tool)
+                else:
+                    missing_tools.append(tool)
+
+        results[machine_id] = (matching_tools, missing_tools, locked_required_tools)
+    return results
+
+
+def make_machine(machine_id, physical_tools, locked_tools):
+    machine = Machine(machine_id, f"Machine {machine_id}")
+    machine.physical_tools = list(physical_tools)
+    machine.locked_tools = list(locked_tools)
+    return machine
+
+
+def test_precedence_rules():
+    """Test the str/int precedence of physical and locked tools"""
+    print("Testing tool index precedence rules...")
+    machines = {
+        'str_physical': make_machine('str_physical', ['5'], ['5']),
+        'str_locked_before_int': make_machine('str_locked_before_int', [5], ['5']),
+        'int_physical': make_machine('int_physical', [5], []),
+        'int_locked': make_machine('int_locked', [], [5]),
+        'padded': make_machine('padded', ['05'], [7]),
+        'zero': make_machine('zero', [0], ['0']),
+        'empty': make_machine('empty', [], []),
+    }
+    tools = ['5', '05', '7', '0', '00', 'A1']
+    index = MachineToolIndex(machines)
+    result = index.match(tools)
+
+    assert result == legacy_match(machines, tools), result
+    assert result['str_physical'] == (['5'], ['05', '7', '0', '00', 'A1'], []), result
+    assert result['str_locked_before_int'] == (['05'], ['7', '0', '00', 'A1'], ['5']), result
+    assert result['int_physical'] == (['5', '05'], ['7', '0', '00', 'A1'], []), result
+    assert result['int_locked'] == ([], ['7', '0', '00', 'A1'], ['5', '05']), result
+    assert result['padded'] == (['05'], ['5', '0', '00', 'A1'], ['7']), result
+    assert result['zero'] == ([], ['5', '05', '7', '00', 'A1'], ['0']), result
+    assert index.machines_with_tool('5') == ['str_physical', 'int_physical'], index.machines_with_tool('5')
+    assert index.machines_with_tool(5) == ['str_physical', 'int_physical']
+
+    print("✓ Precedence rules test passed!")
+    return True
+
+
+def test_random_fleets_match_legacy_scan():
+    """Test the tool index against the legacy scan on random fleets"""
+    print(f"Testing tool index against the legacy scan on {RANDOM_FLEETS} random fleets...")
+    rng = random.Random(25)
+
+    def random_tool():
+        number = rng.randint(0, 30)
+        form = rng.random()
+        if form < 0.4:
+            return str(number)
+        if form < 0.7:
+            return number
+        if form < 0.9:
+            return f"{number:02d}"
+        return f"T{number}"
+
+    for _ in range(RANDOM_FLEETS):
+        machines = {}
+        for machine_num in range(rng.randint(1, 12)):
+            machine_id = f"M{machine_num}"
+            physical = [random_tool() for _ in range(rng.randint(0, 25))]
+            locked = [random_tool() for _ in range(rng.randint(0, 8))]
+            machines[machine_id] = make_machine(machine_id, physical, locked)
+        tools = [str(tool) for tool in (random_tool() for _ in range(rng.randint(1, 15)))]
+
+        expected = legacy_match(machines, tools)
+        result = MachineToolIndex(machines).match(tools)
+        assert result == expected, f"Tools {tools}: {result} != {expected}"
+
+    print("✓ Random fleet test passed!")
+    return True
+
+
+def run_all_tests():
+    """Run all machine tool index tests"""
+    tests = [test_precedence_rules, test_random_fleets_match_legacy_scan]
+    passed = 0
+    for test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ Test {test_func.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that every analyzer reading the shared NCProgram
+gets the results of the per-analyzer parsers it replaced
+"""
+import os
+import sys
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models.analysis_result import FValueError, StockDimensions
+from services.analysis_service import AnalysisService
+from services.tool_parser import ToolCommentParser
+from services.material_removal_calculator import MaterialRemovalCalculator
+from services.nc_program_parser import NCProgramCache, nc_program_cache
+from ui.analysis_tab import NCCycleTimeCalculator
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_sample.nc')
+
+# test_sample.nc has no stock, presets, cutter comp or F errors; this program wraps it with them
+EXTENDED_HEADER = """BEGIN PGM EXTENDED MM
+BLK FORM 0.1 Z X+0 Y+0 Z-20
+BLK FORM 0.2 X+100 Y+80 Z+0
+"""
+EXTENDED_FOOTER = """
+; BEM_10.00_P15-120_L19O25_0.00AL3 T20
+TOOL CALL 20 Z S6000
+CYCL DEF 247 Q339=+1
+L X+5 Y+5 RL F1200
+L X+60 Y+5 F95000
+L Z+50 R0 FMAX
+END PGM EXTENDED MM
+"""
+
+# Results of the parsers each analyzer used before NCProgram
+EXPECTED = {
+    'sample': {
+        'tool_numbers': ['9', '12', '15'],
+        'cutter_comp': {'9': 'Cutter Comp: Off', '12': 'Cutter Comp: Off', '15': 'Cutter Comp: Off'},
+        'presets': [],
+        'f_errors': [],
+        'dimensions': None,
+        # The BAL comment's T number is read from "ST2"
+        'tool_info': {'9': ('SEM', 6.35), '2': ('BAL', 3.0), '15': ('DRL', 8.0)},
+        'mrr_doc': {'9': 0.8, '12': 3.0, '15': 10.0},
+        'mrr_distance': {'9': 54.340175, '12': 49.212496, '15': 36.925824},
+        'cycle_time': 58.343214,
+        'cycle_counts': {'rapid': 3, 'feed': 11, 'tool_change': 3, 'dwell': 0, 'other': 0},
+    },
+    'extended': {
+        'tool_numbers': ['9', '12', '15', '20'],
+        'cutter_comp': {'9': 'Cutter Comp: Off', '12': 'Cutter Comp: Off', '15': 'Cutter Comp: Off',
+                        '20': 'Cutter Comp: On'},
+        'presets': [1.0],
+        'f_errors': [FValueError(line=36, value=95000.0, text='L X+60 Y+5 F95000')],
+        'dimensions': StockDimensions(width=100.0, height=80.0, depth=20.0),
+        'tool_info': {'9': ('SEM', 6.35), '2': ('BAL', 3.0), '15': ('DRL', 8.0), '20': ('BEM', 10.0)},
+        'mrr_doc': {'9': 1.7, '12': 3.25, '15': 10.0, '20': 0.5},
+        'mrr_distance': {'9': 54.340175, '12': 49.212496, '15': 36.925824, '20': 118.639610},
+        'cycle_time': 169.059475,
+        'cycle_counts': {'rapid': 4, 'feed': 15, 'tool_change': 4, 'dwell': 0, 'other': 0},
+    },
+}
+
+
+def write_extended_program(directory):
+    """Write test_sample.nc wrapped with stock, preset, cutter comp and F error lines"""
+    with open(SAMPLE_FILE, 'r', encoding='utf-8') as f:
+        sample = f.read()
+    file_path = os.path.join(directory, 'extended.h')
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(EXTENDED_HEADER + sample + EXTENDED_FOOTER)
+    return file_path
+
+
+def check_consumers(name, file_path):
+    """Run the four NCProgram consumers on a file and compare with the expected values"""
+    expected = EXPECTED[name]
+
+    result = AnalysisService.parse_nc_file(file_path)
+    assert result.tool_numbers == expected['tool_numbers'], f"{name}: {result.tool_numbers}"
+    assert result.cutter_comp_info == expected['cutter_comp'], f"{name}: {result.cutter_comp_info}"
+    assert result.preset_values == expected['presets'], f"{name}: {result.preset_values}"
+    assert result.f_value_errors == expected['f_errors'], f"{name}: {result.f_value_errors}"
+    assert result.dimensions == expected['dimensions'], f"{name}: {result.dimensions}"
+
+    tool_info = ToolCommentParser().extract_all_tool_info(file_path)
+    found = {number: (info.tool_type, info.diameter) for number, info in tool_info.items()}
+    assert found == expected['tool_info'], f"{name}: {found}"
+
+    mrr = MaterialRemovalCalculator().analyze_nc_file_mrr(file_path)
+    assert {number: round(r.average_doc, 6) for number, r in mrr.items()} == expected['mrr_doc'], name
+    assert {number: round(r.total_cutting_distance, 6) for number, r in mrr.items()} == expected['mrr_distance'], name
+
+    cycle = NCCycleTimeCalculator().parse_nc_file(file_path)
+    assert round(cycle['total_time'], 6) == expected['cycle_time'], f"{name}: {cycle['total_time']}"
+    assert cycle['operation_counts'] == expected['cycle_counts'], f"{name}: {cycle['operation_counts']}"
+
+
+def test_consumers_match_previous_parsers():
+    """Test analysis, tool comments, material removal and cycle time on the shared model"""
+    print("Testing NCProgram consumers against the previous parsers...")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        check_consumers('sample', SAMPLE_FILE)
+        check_consumers('extended', write_extended_program(temp_dir))
+    finally:
+        nc_program_cache.invalidate()
+        shutil.rmtree(temp_dir)
+
+    print("✓ Consumer comparison test passed!")
+    return True
+
+
+def test_cache_follows_file_changes():
+    """Test that cached programs are reused until the file's mtime or size changes"""
+    print("Testing NC program cache invalidation...")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        file_path = write_extended_program(temp_dir)
+        cache = NCProgramCache(max_programs=2)
+
+        program = cache.get(file_path)
+        assert cache.get(file_path) is program, "Unchanged file was parsed again"
+
+        # Same size, new modification time
+        with open(file_path, 'r', encoding='utf-8') as f:
+            contents = f.read()
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(contents.replace('Q339=+1', 'Q339=+2'))
+        stat = os.stat(file_path)
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        changed = cache.get(file_path)
+        assert changed is not program, "Program was not parsed again after an mtime change"
+        assert changed.preset_values == [2.0], changed.preset_values
+
+        # New size, same modification time
+        mtime_ns = os.stat(file_path).st_mtime_ns
+        with open(file_path, 'a', encoding='utf-8') as f:
+            f.write("TOOL CALL 21 Z\n")
+        os.utime(file_path, ns=(mtime_ns, mtime_ns))
+        grown = cache.get(file_path)
+        assert grown is not changed, "Program was not parsed again after a size change"
+        assert grown.tool_numbers == ['9', '12', '15', '20', '21'], grown.tool_numbers
+        assert cache.get(file_path) is grown
+
+        # Least recently used programs are dropped beyond max_programs
+        cache.get(SAMPLE_FILE)
+        cache.get(write_extended_program(tempfile.mkdtemp(dir=temp_dir)))
+        assert cache.get(file_path) is not grown, "Least recently used program was kept"
+    finally:
+        shutil.rmtree(temp_dir)
+
+    print("✓ Cache invalidation test passed!")
+    return True
+
+
+def run_all_tests():
+    """Run all NC program tests"""
+    tests = [test_consumers_match_previous_parsers, test_cache_follows_file_changes]
+    passed = 0
+    for test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ Test {test_func.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the single-pass tool segment tracker
+against the per-TOOL CALL rescans the batch scripts used before,
+and the batch scripts' reports built from it
+"""
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.tool_segments import ToolSegmentTracker, track_tool_segments
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_sample.nc')
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cutter comp and spindle speeds, which test_sample.nc does not use
+COMP_PROGRAM = [
+    "TOOL CALL 3 Z S8000\n",
+    "L X+0 Y+0 R0 FMAX\n",
+    "L X+10 Y+0 RL F1200\n",
+    "L X+20 Y+5 F900\n",
+    "TOOL CALL 4 Z\n",
+    "L X+0 Y+0 R0 F600\n",
+    "M3 S6000\n",
+    "TOOL CALL 3 Z S9000 F750\n",
+    "L X+10 Y+10 RR\n",
+    "TOOL CALL 5 Z S4000\n",
+    "L X+5 Y+5 R0\n",
+]
+
+
+# Stock for the batch scripts' report, then COMP_PROGRAM and a tool with a low spindle speed
+SCRIPT_PROGRAM = [
+    "BLK FORM 0.1 Z X+0 Y+0 Z-20\n",
+    "BLK FORM 0.2 X+100 Y+80 Z+0\n",
+] + COMP_PROGRAM + [
+    "TOOL CALL 6 Z S500\n",
+    "L X+0 Y+0 RL F100\n",
+]
+
+# Machine tool list (tool number in the second column) and tool table of the batch scripts
+TOOL_P = "0 3 A B C\n0 4 A B C\n"
+TOOL_T_HEADER = "T    CUR.TIME   NAME"
+
+
+def read_sample():
+    with open(SAMPLE_FILE, 'r', encoding='utf-8', errors='ignore') as f:
+        return f.readlines()
+
+
+def legacy_v25_cutter_comp(lines):
+    """Cutter comp loop of Batch_to_ScanV2.5.py before the single pass"""
+    cutter_comp_info = {}
+    for i, line in enumerate(lines, 1):
+        if re.search(r'TOOL CALL (\d+)', line):
+            current_tool_number = re.search(r'TOOL CALL (\d+)', line).group(1)
+            cutter_comp_info[current_tool_number] = 'Cutter Comp: Off'
+            for subsequent_line in lines[i:]:
+                if re.search(r'TOOL CALL (\d+)', subsequent_line):
+                    break
+                if ' RR' in subsequent_line or ' RL' in subsequent_line:
+                    cutter_comp_info[current_tool_number] = 'Cutter Comp: On'
+    return cutter_comp_info
+
+
+def legacy_v3_tool_params(lines):
+    """Spindle and feedrate loop of Batch_to_ScanV3_Experimental.py before the single pass"""
+    tool_params = {}
+    for i, line in enumerate(lines):
+        if re.search(r'TOOL CALL (\d+)', line):
+            current_tool_number = re.search(r'TOOL CALL (\d+)', line).group(1)
+            spindle_speed = None
+            feedrate = None
+            for subsequent_line in [line] + lines[i+1:]:
+                if subsequent_line != line and re.search(r'TOOL CALL (\d+)', subsequent_line):
+                    break
+                s_match = re.search(r'S(\d+)', subsequent_line)
+                f_match = re.search(r'F(\d+\.?\d*)', subsequent_line)
+                if s_match and spindle_speed is None:
+                    spindle_speed = int(s_match.group(1))
+                if f_match and feedrate is None:
+                    feedrate = float(f_match.group(1))
+            tool_params[current_tool_number] = {'spindle': spindle_speed, 'feedrate': feedrate}
+    return tool_params
+
+
+def tracker_results(lines):
+    """Cutter comp and tool parameters per tool from ToolSegmentTracker"""
+    tracker = ToolSegmentTracker()
+    tool_numbers = []
+    for line_num, line in enumerate(lines, 1):
+        tool_number = tracker.feed(line_num, line)
+        if tool_number:
+            tool_numbers.append(tool_number)
+    cutter_comp_info = {}
+    tool_params = {}
+    for segment in tracker.finish():
+        cutter_comp_info[segment.tool_number] = 'Cutter Comp: On' if segment.compensated else 'Cutter Comp: Off'
+        tool_params[segment.tool_number] = {'spindle': segment.spindle_speed, 'feedrate': segment.feedrate}
+    return tool_numbers, cutter_comp_info, tool_params
+
+
+def test_sample_segments():
+    """Test the segments of test_sample.nc"""
+    print("Testing tool segments of test_sample.nc...")
+    lines = read_sample()
+    segments = track_tool_segments(lines)
+
+    assert [s.tool_number for s in segments] == ['9', '12', '15'], segments
+    assert [(s.start_line, s.end_line) for s in segments] == [(3, 12), (13, 21), (22, 28)], segments
+    assert [s.feedrate for s in segments] == [800.0, 300.0, 500.0], segments
+    assert not any(s.compensated for s in segments), segments
+    assert all(s.spindle_speed is None for s in segments), segments
+
+    print("✓ Sample segments test passed!")
+    return True
+
+
+def test_matches_legacy_loops():
+    """Test the tracker against the old per-script loops"""
+    print("Testing tracker against the old batch script loops...")
+    for name, lines in (('test_sample.nc', read_sample()), ('comp program', COMP_PROGRAM)):
+        tool_numbers, cutter_comp_info, tool_params = tracker_results(lines)
+        assert tool_numbers == [re.search(r'TOOL CALL (\d+)', line).group(1)
+                                for line in lines if 'TOOL CALL' in line], name
+        assert cutter_comp_info == legacy_v25_cutter_comp(lines), f"{name}: {cutter_comp_info}"
+        assert tool_params == legacy_v3_tool_params(lines), f"{name}: {tool_params}"
+
+    _, cutter_comp_info, tool_params = tracker_results(COMP_PROGRAM)
+    assert cutter_comp_info == {'3': 'Cutter Comp: On', '4': 'Cutter Comp: Off', '5': 'Cutter Comp: Off'}
+    assert tool_params == {'3': {'spindle': 9000, 'feedrate': 750.0},
+                           '4': {'spindle': 6000, 'feedrate': 600.0},
+                           '5': {'spindle': 4000, 'feedrate': None}}
+
+    # RR/RL on the TOOL CALL line itself does not switch cutter comp on
+    _, cutter_comp_info, _ = tracker_results(["TOOL CALL 7 Z RL\n", "L X+1\n"])
+    assert cutter_comp_info == {'7': 'Cutter Comp: Off'}
+
+    print("✓ Legacy loop comparison test passed!")
+    return True
+
+
+def run_batch_script(script_name, lines):
+    """Run a batch script on NC lines with a temporary desktop, return its TOOL.LIST lines"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        desktop = os.path.join(temp_dir, 'Desktop')
+        os.makedirs(desktop)
+        with open(os.path.join(desktop, 'TOOL_P.txt'), 'w', encoding='utf-8') as f:
+            f.write(TOOL_P)
+        with open(os.path.join(desktop, 'tool.t'), 'w', encoding='utf-8') as f:
+            f.write(TOOL_T_HEADER + "\n\n")
+            f.writelines(f"{number:<5}{10.0:<11}SEM_06.00_F3\n" for number in range(1, 8))
+        nc_file = os.path.join(temp_dir, 'part.h')
+        with open(nc_file, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+
+        env = dict(os.environ, HOME=temp_dir, USERPROFILE=temp_dir, PYTHONIOENCODING='utf-8')
+        process = subprocess.run([sys.executable, os.path.join(SCRIPTS_DIR, script_name), nc_file, 'M1'],
+                                 env=env, capture_output=True, text=True, encoding='utf-8')
+        assert process.returncode == 0, f"{script_name}: {process.stdout}{process.stderr}"
+        with open(os.path.join(temp_dir, 'part.TOOL.LIST'), 'r', encoding='utf-8') as f:
+            return f.read().splitlines()
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def report_comp(report):
+    """(tool, cutter comp line) pairs of a TOOL.LIST report"""
+    pairs = []
+    tool = None
+    for line in report:
+        if re.match(r'T\d+', line):
+            tool = line.split()[0]
+        elif line.startswith('Cutter Comp'):
+            pairs.append((tool, line))
+    return pairs
+
+
+def test_batch_scripts_use_tracker():
+    """Test the reports of both batch scripts, which track tool segments with ToolSegmentTracker"""
+    print("Testing the batch scripts' tool segment reports...")
+    _, cutter_comp_info, tool_params = tracker_results(SCRIPT_PROGRAM)
+    expected_comp = [(f"T{number}", cutter_comp_info[number]) for number in ['3', '4', '3', '5', '6']]
+    assert cutter_comp_info == legacy_v25_cutter_comp(SCRIPT_PROGRAM), cutter_comp_info
+    assert tool_params == legacy_v3_tool_params(SCRIPT_PROGRAM), tool_params
+
+    report = run_batch_script('Batch_to_ScanV2.5.py', SCRIPT_PROGRAM)
+    assert report_comp(report) == expected_comp, report
+    assert 'T5 < < < Missing Tool' in report and report[-1] == '60% of needed tools are in machine: M1', report
+
+    report = run_batch_script('Batch_to_ScanV3_Experimental.py', SCRIPT_PROGRAM)
+    assert report_comp(report) == expected_comp, report
+    assert report.count('⚠ Warning: Spindle speed unusually low (500 RPM)') == 1, report
+    assert report.count('CUR.TIME: 10.0 mins') == 3, report
+
+    print("✓ Batch script report test passed!")
+    return True
+
+
+def run_all_tests():
+    """Run all tool segment tests"""
+    tests = [test_sample_segments, test_matches_legacy_loops, test_batch_scripts_use_tracker]
+    passed = 0
+    for test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ Test {test_func.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -4,8 +4,8 @@ Analysis Tab for NC Tool Analyzer
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import os
-import re
 import math
+import queue
 import threading
 from typing import Dict, List, Any
 from datetime import datetime
@@ -14,6 +14,11 @@ from models.analysis_result import AnalysisResult, MachineCompatibility
 from models.job import Job
 from models.part import Part
 from utils.event_system import event_system
+from services.nc_program_parser import nc_program_cache
+from services.analysis_queue import AnalysisQueue, DONE, CACHED, FAILED
+
+# How often the UI thread runs callbacks posted from background threads (ms)
+UI_POLL_INTERVAL = 100
 
 
 class NCCycleTimeCalculator:
@@ -44,20 +49,10 @@ class NCCycleTimeCalculator:
         
     def parse_nc_file(self, file_path):
         """Parse NC file and calculate cycle time"""
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            
-        line_number = 0
-        for line in lines:
-            line_number += 1
-            line = line.strip()
-            
-            # Skip empty lines and comments
-            if not line or line.startswith(';') or line.startswith('(') or line.startswith('*'):
-                continue
-                
-            # Process the line
-            self.process_line(line, line_number)
+        program = nc_program_cache.get(file_path)
+        
+        for block in program.blocks:
+            self.process_block(block)
             
         return {
             'total_time': self.total_time,
@@ -67,12 +62,13 @@ class NCCycleTimeCalculator:
             'movements': self.movements
         }
     
-    def process_line(self, line, line_number):
-        """Process a single line of Heidenhain NC code"""
+    def process_block(self, block):
+        """Process a single block of Heidenhain NC code"""
+        line_number = block.line
+        
         # Tool change
-        tool_match = re.search(r'TOOL CALL (\d+)', line)
-        if tool_match:
-            new_tool = tool_match.group(1)
+        if block.tool_call:
+            new_tool = block.tool_call
             if self.current_tool != new_tool:
                 self.current_tool = new_tool
                 self.add_time('tool_change', self.tool_change_time)
@@ -86,17 +82,15 @@ class NCCycleTimeCalculator:
             return
             
         # Feedrate
-        f_match = re.search(r'F(\d+\.?\d*)', line)
-        if f_match:
-            self.current_feedrate = float(f_match.group(1))
+        if block.feed is not None:
+            self.current_feedrate = block.feed
         
         # FMAX (rapid movement)
-        is_rapid = 'FMAX' in line
+        is_rapid = block.rapid
         
         # Dwell
-        dwell_match = re.search(r'DWELL\s+[F](\d+\.?\d*)', line)
-        if dwell_match:
-            dwell_time = float(dwell_match.group(1))
+        if block.dwell is not None:
+            dwell_time = block.dwell
             self.add_time('dwell', dwell_time)
             self.operation_counts['dwell'] += 1
             self.movements.append({
@@ -110,11 +104,10 @@ class NCCycleTimeCalculator:
         new_position = self.current_position.copy()
         has_movement = False
         
-        # Extract X, Y, Z coordinates
-        for axis in ['X', 'Y', 'Z']:
-            axis_match = re.search(rf'{axis}([+-]?\d+\.?\d*)', line)
-            if axis_match:
-                new_position[axis] = float(axis_match.group(1))
+        # X, Y, Z coordinates
+        for axis, value in (('X', block.x), ('Y', block.y), ('Z', block.z)):
+            if value is not None:
+                new_position[axis] = value
                 has_movement = True
                 
         if has_movement:
@@ -197,11 +190,20 @@ class AnalysisTab:
         self.last_cycle_time = None
         self.last_analysis_data = None
         
+        # Batch analysis of many NC files on worker processes
+        self.analysis_queue = AnalysisQueue(analysis_service)
+        self.queue_rows = {}  # file_path -> treeview item id
+        
+        # Callbacks posted by background threads, run on the UI thread
+        self.ui_calls = queue.Queue()
+        self._ui_poll_id = None
+        
         # Setup UI components
         self.setup_ui()
         
         # Subscribe to events
         self._setup_event_handlers()
+        self._process_ui_calls()
         
     def setup_ui(self):
         """Set up the UI components"""
@@ -232,6 +234,7 @@ class AnalysisTab:
         
         ttk.Button(button_frame, text="🔄 Refresh All Machines", command=self.refresh_all_machines).pack(side=tk.LEFT, padx=(0,10))
         ttk.Button(button_frame, text="🔍 Check Machine Compatibility", command=self.analyze_nc_file).pack(side=tk.LEFT, padx=(0,10))
+        ttk.Button(button_frame, text="📂 Batch Analyze Files", command=self.batch_analyze_files).pack(side=tk.LEFT, padx=(0,10))
         ttk.Button(button_frame, text="⏱️ Calculate Cycle Time", command=self.calculate_cycle_time).pack(side=tk.LEFT, padx=(0,10))
         ttk.Button(button_frame, text="📊 Advanced NC Analysis", command=self.calculate_material_removal_rates).pack(side=tk.LEFT, padx=(0,10))
         ttk.Button(button_frame, text="�️ Create Job from File", command=self.create_job_from_file).pack(side=tk.LEFT)
@@ -243,6 +246,38 @@ class AnalysisTab:
         self.progress = ttk.Progressbar(file_frame, mode='indeterminate')
         self.progress.pack(fill=tk.X, pady=5)
         
+        # Batch analysis queue
+        queue_frame = ttk.LabelFrame(self.frame, text="Batch Analysis Queue", padding=10)
+        queue_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        columns = ('file', 'priority', 'status', 'tools', 'best_machine')
+        self.queue_tree = ttk.Treeview(queue_frame, columns=columns, show='headings', height=6)
+        self.queue_tree.heading('file', text='File')
+        self.queue_tree.heading('priority', text='Priority')
+        self.queue_tree.heading('status', text='Status')
+        self.queue_tree.heading('tools', text='Tools')
+        self.queue_tree.heading('best_machine', text='Best Machine')
+        self.queue_tree.column('file', width=300)
+        self.queue_tree.column('priority', width=70, anchor=tk.CENTER)
+        self.queue_tree.column('status', width=90, anchor=tk.CENTER)
+        self.queue_tree.column('tools', width=60, anchor=tk.CENTER)
+        self.queue_tree.column('best_machine', width=250)
+        self.queue_tree.bind('<<TreeviewSelect>>', self._on_queue_select)
+        
+        queue_scrollbar = ttk.Scrollbar(queue_frame, orient="vertical", command=self.queue_tree.yview)
+        self.queue_tree.configure(yscrollcommand=queue_scrollbar.set)
+        
+        queue_button_frame = ttk.Frame(queue_frame)
+        queue_button_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=(10,0))
+        
+        ttk.Button(queue_button_frame, text="⬆️ Prioritize", command=self.prioritize_selected_files).pack(fill=tk.X, pady=2)
+        ttk.Button(queue_button_frame, text="✖ Cancel Selected", command=self.cancel_selected_files).pack(fill=tk.X, pady=2)
+        ttk.Button(queue_button_frame, text="✖ Cancel All", command=self.cancel_all_files).pack(fill=tk.X, pady=2)
+        ttk.Button(queue_button_frame, text="🧹 Clear Finished", command=self.clear_finished_files).pack(fill=tk.X, pady=2)
+        
+        self.queue_tree.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        queue_scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+        
         # Quick Results Summary with Machine Cards
         self.summary_frame = ttk.LabelFrame(self.frame, text="Machine Compatibility Summary", padding=10)
         self.summary_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
@@ -287,6 +322,10 @@ class AnalysisTab:
         # Update UI when analysis is complete
         event_system.subscribe("analysis_complete", self.display_summary)
         
+        # Stream batch analysis progress and results (published from background threads)
+        event_system.subscribe("analysis_queue_updated",
+                               lambda item: self._run_on_ui_thread(lambda: self._queue_item_updated(item)))
+        
         # Update UI when machines are updated
         event_system.subscribe("machines_loaded", lambda _: self.update_status("Machines loaded"))
         event_system.subscribe("machine_updated", lambda _: self.update_status("Machine updated"))
@@ -400,6 +439,149 @@ class AnalysisTab:
         self.update_status("Analysis failed")
         messagebox.showerror("Analysis Error", f"Failed to analyze NC file:\n{error_msg}")
         
+    def batch_analyze_files(self):
+        """Queue several NC files for analysis on worker processes"""
+        filenames = filedialog.askopenfilenames(
+            title="Select NC Files",
+            filetypes=[
+                ("NC files", "*.nc *.txt *.cnc *.prg *.h"),
+                ("Heidenhain files", "*.h"),
+                ("All files", "*.*")
+            ]
+        )
+        if not filenames:
+            return
+        
+        machines = self.machine_service.get_all_machines()
+        if not machines:
+            messagebox.showwarning("Warning", "No machines configured")
+            return
+        
+        # Ask once for the whole batch
+        refresh_tools = messagebox.askyesno(
+            "Refresh Tool Data",
+            f"Download fresh tool data from all machines before analyzing {len(filenames)} files?\n\n" +
+            "Click 'Yes' for fresh data (recommended)\n" +
+            "Click 'No' to use existing data"
+        )
+        
+        self.progress.start()
+        
+        # Use a separate thread to avoid blocking the UI
+        self._start_background_task(lambda: self._batch_analyze_task(list(filenames), refresh_tools))
+        
+    def _batch_analyze_task(self, filenames, refresh_tools):
+        """Background task for queueing NC files"""
+        try:
+            if refresh_tools:
+                self._run_on_ui_thread(lambda: self.update_status("Downloading tool data from all machines..."))
+                success_count, total_count = self.analysis_service._refresh_all_machines()
+                self.analysis_queue.download_info = f"Tool data refreshed from {success_count}/{total_count} machines"
+            else:
+                self.analysis_queue.download_info = "Using existing tool data (not refreshed)"
+            
+            self._run_on_ui_thread(lambda: self.update_status(f"Queueing {len(filenames)} NC files..."))
+            for file_path in filenames:
+                self.analysis_queue.submit(file_path)
+                
+        except Exception as e:
+            error_msg = str(e)
+            self._run_on_ui_thread(lambda: self._batch_analyze_error(error_msg))
+        finally:
+            self._run_on_ui_thread(self._batch_queueing_finished)
+            
+    def _batch_analyze_error(self, error_msg):
+        """Called when queueing a batch fails"""
+        self.update_status("Batch analysis failed")
+        messagebox.showerror("Batch Analysis Error", f"Failed to queue NC files:\n{error_msg}")
+        
+    def _batch_queueing_finished(self):
+        """Stop the progress bar once queueing ended, unless queued files are still being analyzed"""
+        if all(item.is_finished for item in self.analysis_queue.get_items()):
+            self.progress.stop()
+        
+    def _queue_item_updated(self, item):
+        """
+        Show a batch analysis status change (runs on the UI thread)
+        
+        Args:
+            item: QueuedAnalysis that changed
+        """
+        tools = ''
+        best_machine = ''
+        if item.result:
+            tools = item.result.total_tools
+            best = item.result.best_machine
+            if best:
+                best_machine = f"{best.machine_name} ({best.match_percentage}%)"
+        elif item.status == FAILED:
+            best_machine = item.error or ''
+        
+        values = (item.file_name, item.priority, item.status, tools, best_machine)
+        row = self.queue_rows.get(item.file_path)
+        if row and self.queue_tree.exists(row):
+            self.queue_tree.item(row, values=values)
+        else:
+            self.queue_rows[item.file_path] = self.queue_tree.insert('', tk.END, values=values)
+        
+        # Stream each finished result to the summary and Results tab
+        if item.status in (DONE, CACHED) and item.result:
+            self.analysis_service.current_analysis = item.result
+            event_system.publish("analysis_complete", item.result)
+        
+        items = self.analysis_queue.get_items()
+        finished = sum(1 for queued in items if queued.is_finished)
+        self.update_status(f"Batch analysis: {finished}/{len(items)} files finished")
+        if finished == len(items):
+            self.progress.stop()
+        
+    def _selected_queue_paths(self):
+        """Get the file paths of the selected queue rows"""
+        selected = set(self.queue_tree.selection())
+        return [path for path, row in self.queue_rows.items() if row in selected]
+        
+    def _on_queue_select(self, event):
+        """Show the summary of a finished file when its row is selected"""
+        paths = self._selected_queue_paths()
+        if len(paths) != 1:
+            return
+        for item in self.analysis_queue.get_items():
+            if item.file_path == paths[0] and item.result:
+                self.display_summary(item.result)
+                
+    def prioritize_selected_files(self):
+        """Move the selected pending files to the front of the queue"""
+        top_priority = max((item.priority for item in self.analysis_queue.get_items()), default=0)
+        for file_path in self._selected_queue_paths():
+            self.analysis_queue.prioritize(file_path, top_priority + 1)
+            
+    def cancel_selected_files(self):
+        """Cancel the analysis of the selected files"""
+        for file_path in self._selected_queue_paths():
+            self.analysis_queue.cancel(file_path)
+            
+    def cancel_all_files(self):
+        """Cancel all pending and running files"""
+        cancelled = self.analysis_queue.cancel_all()
+        self.update_status(f"Cancelled {cancelled} files")
+        
+    def clear_finished_files(self):
+        """Remove finished files from the queue list"""
+        self.analysis_queue.clear_finished()
+        remaining = {item.file_path for item in self.analysis_queue.get_items()}
+        for file_path in list(self.queue_rows):
+            if file_path not in remaining:
+                row = self.queue_rows.pop(file_path)
+                if self.queue_tree.exists(row):
+                    self.queue_tree.delete(row)
+                    
+    def shutdown(self):
+        """Stop the batch analysis worker processes"""
+        if self._ui_poll_id is not None:
+            self.frame.after_cancel(self._ui_poll_id)
+            self._ui_poll_id = None
+        self.analysis_queue.shutdown()
+        
     def display_summary(self, analysis_result: AnalysisResult):
         """
         Display machine cards in Analysis tab
@@ -1111,6 +1293,27 @@ class AnalysisTab:
             self.jms_service
         )
         
+    def _run_on_ui_thread(self, callback):
+        """
+        Run a callback on the UI thread (safe to call from any thread)
+        
+        Args:
+            callback: Function without arguments that updates widgets
+        """
+        self.ui_calls.put(callback)
+        
+    def _process_ui_calls(self):
+        """Run the callbacks posted by background threads, then poll again"""
+        try:
+            while True:
+                try:
+                    callback = self.ui_calls.get_nowait()
+                except queue.Empty:
+                    break
+                callback()
+        finally:
+            self._ui_poll_id = self.frame.after(UI_POLL_INTERVAL, self._process_ui_calls)
+        
     def _start_background_task(self, task_func):
         """
         Start a background task in a separate thread
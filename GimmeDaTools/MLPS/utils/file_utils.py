@@ -3,6 +3,7 @@ File utilities for NC Tool Analyzer
 """
 import os
 import json
+import hashlib
 from pathlib import Path
 from typing import Dict, Any, Optional
 
@@ -145,4 +146,22 @@ def write_text_file(file_path: str, content: str, encoding: str = 'utf-8') -> bo
         return True
     except Exception as e:
         print(f"Error writing file {file_path}: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+def file_content_hash(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 hash of a file's contents
+    
+    Args:
+        file_path: Path to the file
+        block_size: Bytes read at a time
+        
+    Returns:
+        Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+Tool segment tracking for NC Tool Analyzer
+Splits an NC file into tool segments in one forward pass
+"""
+import re
+from typing import Iterable, List, Optional
+
+from models.nc_program import ToolSegment
+
+
+TOOL_CALL_PATTERN = re.compile(r'TOOL CALL (\d+)')
+SPINDLE_PATTERN = re.compile(r'S(\d+)')
+FEED_PATTERN = re.compile(r'F(\d+(?:\.\d*)?)')
+
+
+class ToolSegmentTracker:
+    """
+    Forward-only state machine over the lines of an NC file
+
+    Every TOOL CALL (anywhere in a line) starts a new segment that runs until
+    the next one. Each line is looked at once, so the cost is linear in the
+    file length however many tools are called.
+    """
+    def __init__(self):
+        """Initialize the tracker"""
+        self.segments: List[ToolSegment] = []
+        self.current: Optional[ToolSegment] = None
+        self.line_count = 0
+
+    def feed(self, line_num: int, line: str) -> Optional[str]:
+        """
+        Process the next line
+
+        Args:
+            line_num: 1-based line number
+            line: Raw NC line
+
+        Returns:
+            The called tool number if the line is a TOOL CALL, else None
+        """
+        self.line_count = line_num
+        segment = self.current
+
+        tool_call_match = 'TOOL CALL' in line and TOOL_CALL_PATTERN.search(line)
+        if tool_call_match:
+            tool_number = tool_call_match.group(1)
+            if segment:
+                segment.end_line = line_num - 1
+            segment = ToolSegment(tool_number=tool_number, start_line=line_num, end_line=line_num)
+            self.segments.append(segment)
+            self.current = segment
+        elif segment is None:
+            return None
+        elif not segment.compensated and (' RR' in line or ' RL' in line):
+            segment.compensated = True
+
+        # S and F are also read from the call line itself (TOOL CALL 5 Z S12000 F500)
+        if segment.spindle_speed is None and 'S' in line:
+            s_match = SPINDLE_PATTERN.search(line)
+            if s_match:
+                segment.spindle_speed = int(s_match.group(1))
+        if segment.feedrate is None and 'F' in line:
+            f_match = FEED_PATTERN.search(line)
+            if f_match:
+                segment.feedrate = float(f_match.group(1))
+
+        return tool_call_match.group(1) if tool_call_match else None
+
+    def finish(self) -> List[ToolSegment]:
+        """
+        Close the last segment at the last line fed
+
+        Returns:
+            All tool segments in file order
+        """
+        if self.current:
+            self.current.end_line = self.line_count
+        return self.segments
+
+
+def track_tool_segments(lines: Iterable[str]) -> List[ToolSegment]:
+    """
+    Split NC lines into tool segments
+
+    Args:
+        lines: Raw NC lines
+
+    Returns:
+        Tool segments in file order
+    """
+    tracker = ToolSegmentTracker()
+    for line_num, line in enumerate(lines, 1):
+        tracker.feed(line_num, line)
+    return tracker.finish()
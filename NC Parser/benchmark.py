@@ -1,120 +1,485 @@
 #!/usr/bin/env python3
 """
-Performance benchmark script for NC Parser multithreading
+Performance benchmarks for NC Parser
+
+Without options, runs the in-process suite on synthetic G-code and
+Heidenhain programs and writes the results as JSON (see --help).
 """
 import time
-import subprocess
+import json
 import sys
 import os
+import argparse
+
+# Add src directory to path for in-process benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+# Stages timed by the in-process benchmark suite
+SUITE_STAGES = ('parse', 'path', 'cycle_time', 'stock', 'removal', 'export')
+
+# Relative slowdown reported as a regression by --compare
+REGRESSION_THRESHOLD = 1.2
 
-def run_benchmark(file_path, threads, resolution=1.0):
-    """Run a benchmark with specified parameters."""
-    print(f"\n=== Benchmark: {threads} threads, resolution {resolution} ===")
+def create_synthetic_program(num_moves, arc_fraction=0.2, heidenhain=False, seed=0):
+    """
+    Create the text of a geometrically valid pocketing program.
     
-    start_time = time.time()
+    Moves advance across a 100 x 60 mm area in layers 1 mm apart; each move is
+    a half-circle arc with probability `arc_fraction`, else a straight cut.
+    """
+    import numpy as np
     
-    try:
-        cmd = [
-            sys.executable, "main.py", file_path,
-            "--threads", str(threads),
-            "--fast",
-            "--no-viz",
-            "--resolution", str(resolution)
-        ]
+    rng = np.random.default_rng(seed)
+    if heidenhain:
+        lines = ["BEGIN PGM SYNTHETIC MM",
+                 "BLK FORM 0.1 Z X-5 Y-5 Z-50",
+                 "BLK FORM 0.2 X+115 Y+65 Z+0",
+                 "* - BEM_06.00_P15-120_L19O25_0.00AL3 T1",
+                 "TOOL CALL 1 Z S8000",
+                 "L X+0.0000 Y+0.0000 Z+5.0000 FMAX",
+                 "L Z-1.0000 F300"]
+    else:
+        lines = ["G21 G90", "T1 M06", "S8000 M03", "G00 X0.0000 Y0.0000 Z5.0000", "G01 Z-1.0000 F300"]
+    
+    x, y, z = 0.0, 0.0, -1.0
+    for _ in range(num_moves):
+        if x > 100.0:
+            # Next layer: retract, return to the start and plunge 1 mm deeper
+            x, z = 0.0, z - 1.0
+            if heidenhain:
+                lines += ["L Z+5.0000 FMAX", f"L X+0.0000 Y{y:+.4f} FMAX", f"L Z{z:+.4f} F300"]
+            else:
+                lines += ["G00 Z5.0000", f"G00 X0.0000 Y{y:.4f}", f"G01 Z{z:.4f} F300"]
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+        if rng.random() < arc_fraction:
+            radius = rng.uniform(0.5, 3.0)
+            clockwise = rng.random() < 0.5
+            if heidenhain:
+                lines.append(f"CC X{x + radius:+.4f} Y{y:+.4f}")
+                lines.append(f"C X{x + 2 * radius:+.4f} Y{y:+.4f} DR{'-' if clockwise else '+'} F800")
+            else:
+                lines.append(f"G0{2 if clockwise else 3} X{x + 2 * radius:.4f} Y{y:.4f} I{radius:.4f} J0.0000 F800")
+            x += 2 * radius
+        else:
+            x += rng.uniform(0.0, 2.0)
+            y = rng.uniform(0.0, 60.0)
+            if heidenhain:
+                lines.append(f"L X{x:+.4f} Y{y:+.4f} F1200")
+            else:
+                lines.append(f"G01 X{x:.4f} Y{y:.4f} F1200")
+    
+    lines.append("END PGM SYNTHETIC MM" if heidenhain else "M30")
+    return "\n".join(lines) + "\n"
+
+def measure(function, repeat=1, trace_memory=True):
+    """
+    Time `function` in-process and record its peak traced memory.
+    
+    The time is the best of `repeat` untraced runs (tracemalloc slows
+    allocation-heavy code); the peak memory comes from one extra traced run.
+    
+    Returns:
+        (result, seconds, peak_bytes)
+    """
+    import contextlib
+    import io
+    import tracemalloc
+    
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start_time = time.perf_counter()
+            result = function()
+            best = min(best, time.perf_counter() - start_time)
+    
+    peak = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = function()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, best, peak
+
+def run_suite(sizes=(1000, 10000), arc_fraction=0.2, formats=('gcode', 'heidenhain'), resolution=0.5,
+              repeat=1, trace_memory=True, output=None):
+    """
+    Benchmark parse, path, cycle time, stock and removal simulation and export in-process.
+    
+    Returns:
+        Benchmark report (dict); also written as JSON to `output` if given
+    """
+    import contextlib
+    import io
+    import platform
+    import tempfile
+    import numpy as np
+    from gcode_parser import GCodeParser
+    from path_calculator import PathCalculator
+    from point_cloud import PointCloudGenerator
+    from stock_model import DexelStock
+    from point_io import save_points
+    
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'settings': {'sizes': list(sizes), 'arc_fraction': arc_fraction, 'formats': list(formats),
+                     'resolution': resolution, 'repeat': repeat},
+        'results': []
+    }
+    
+    with tempfile.TemporaryDirectory() as directory:
+        for program_format in formats:
+            heidenhain = program_format == 'heidenhain'
+            for size in sizes:
+                file_path = os.path.join(directory, f"synthetic_{size}{'.h' if heidenhain else '.nc'}")
+                with open(file_path, 'w') as f:
+                    f.write(create_synthetic_program(size, arc_fraction, heidenhain))
+                
+                with contextlib.redirect_stdout(io.StringIO()):
+                    parser = GCodeParser()
+                    calculator = PathCalculator(resolution=resolution)
+                    generator = PointCloudGenerator()
+                
+                def record(stage, function, items):
+                    result, seconds, peak = measure(function, repeat, trace_memory)
+                    count = items(result)
+                    report['results'].append({
+                        'format': program_format, 'moves': size, 'stage': stage, 'seconds': seconds,
+                        'peak_bytes': peak, 'items': count, 'items_per_second': count / seconds if seconds else None
+                    })
+                    memory = f", peak {peak / 2**20:.1f} MB" if peak is not None else ""
+                    print(f"{program_format:<10} {size:>9,} moves  {stage:<10} {seconds:8.3f}s{memory}")
+                    return result
+                
+                commands = record('parse', lambda: parser.parse_file(file_path), len)
+                path_points = record('path', lambda: calculator.calculate_tool_path(commands), len)
+                record('cycle_time', lambda: calculator.estimate_cycle_time(commands), lambda profile: len(profile.times))
+                
+                lower = path_points.min(axis=0) - 3.0
+                upper = path_points.max(axis=0) + 3.0
+                bounds = tuple(zip(lower, upper))
+                stock_bounds = parser.get_stock_bounds() or bounds
+                record('stock', lambda: DexelStock(stock_bounds, resolution=0.5).carve_commands(
+                    commands, parser.get_tools(), resolution, 6.0), lambda _: len(path_points))
+                
+                with contextlib.redirect_stdout(io.StringIO()):
+                    workpiece = generator.create_workpiece_points(bounds, resolution=1.5)
+                final_part = record('removal', lambda: generator.simulate_removal_simple(workpiece, path_points, 3.0),
+                                    lambda _: len(workpiece))
+                export_path = os.path.join(directory, 'final_part.ply')
+                record('export', lambda: save_points(final_part, export_path), lambda _: len(final_part))
+    
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Benchmark results written to {output}")
+    return report
+
+def compare_reports(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Compare two suite reports stage by stage.
+    
+    Returns:
+        List of (format, moves, stage, baseline_seconds, current_seconds) regressions
+        slower than `threshold` times the baseline
+    """
+    previous = {(r['format'], r['moves'], r['stage']): r for r in baseline['results']}
+    regressions = []
+    print(f"\n{'Format':<10} {'Moves':>9} {'Stage':<10} {'Baseline':>9} {'Current':>9} {'Ratio':>6}")
+    for result in current['results']:
+        key = (result['format'], result['moves'], result['stage'])
+        if key not in previous:
+            continue
+        before, after = previous[key]['seconds'], result['seconds']
+        ratio = after / before if before else float('inf')
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{key[0]:<10} {key[1]:>9,} {key[2]:<10} {before:8.3f}s {after:8.3f}s {ratio:5.2f}x{flag}")
+        if ratio > threshold:
+            regressions.append((*key, before, after))
+    if not any((r['format'], r['moves'], r['stage']) in previous for r in current['results']):
+        print("No stages in common with the baseline")
+    return regressions
+
+def create_synthetic_commands(num_blocks):
+    """Create a zig-zag program of linear moves and half-circle arcs."""
+    from gcode_parser import GCodeCommand
+    
+    commands = [GCodeCommand("G00", 0, 0, 5), GCodeCommand("G01", 0, 0, -1, f=500)]
+    x = 0.0
+    for block in range(num_blocks):
+        y = 50.0 if block % 2 == 0 else 0.0
+        commands.append(GCodeCommand("G01", x, y, -1))
+        # Half circle of radius 2.5 to the next pass
+        arc = "G02" if block % 2 == 0 else "G03"
+        commands.append(GCodeCommand(arc, x + 5.0, y, -1, 2.5, 0))
+        x += 5.0
+    return commands
+
+def create_synthetic_lines(num_lines, heidenhain=False):
+    """Create program text lines with a realistic mix of moves, arcs and comments."""
+    lines = []
+    for n in range(num_lines):
+        x, y, z = (n % 97) * 1.25, (n % 53) * 0.75, -(n % 7) * 0.5
+        kind = n % 10
+        if heidenhain:
+            if kind == 0:
+                lines.append("; finishing pass")
+            elif kind == 1:
+                lines.append(f"L X{x:+.4f} Y{y:+.4f} Z{z:+.4f} FMAX")
+            elif kind == 2:
+                lines.append(f"CC X{x:+.4f} Y{y:+.4f}")
+            elif kind == 3:
+                lines.append(f"C X{x + 2:+.4f} Y{y:+.4f} DR- F800")
+            else:
+                lines.append(f"L X{x:+.4f} Y{y:+.4f} F1200")
+        else:
+            if kind == 0:
+                lines.append("(finishing pass)")
+            elif kind == 1:
+                lines.append(f"G00 X{x:.4f} Y{y:.4f} Z{z:.4f}")
+            elif kind == 3:
+                lines.append(f"G02 X{x + 2:.4f} Y{y:.4f} I1.0 J0.0 F800 ; arc")
+            else:
+                lines.append(f"G01 X{x:.4f} Y{y:.4f} F1200")
+    return lines
+
+def run_tokenizer_benchmark(num_lines=200000):
+    """Measure line parsing throughput for G-code and Heidenhain programs."""
+    from gcode_parser import GCodeParser
+    
+    print(f"\n=== Tokenizer benchmark: {num_lines:,} lines ===")
+    results = {}
+    for label, heidenhain in (("G-code", False), ("Heidenhain", True)):
+        lines = create_synthetic_lines(num_lines, heidenhain)
+        parser = GCodeParser()
+        parse = parser.parse_heidenhain_line if heidenhain else parser.parse_line
         
-        elapsed = time.time() - start_time
+        start_time = time.perf_counter()
+        for line in lines:
+            parse(line)
+        elapsed = time.perf_counter() - start_time
         
-        if result.returncode == 0:
-            # Extract performance info from output
-            lines = result.stdout.split('\n')
-            path_time = None
-            material_time = None
-            total_commands = None
-            total_points = None
-            
-            for line in lines:
-                if "Path calculation completed in" in line:
-                    path_time = float(line.split("in ")[1].split("s")[0])
-                elif "Material removal completed in" in line:
-                    material_time = float(line.split("in ")[1].split("s")[0])
-                elif "Found " in line and "total commands" in line:
-                    total_commands = int(line.split("Found ")[1].split(" total")[0])
-                elif "Generated " in line and "tool path points" in line:
-                    total_points = int(line.split("Generated ")[1].split(" tool")[0])
-            
-            print(f"Total time: {elapsed:.2f}s")
-            if path_time:
-                print(f"Path calculation: {path_time:.2f}s")
-            if material_time:
-                print(f"Material removal: {material_time:.2f}s")
-            if total_commands:
-                print(f"Commands processed: {total_commands:,}")
-            if total_points:
-                print(f"Points generated: {total_points:,}")
-                if total_commands:
-                    print(f"Commands/second: {total_commands/elapsed:.0f}")
-                    print(f"Points/second: {total_points/elapsed:.0f}")
-            
-            return elapsed, path_time, material_time
-        else:
-            print(f"Error: {result.stderr}")
-            return None, None, None
-            
-    except subprocess.TimeoutExpired:
-        print("Benchmark timed out (5 minutes)")
-        return None, None, None
-    except Exception as e:
-        print(f"Benchmark failed: {e}")
-        return None, None, None
+        results[label] = num_lines / elapsed
+        print(f"{label}: {elapsed:.3f}s, {num_lines / elapsed:,.0f} lines/sec")
+    
+    return results
+
+def run_interpolation_benchmark(num_blocks=2000, resolution=0.1, workers=1):
+    """Compare batch interpolation against the per-point reference implementation."""
+    import numpy as np
+    from path_calculator import PathCalculator
+    
+    print(f"\n=== Interpolation benchmark: {num_blocks * 2} motion commands, resolution {resolution} ===")
+    commands = create_synthetic_commands(num_blocks)
+    calculator = PathCalculator(resolution=resolution)
+    
+    start_time = time.perf_counter()
+    reference = calculator._calculate_path_sequential(commands)
+    reference_time = time.perf_counter() - start_time
+    
+    start_time = time.perf_counter()
+    points = calculator.calculate_tool_path(commands)
+    batch_time = time.perf_counter() - start_time
+    
+    reference = np.array(reference).reshape(-1, 3)
+    max_error = np.abs(points - reference).max() if points.shape == reference.shape else float('inf')
+    
+    print(f"Points generated: {len(points):,}")
+    print(f"Per-point interpolation: {reference_time:.3f}s")
+    print(f"Batch interpolation: {batch_time:.3f}s")
+    print(f"Speedup: {reference_time / batch_time:.1f}x")
+    print(f"Max deviation: {max_error:.2e} mm")
+    
+    if workers > 1:
+        calculator.num_threads = workers
+        calculator.parallel_threshold = 0
+        start_time = time.perf_counter()
+        parallel_points = calculator.calculate_tool_path(commands)
+        parallel_time = time.perf_counter() - start_time
+        
+        parallel_error = np.abs(parallel_points - points).max() if parallel_points.shape == points.shape else float('inf')
+        print(f"Parallel interpolation ({workers} processes): {parallel_time:.3f}s")
+        print(f"Parallel speedup over batch: {batch_time / parallel_time:.1f}x")
+        print(f"Parallel max deviation: {parallel_error:.2e} mm")
+        max_error = max(max_error, parallel_error)
+    
+    return reference_time, batch_time, max_error
+
+def run_removal_benchmark(num_blocks=10, resolution=0.1, workpiece_resolution=1.0, tool_radius=3.0):
+    """Compare grid-indexed material removal with the old capped per-pair removal."""
+    import numpy as np
+    from path_calculator import PathCalculator
+    from point_cloud import PointCloudGenerator
+    from spatial_index import points_within_radius
+    
+    commands = create_synthetic_commands(num_blocks)
+    path_points = PathCalculator(resolution=resolution).calculate_tool_path(commands)
+    
+    lower = path_points.min(axis=0) - tool_radius
+    upper = path_points.max(axis=0) + tool_radius
+    axes = [np.arange(lo, hi + workpiece_resolution, workpiece_resolution) for lo, hi in zip(lower, upper)]
+    workpiece = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+    
+    print(f"\n=== Removal benchmark: {len(workpiece):,} workpiece points, {len(path_points):,} tool points ===")
+    
+    # Exact answer by brute force over all pairs, in blocks to bound memory
+    start_time = time.perf_counter()
+    exact = np.zeros(len(workpiece), dtype=bool)
+    block = max(1, 4_000_000 // len(path_points))
+    for lo in range(0, len(workpiece), block):
+        diff = workpiece[lo:lo + block, None, :] - path_points[None, :, :]
+        exact[lo:lo + block] = (np.sqrt((diff ** 2).sum(axis=2)) <= tool_radius).any(axis=1)
+    brute_time = time.perf_counter() - start_time
+    
+    start_time = time.perf_counter()
+    removed = points_within_radius(workpiece, path_points, tool_radius)
+    grid_time = time.perf_counter() - start_time
+    mismatches = int(np.count_nonzero(removed != exact))
+    
+    # Old behaviour: 8000 sampled workpiece points against 1000 strided tool points
+    rng = np.random.default_rng(0)
+    sample = np.sort(rng.choice(len(workpiece), min(8000, len(workpiece)), replace=False))
+    sampled_tool = path_points[::max(1, len(path_points) // 1000)]
+    generator = PointCloudGenerator()
+    start_time = time.perf_counter()
+    with open(os.devnull, 'w') as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            old_remaining = generator._simulate_removal_sequential(list(workpiece[sample]), sampled_tool, tool_radius)
+        finally:
+            sys.stdout = stdout
+    old_time = time.perf_counter() - start_time
+    old_removed = np.ones(len(sample), dtype=bool)
+    if old_remaining:
+        kept = {tuple(point) for point in old_remaining}
+        old_removed = np.array([tuple(point) not in kept for point in workpiece[sample]])
+    old_errors = int(np.count_nonzero(old_removed != exact[sample]))
+    
+    print(f"Brute force (all pairs): {brute_time:.3f}s")
+    print(f"Grid index (all points): {grid_time:.3f}s, {mismatches} mismatches vs brute force")
+    print(f"Old capped removal ({len(sample)} x {len(sampled_tool)} points): {old_time:.3f}s, "
+          f"{old_errors} wrong ({100 * old_errors / len(sample):.1f}%)")
+    print(f"Removed {np.count_nonzero(removed):,} of {len(workpiece):,} points")
+    
+    return grid_time, old_time, mismatches
+
+def create_synthetic_table(num_blocks):
+    """create_synthetic_commands as a CommandTable built directly from arrays (for millions of moves)."""
+    import numpy as np
+    from command_table import CommandTable, MOTION_OPCODES, OPCODE_DTYPE
+    
+    block = np.arange(num_blocks)
+    x = 5.0 * block
+    y = np.where(block % 2 == 0, 50.0, 0.0)
+    values = np.full((7, 2 + 2 * num_blocks), np.nan)
+    values[:3, 0] = (0, 0, 5)
+    values[:3, 1] = (0, 0, -1)
+    values[6, 1] = 500
+    values[0, 2::2], values[1, 2::2], values[2, 2::2] = x, y, -1
+    values[0, 3::2], values[1, 3::2], values[2, 3::2] = x + 5.0, y, -1
+    values[3, 3::2], values[4, 3::2] = 2.5, 0
+    opcodes = np.empty(values.shape[1], dtype=OPCODE_DTYPE)
+    opcodes[:2] = (MOTION_OPCODES['G00'], MOTION_OPCODES['G01'])
+    opcodes[2::2] = MOTION_OPCODES['G01']
+    opcodes[3::2] = np.where(block % 2 == 0, MOTION_OPCODES['G02'], MOTION_OPCODES['G03'])
+    return CommandTable(values=values, opcodes=opcodes, heidenhain=np.zeros(len(opcodes), dtype=bool))
+
+def run_cycle_time_benchmark(num_segments=2_000_000):
+    """Time the kinematic cycle-time estimate on a program with millions of segments."""
+    from path_calculator import PathCalculator
+    
+    calculator = PathCalculator(resolution=1.0)
+    small = create_synthetic_commands(1000)
+    simple = calculator.calculate_machining_time(small)
+    kinematic = calculator.estimate_cycle_time(small).total_minutes
+    print(f"\n=== Cycle time benchmark ===")
+    print(f"{len(small):,} commands: simple model {simple:.2f} min, kinematic model {kinematic:.2f} min")
+    
+    table = create_synthetic_table(num_segments // 2)
+    start_time = time.perf_counter()
+    profile = calculator.estimate_cycle_time(table)
+    elapsed = time.perf_counter() - start_time
+    print(f"{len(profile.times):,} segments planned in {elapsed:.2f}s "
+          f"({len(profile.times) / elapsed:,.0f} segments/s), cycle time {profile.total_minutes:.1f} min")
+    return elapsed
 
 def main():
     """Run performance benchmarks."""
-    print("NC Parser Multithreading Performance Benchmark")
-    print("=" * 50)
+    arg_parser = argparse.ArgumentParser(description="NC Parser performance benchmarks")
+    arg_parser.add_argument("--interpolation", action='store_true',
+                            help="Benchmark batch path interpolation against the per-point implementation")
+    arg_parser.add_argument("--tokenizer", action='store_true',
+                            help="Benchmark line parsing throughput (lines/sec)")
+    arg_parser.add_argument("--lines", type=int, default=200000,
+                            help="Number of synthetic lines for the tokenizer benchmark (default: 200000)")
+    arg_parser.add_argument("--blocks", type=int, default=2000,
+                            help="Number of zig-zag blocks in the synthetic program (default: 2000)")
+    arg_parser.add_argument("--workers", type=int, default=1,
+                            help="Also time parallel interpolation with this many processes (default: 1)")
+    arg_parser.add_argument("--removal", action='store_true',
+                            help="Benchmark grid-indexed material removal against the old capped removal")
+    arg_parser.add_argument("--cycle-time", action='store_true',
+                            help="Benchmark the kinematic cycle-time estimator on millions of segments")
+    arg_parser.add_argument("--segments", type=int, default=2_000_000,
+                            help="Number of segments for the cycle-time benchmark (default: 2000000)")
+    arg_parser.add_argument("--sizes", type=int, nargs='+', default=[1000, 10000],
+                            help="Suite: program sizes in motion commands (default: 1000 10000)")
+    arg_parser.add_argument("--arc-fraction", type=float, default=0.2,
+                            help="Suite: fraction of moves that are arcs (default: 0.2)")
+    arg_parser.add_argument("--formats", nargs='+', choices=['gcode', 'heidenhain'], default=['gcode', 'heidenhain'],
+                            help="Suite: program formats to generate (default: both)")
+    arg_parser.add_argument("--resolution", type=float, default=0.5,
+                            help="Suite: path resolution in mm (default: 0.5)")
+    arg_parser.add_argument("--repeat", type=int, default=1,
+                            help="Suite: timed runs per stage, the best is reported (default: 1)")
+    arg_parser.add_argument("--no-memory", action='store_true',
+                            help="Suite: skip the tracemalloc peak memory runs")
+    arg_parser.add_argument("--output", type=str, default="benchmark_results.json",
+                            help="Suite: JSON results file (default: benchmark_results.json)")
+    arg_parser.add_argument("--compare", type=str,
+                            help="Suite: baseline JSON results to compare against; exits 1 on regressions")
+    arg_parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                            help=f"Suite: slowdown ratio counted as a regression (default: {REGRESSION_THRESHOLD})")
+    args = arg_parser.parse_args()
     
-    # Check if sample file exists
-    test_file = "sample_nc_file.H"
-    if not os.path.exists(test_file):
-        print(f"Error: Test file '{test_file}' not found")
-        return 1
+    if args.cycle_time:
+        run_cycle_time_benchmark(args.segments)
+        return 0
     
-    # Test different thread counts
-    thread_counts = [1, 2, 4, 8]
-    results = []
+    if args.removal:
+        _, _, mismatches = run_removal_benchmark()
+        return 0 if mismatches == 0 else 1
     
-    for threads in thread_counts:
-        total_time, path_time, material_time = run_benchmark(test_file, threads)
-        if total_time:
-            results.append((threads, total_time, path_time, material_time))
+    if args.tokenizer:
+        run_tokenizer_benchmark(args.lines)
+        if not args.interpolation:
+            return 0
     
-    # Summary
-    print("\n" + "=" * 50)
-    print("BENCHMARK SUMMARY")
+    if args.interpolation:
+        _, _, max_error = run_interpolation_benchmark(args.blocks, workers=args.workers)
+        return 0 if max_error < 1e-6 else 1
+    
+    print("NC Parser Benchmark Suite")
     print("=" * 50)
-    print(f"{'Threads':<8} {'Total':<10} {'Path':<10} {'Material':<10} {'Speedup':<8}")
-    print("-" * 50)
-    
-    baseline_time = None
-    for threads, total_time, path_time, material_time in results:
-        if baseline_time is None:
-            baseline_time = total_time
-            speedup = "1.0x"
-        else:
-            speedup = f"{baseline_time/total_time:.1f}x"
-        
-        path_str = f"{path_time:.1f}s" if path_time else "N/A"
-        material_str = f"{material_time:.1f}s" if material_time else "N/A"
-        
-        print(f"{threads:<8} {total_time:.1f}s{'':<4} {path_str:<10} {material_str:<10} {speedup:<8}")
-    
-    print("\nRecommendations:")
-    if len(results) >= 2:
-        best_threads = min(results, key=lambda x: x[1])[0]
-        print(f"- Best performance: {best_threads} threads")
-        print(f"- For large files use: --threads {best_threads} --fast")
-        print(f"- For quick preview use: --threads {best_threads} --fast --resolution 2.0 --no-viz")
+    report = run_suite(sizes=args.sizes, arc_fraction=args.arc_fraction, formats=args.formats,
+                       resolution=args.resolution, repeat=args.repeat, trace_memory=not args.no_memory,
+                       output=args.output)
+    
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_reports(baseline, report, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower than {args.threshold:.2f}x the baseline")
+            return 1
+    return 0
 
 if __name__ == "__main__":
     sys.exit(main())
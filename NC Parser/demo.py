@@ -91,7 +91,7 @@ def demo_nc_parser():
         path_points = calculator.calculate_tool_path(commands)
         print(f"   Generated {len(path_points)} interpolated points")
         
-        if path_points:
+        if len(path_points) > 0:
             # Show first and last few points
             print("   First 3 points:")
             for i, point in enumerate(path_points[:3]):
@@ -7,7 +7,13 @@ Main application entry point
 import sys
 import os
 import argparse
-from typing import Optional
+import csv
+import json
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
 
 # Add src directory to path for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -18,7 +24,13 @@ sys.path.insert(0, src_dir)
 try:
     from gcode_parser import GCodeParser
     from path_calculator import PathCalculator
+    from motion_planner import MachineLimits, MotionProfile
     from point_cloud import PointCloudGenerator
+    from stock_model import DexelStock
+    from point_io import save_points, write_ply, load_points, POINT_FORMATS
+    from program_cache import ProgramCache
+    from incremental import IncrementalPipeline
+    from profiling import ProfileReport
     from visualizer import Visualizer
     print("✓ Core modules imported successfully")
 except ImportError as e:
@@ -27,6 +39,7 @@ except ImportError as e:
     print("- src/gcode_parser.py")
     print("- src/path_calculator.py") 
     print("- src/point_cloud.py")
+    print("- src/stock_model.py")
     print("- src/visualizer.py")
     print("\nAlso make sure core packages are installed:")
     print("pip install numpy matplotlib plotly pandas")
@@ -47,17 +60,27 @@ except Exception as e:
 class NCParser:
     """Main application class for NC file processing and visualization."""
     
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = None, machine_limits: Optional[MachineLimits] = None):
         self.parser = GCodeParser()
         self.path_calculator = PathCalculator()
         self.point_cloud_generator = PointCloudGenerator()
+        self.cache = ProgramCache(cache_dir)
+        self.incremental = IncrementalPipeline(self.cache)
+        self.machine_limits = machine_limits or MachineLimits()
+        self.plot_point_budget = None  # Tool path points to draw (None = backend default)
         self.visualizer = None  # Initialize later with backend check
         
     def process_nc_file(self, file_path: str, 
                        tool_diameter: float = 6.0,
                        resolution: float = 0.1,
                        workpiece_resolution: float = 1.5,
-                       visualization_backend: str = 'auto') -> dict:
+                       visualization_backend: str = 'auto',
+                       stock_resolution: float = 0.5,
+                       use_cache: bool = True,
+                       tolerance: Optional[float] = None,
+                       point_clouds: bool = True,
+                       trace_memory: bool = False,
+                       incremental: bool = False) -> dict:
         """
         Process NC file and generate visualizations.
         
@@ -65,45 +88,82 @@ class NCParser:
             file_path: Path to NC file
             tool_diameter: Cutting tool diameter in mm
             resolution: Path interpolation resolution in mm
+            workpiece_resolution: Workpiece point spacing in mm for part visualization
             visualization_backend: Backend for visualization ('matplotlib', 'plotly', 'open3d', 'auto')
+            stock_resolution: Column spacing in mm of the dexel stock model
+            use_cache: Reuse/store the parsed program and tool path in the on-disk cache
+            tolerance: Chordal tolerance in mm for adaptive path discretization (None = fixed resolution)
+            point_clouds: Simulate the workpiece/final part point clouds and set up the
+                          visualizer (skip for statistics-only runs such as batch mode)
+            trace_memory: Record per-stage allocations with tracemalloc (slower)
+            incremental: Parse and interpolate only from the first chunk edited since
+                         the last incremental run of this file (uses the cache directory)
             
         Returns:
-            Dictionary with processing results
+            Dictionary with processing results; results['profile'] is a
+            ProfileReport with the time and counters of every stage
         """
+        report = ProfileReport(os.path.basename(file_path), trace_memory=trace_memory)
         try:
             print(f"Processing NC file: {file_path}")
             
-            # Parse G-code
-            print("Parsing G-code...")
-            commands = self.parser.parse_file(file_path)
+            # Reuse the parsed program and tool path if this file was seen before
+            self.path_calculator.resolution = resolution
+            self.path_calculator.tolerance = tolerance
+            path_points = None
+            if incremental:
+                with report.stage('incremental_parse', bytes=os.path.getsize(file_path)) as stage:
+                    commands, path_points = self.incremental.run(file_path, self.parser, resolution, tolerance)
+                    stage.count(commands=len(commands), points=len(path_points),
+                                reused_chunks=self.incremental.reused_chunks,
+                                chunks=self.incremental.total_chunks)
+                print(f"Reused {self.incremental.reused_chunks} of {self.incremental.total_chunks} "
+                      f"checkpointed chunks")
+            elif use_cache:
+                with report.stage('cache_load') as stage:
+                    path_points = self.cache.load(file_path, resolution, self.parser, tolerance)
+                    stage.count(hit=path_points is not None)
+            
+            if path_points is not None:
+                if not incremental:
+                    print(f"Loaded parsed program and tool path from cache ({self.cache.directory})")
+                commands = self.parser.commands
+                if len(path_points) > 0:
+                    self.path_calculator.current_position = path_points[-1].copy()
+            else:
+                # Parse G-code
+                print("Parsing G-code...")
+                with report.stage('parse', bytes=os.path.getsize(file_path)) as stage:
+                    commands = self.parser.parse_file(file_path)
+                    stage.count(commands=len(commands))
             
             if not commands:
                 raise ValueError("No valid G-code commands found")
             
             # Get statistics
-            stats = self.parser.get_statistics()
+            with report.stage('statistics', commands=len(commands)):
+                stats = self.parser.get_statistics()
             print(f"Found {stats['total_commands']} total commands")
             print(f"Movement commands: {stats['movement_commands']}")
             
             # Calculate tool path
-            print("Calculating tool path...")
-            self.path_calculator.resolution = resolution
-            path_points = self.path_calculator.calculate_tool_path(commands)
+            if path_points is None:
+                print("Calculating tool path...")
+                with report.stage('tool_path', commands=len(commands)) as stage:
+                    path_points = self.path_calculator.calculate_tool_path(commands)
+                    stage.count(points=len(path_points))
+                if use_cache:
+                    try:
+                        with report.stage('cache_store', points=len(path_points)):
+                            self.cache.store(file_path, resolution, self.parser, path_points, tolerance)
+                    except Exception as e:
+                        print(f"Warning: Could not write cache entry: {e}")
             
-            if not path_points:
+            if len(path_points) == 0:
                 raise ValueError("No tool path points generated")
             
             print(f"Generated {len(path_points)} tool path points")
             
-            # Calculate material removal
-            print("Calculating material removal...")
-            removal_points = self.path_calculator.calculate_material_removal(
-                path_points, tool_diameter
-            )
-            
-            # Generate point clouds (without Open3D)
-            print("Generating point clouds...")
-            
             # Tool path point cloud (as numpy arrays)
             tool_path_points = path_points
             
@@ -116,21 +176,61 @@ class NCParser:
                 (bbox['z'][0] - margin, bbox['z'][1] + margin)
             )
             
-            # Create workpiece points
-            workpiece_points = self.point_cloud_generator.create_workpiece_points(
-                workpiece_bounds, resolution=workpiece_resolution
-            )
+            # Simulate each tool segment with its own cutter on its slice of the dense path
+            # (a path at a chordal tolerance is too sparse, so the dense one is interpolated once instead)
+            segments = self.parser.get_tool_segments()
+            with report.stage('tool_segments', segments=len(segments)) as stage:
+                tool_results = self.path_calculator.simulate_tool_segments(
+                    commands, segments, tool_diameter, self.machine_limits, workpiece_bounds, removal=point_clouds,
+                    path_points=tool_path_points if tolerance is None else None
+                )
+                stage.count(removal_points=sum(len(result.removal_points) for result in tool_results))
+            print(f"Simulated {len(tool_results)} tool segments "
+                  f"({len({result.tool_number for result in tool_results})} tools)")
             
-            # Simulate material removal (simplified without Open3D)
-            final_part_points = self.point_cloud_generator.simulate_removal_simple(
-                workpiece_points, removal_points, tool_diameter / 2.0
-            )
+            if point_clouds:
+                # Generate point clouds (without Open3D)
+                print("Generating point clouds...")
+                
+                # Create workpiece points
+                with report.stage('workpiece') as stage:
+                    workpiece_points = self.point_cloud_generator.create_workpiece_points(
+                        workpiece_bounds, resolution=workpiece_resolution
+                    )
+                    stage.count(points=len(workpiece_points))
+                
+                # Simulate material removal tool by tool (simplified without Open3D)
+                with report.stage('final_part', workpiece_points=len(workpiece_points)) as stage:
+                    final_part_points = workpiece_points
+                    for diameter in sorted({result.diameter for result in tool_results}):
+                        removal_points = np.concatenate([result.removal_points for result in tool_results
+                                                         if result.diameter == diameter])
+                        final_part_points = self.point_cloud_generator.simulate_removal_simple(
+                            final_part_points, removal_points, diameter / 2.0
+                        )
+                    stage.count(points=len(final_part_points))
+            else:
+                workpiece_points = np.empty((0, 3))
+                final_part_points = np.empty((0, 3))
+            
+            # Carve the stock model (BLK FORM if defined, else the padded bounding box)
+            stock_bounds = self.parser.get_stock_bounds() or workpiece_bounds
+            print(f"Simulating stock removal with {stock_resolution}mm dexels...")
+            with report.stage('stock', commands=len(commands)) as stage:
+                stock = DexelStock(stock_bounds, resolution=stock_resolution)
+                stock.carve_commands(commands, self.parser.get_tools(), resolution, tool_diameter)
+                stage.count(dexels=stock.top.size)
+            print(f"Removed volume: {stock.removed_volume():.1f} mm³, remaining: {stock.volume():.1f} mm³")
             
-            # Calculate machining time
-            machining_time = self.path_calculator.calculate_machining_time(commands)
+            # Cycle time with the machine's acceleration/jerk limits (the machine stops at
+            # every tool change, so the per-tool profiles join into the whole program's)
+            motion_profile = MotionProfile.concatenate([result.profile for result in tool_results])
+            machining_time = motion_profile.total_minutes
             
             # Initialize visualizer with backend checking
-            self.visualizer = Visualizer(backend=visualization_backend)
+            if point_clouds:
+                with report.stage('visualizer'):
+                    self.visualizer = Visualizer(backend=visualization_backend, point_budget=self.plot_point_budget)
             
             # Results
             results = {
@@ -139,14 +239,21 @@ class NCParser:
                 'tool_path_points': tool_path_points,
                 'workpiece_points': workpiece_points,
                 'final_part_points': final_part_points,
+                'stock': stock,
+                'removed_volume_by_tool': dict(stock.removed_volume_by_tool),
                 'statistics': stats,
                 'machining_time_minutes': machining_time,
+                'motion_profile': motion_profile,
+                'tool_segments': tool_results,
+                'tool_statistics': self.tool_statistics(tool_results, stock),
+                'profile': report,
                 'tool_diameter': tool_diameter,
                 'resolution': resolution,
+                'tolerance': tolerance,
                 'open3d_available': OPEN3D_AVAILABLE
             }
             
-            print(f"Processing complete!")
+            print(f"Processing complete in {report.total_seconds:.2f}s!")
             print(f"Estimated machining time: {machining_time:.2f} minutes")
             
             return results
@@ -167,7 +274,7 @@ class NCParser:
             print("Displaying visualizations...")
             
             # Show final machined part (most important visualization)
-            if results['final_part_points']:
+            if len(results['final_part_points']) > 0:
                 print("Creating final machined part visualization...")
                 workpiece_bounds = (
                     (results['statistics']['bounding_box']['x'][0] - results['tool_diameter'], 
@@ -185,7 +292,7 @@ class NCParser:
                 )
             
             # Tool path visualization (secondary) - skip if show_part_only is True
-            if not show_part_only and results['tool_path_points']:
+            if not show_part_only and len(results['tool_path_points']) > 0:
                 print("Creating tool path visualization...")
                 self.visualizer.plot_tool_path(
                     results['tool_path_points'], 
@@ -202,105 +309,348 @@ class NCParser:
         except Exception as e:
             print(f"Error creating visualizations: {e}")
     
-    def export_results(self, results: dict, output_dir: str = "output") -> None:
+    def export_results(self, results: dict, output_dir: str = "output", 
+                       point_format: str = 'ply', use_memmap: bool = False) -> None:
         """
         Export processing results to files.
         
         Args:
             results: Results from process_nc_file
             output_dir: Output directory
+            point_format: Point cloud format ('ply', 'ply-ascii', 'npy' or 'npz')
+            use_memmap: Write binary point files through a memory map
         """
+        report = results.get('profile') or ProfileReport()
         try:
-            os.makedirs(output_dir, exist_ok=True)
+            with report.stage('export', format=point_format):
+                os.makedirs(output_dir, exist_ok=True)
             
-            # Export point clouds as PLY files (without Open3D)
-            tool_path_file = os.path.join(output_dir, "tool_path.ply")
-            final_part_file = os.path.join(output_dir, "final_part.ply")
+                # Export point clouds (without Open3D)
+                extension = 'ply' if point_format.startswith('ply') else point_format
+                tool_path_file = os.path.join(output_dir, f"tool_path.{extension}")
+                final_part_file = os.path.join(output_dir, f"final_part.{extension}")
             
-            # Export tool path points
-            if results['tool_path_points']:
-                self._export_points_as_ply(results['tool_path_points'], tool_path_file)
-                print(f"Exported tool path points: {tool_path_file}")
+                # Export tool path points
+                if len(results['tool_path_points']) > 0:
+                    self._export_points(results['tool_path_points'], tool_path_file, point_format, use_memmap)
+                    print(f"Exported tool path points: {tool_path_file}")
             
-            # Export final part points
-            if results['final_part_points']:
-                self._export_points_as_ply(results['final_part_points'], final_part_file)
-                print(f"Exported final part points: {final_part_file}")
+                # Export final part points
+                if len(results['final_part_points']) > 0:
+                    self._export_points(results['final_part_points'], final_part_file, point_format, use_memmap)
+                    print(f"Exported final part points: {final_part_file}")
             
-            # Export statistics
-            stats_file = os.path.join(output_dir, "statistics.txt")
-            with open(stats_file, 'w') as f:
-                stats = results['statistics']
-                f.write("NC File Processing Statistics\n")
-                f.write("=" * 40 + "\n\n")
-                f.write(f"File format: {stats.get('file_format', 'Standard G-code')}\n")
-                f.write(f"Total commands: {stats['total_commands']}\n")
-                f.write(f"Movement commands: {stats['movement_commands']}\n")
+                # Export statistics
+                stats_file = os.path.join(output_dir, "statistics.txt")
+                with open(stats_file, 'w') as f:
+                    stats = results['statistics']
+                    f.write("NC File Processing Statistics\n")
+                    f.write("=" * 40 + "\n\n")
+                    f.write(f"File format: {stats.get('file_format', 'Standard G-code')}\n")
+                    f.write(f"Total commands: {stats['total_commands']}\n")
+                    f.write(f"Movement commands: {stats['movement_commands']}\n")
                 
-                # Handle different file formats
-                if stats.get('file_format') == 'Heidenhain':
-                    f.write(f"Rapid moves (L_RAPID): {stats['rapid_moves']}\n")
-                    f.write(f"Linear moves (L_FEED): {stats['linear_moves']}\n") 
-                    f.write(f"Clockwise arcs (C_CW): {stats['clockwise_arcs']}\n")
-                    f.write(f"Counter-clockwise arcs (C_CCW): {stats['counter_clockwise_arcs']}\n")
-                    f.write(f"General arcs (C): {stats.get('general_arcs', 0)}\n")
+                    # Handle different file formats
+                    if stats.get('file_format') == 'Heidenhain':
+                        f.write(f"Rapid moves (L_RAPID): {stats['rapid_moves']}\n")
+                        f.write(f"Linear moves (L_FEED): {stats['linear_moves']}\n") 
+                        f.write(f"Clockwise arcs (C_CW): {stats['clockwise_arcs']}\n")
+                        f.write(f"Counter-clockwise arcs (C_CCW): {stats['counter_clockwise_arcs']}\n")
+                        f.write(f"General arcs (C): {stats.get('general_arcs', 0)}\n")
                     
-                    # Add tool information
-                    if stats.get('tools'):
-                        f.write(f"\nTools found:\n")
-                        for tool_name, tool_info in stats['tools'].items():
-                            f.write(f"  {tool_name}: {tool_info['cutter_type']}, D{tool_info['diameter']}mm\n")
-                            f.write(f"    Corner radius: {tool_info['corner_radius']}mm\n")
-                            f.write(f"    Material: {tool_info['material_type']}, {tool_info['num_flutes']} flutes\n")
-                else:
-                    f.write(f"Rapid moves (G00): {stats['rapid_moves']}\n")
-                    f.write(f"Linear moves (G01): {stats['linear_moves']}\n")
-                    f.write(f"Clockwise arcs (G02): {stats['clockwise_arcs']}\n")
-                    f.write(f"Counter-clockwise arcs (G03): {stats['counter_clockwise_arcs']}\n")
+                        # Add tool information
+                        if stats.get('tools'):
+                            f.write(f"\nTools found:\n")
+                            for tool_name, tool_info in stats['tools'].items():
+                                f.write(f"  {tool_name}: {tool_info['cutter_type']}, D{tool_info['diameter']}mm\n")
+                                f.write(f"    Corner radius: {tool_info['corner_radius']}mm\n")
+                                f.write(f"    Material: {tool_info['material_type']}, {tool_info['num_flutes']} flutes\n")
+                    else:
+                        f.write(f"Rapid moves (G00): {stats['rapid_moves']}\n")
+                        f.write(f"Linear moves (G01): {stats['linear_moves']}\n")
+                        f.write(f"Clockwise arcs (G02): {stats['clockwise_arcs']}\n")
+                        f.write(f"Counter-clockwise arcs (G03): {stats['counter_clockwise_arcs']}\n")
                 
-                bbox = stats['bounding_box']
-                f.write(f"Bounding box:\n")
-                f.write(f"  X: {bbox['x'][0]:.2f} to {bbox['x'][1]:.2f} mm\n")
-                f.write(f"  Y: {bbox['y'][0]:.2f} to {bbox['y'][1]:.2f} mm\n")
-                f.write(f"  Z: {bbox['z'][0]:.2f} to {bbox['z'][1]:.2f} mm\n\n")
+                    bbox = stats['bounding_box']
+                    f.write(f"Bounding box:\n")
+                    f.write(f"  X: {bbox['x'][0]:.2f} to {bbox['x'][1]:.2f} mm\n")
+                    f.write(f"  Y: {bbox['y'][0]:.2f} to {bbox['y'][1]:.2f} mm\n")
+                    f.write(f"  Z: {bbox['z'][0]:.2f} to {bbox['z'][1]:.2f} mm\n\n")
                 
-                f.write(f"Dimensions:\n")
-                f.write(f"  X range: {stats['x_range']:.2f} mm\n")
-                f.write(f"  Y range: {stats['y_range']:.2f} mm\n")
-                f.write(f"  Z range: {stats['z_range']:.2f} mm\n\n")
+                    f.write(f"Dimensions:\n")
+                    f.write(f"  X range: {stats['x_range']:.2f} mm\n")
+                    f.write(f"  Y range: {stats['y_range']:.2f} mm\n")
+                    f.write(f"  Z range: {stats['z_range']:.2f} mm\n\n")
                 
-                f.write(f"Processing parameters:\n")
-                f.write(f"  Tool diameter: {results['tool_diameter']:.2f} mm\n")
-                f.write(f"  Path resolution: {results['resolution']:.2f} mm\n")
-                f.write(f"  Generated path points: {len(results['tool_path_points'])}\n")
-                f.write(f"  Estimated machining time: {results['machining_time_minutes']:.2f} minutes\n")
-                f.write(f"  Open3D available: {results['open3d_available']}\n")
+                    f.write(f"Processing parameters:\n")
+                    f.write(f"  Tool diameter: {results['tool_diameter']:.2f} mm\n")
+                    f.write(f"  Path resolution: {results['resolution']:.2f} mm\n")
+                    if results.get('tolerance') is not None:
+                        f.write(f"  Chordal tolerance: {results['tolerance']:.4f} mm\n")
+                    f.write(f"  Generated path points: {len(results['tool_path_points'])}\n")
+                    f.write(f"  Estimated machining time: {results['machining_time_minutes']:.2f} minutes\n")
+                    profile = results.get('motion_profile')
+                    if profile is not None:
+                        f.write(f"    Rapid moves: {profile.rapid_time / 60.0:.2f} minutes\n")
+                        f.write(f"    Feed moves: {profile.feed_time / 60.0:.2f} minutes\n")
+                        if profile.tool_changes:
+                            f.write(f"    Tool changes: {profile.tool_changes}\n")
+                    f.write(f"  Open3D available: {results['open3d_available']}\n")
+                
+                    stock = results.get('stock')
+                    if stock is not None:
+                        f.write(f"\nStock simulation ({stock.resolution:.2f} mm dexels):\n")
+                        f.write(f"  Removed volume: {stock.removed_volume():.1f} mm³\n")
+                        f.write(f"  Remaining volume: {stock.volume():.1f} mm³\n")
+                        for tool_number, volume in results['removed_volume_by_tool'].items():
+                            label = f"T{tool_number}" if tool_number is not None else "Unknown tool"
+                            f.write(f"  {label}: {volume:.1f} mm³ removed\n")
+                    
+                    if results.get('tool_statistics'):
+                        f.write(f"\nPer-tool statistics:\n")
+                        for label, entry in results['tool_statistics'].items():
+                            cutter = f" {entry['cutter_type']}" if entry['cutter_type'] else ""
+                            f.write(f"  {label}{cutter} D{entry['diameter']:.2f}mm R{entry['corner_radius']:.2f}mm: "
+                                    f"{entry['segments']} segment(s), {entry['commands']} commands\n")
+                            f.write(f"    Path length: {entry['path_length']:.1f} mm "
+                                    f"({entry['cutting_length']:.1f} mm cutting)\n")
+                            f.write(f"    Time: {entry['feed_minutes']:.2f} min feed, "
+                                    f"{entry['rapid_minutes']:.2f} min rapid\n")
             
-            print(f"Exported statistics: {stats_file}")
+                print(f"Exported statistics: {stats_file}")
             
         except Exception as e:
             print(f"Error exporting results: {e}")
     
-    def _export_points_as_ply(self, points, filename):
-        """Export points as PLY file without Open3D"""
+    def tool_statistics(self, tool_results: list, stock: Optional[DexelStock] = None) -> Dict[str, Dict]:
+        """Per-tool totals of the tool segment results, keyed by 'T<number>' in order of first use."""
+        statistics = {}
+        for result in tool_results:
+            label = f"T{result.tool_number}" if result.tool_number is not None else "Unknown tool"
+            entry = statistics.get(label)
+            if entry is None:
+                entry = statistics[label] = {
+                    'tool_number': result.tool_number,
+                    'cutter_type': result.cutter_type,
+                    'diameter': result.diameter,
+                    'corner_radius': result.corner_radius,
+                    'segments': 0,
+                    'commands': 0,
+                    'path_length': 0.0,
+                    'cutting_length': 0.0,
+                    'rapid_minutes': 0.0,
+                    'feed_minutes': 0.0,
+                    'removal_points': 0,
+                    'removed_volume': stock.removed_volume_by_tool.get(result.tool_number, 0.0) if stock else None,
+                }
+            entry['segments'] += 1
+            entry['commands'] += len(result.segment)
+            entry['path_length'] += result.path_length
+            entry['cutting_length'] += result.cutting_length
+            entry['rapid_minutes'] += result.profile.rapid_time / 60.0
+            entry['feed_minutes'] += result.profile.feed_time / 60.0
+            entry['removal_points'] += len(result.removal_points)
+        return statistics
+    
+    def summarize_results(self, results: dict) -> Dict:
+        """Flat per-file summary of process_nc_file results (one CSV/JSON row)."""
+        stats = results['statistics']
+        profile = results['motion_profile']
+        stock = results['stock']
+        return {
+            'file_format': stats['file_format'],
+            'total_commands': stats['total_commands'],
+            'movement_commands': stats['movement_commands'],
+            'path_points': len(results['tool_path_points']),
+            'x_range': stats['x_range'],
+            'y_range': stats['y_range'],
+            'z_range': stats['z_range'],
+            'machining_time_minutes': results['machining_time_minutes'],
+            'rapid_minutes': profile.rapid_time / 60.0,
+            'feed_minutes': profile.feed_time / 60.0,
+            'tool_changes': profile.tool_changes,
+            'tools': ' '.join(sorted(stats['tools'])),
+            'removed_volume': stock.removed_volume(),
+            'remaining_volume': stock.volume(),
+        }
+    
+    def _export_points(self, points, filename, point_format='ply', use_memmap=False):
+        """Export points as binary PLY, ASCII PLY, .npy or .npz."""
         try:
-            import numpy as np
-            points_array = np.array(points)
+            if point_format == 'ply-ascii':
+                write_ply(points, filename, binary=False)
+            else:
+                save_points(points, filename, use_memmap=use_memmap)
+        except Exception as e:
+            print(f"Error exporting point file: {e}")
+    
+
+
+# File extensions picked up by --batch
+NC_EXTENSIONS = ('.h', '.nc', '.ngc', '.tap')
+
+# Columns of the batch summary CSV
+BATCH_FIELDS = ['file', 'status', 'error', 'seconds', 'file_format', 'total_commands', 'movement_commands',
+                'path_points', 'x_range', 'y_range', 'z_range', 'machining_time_minutes', 'rapid_minutes',
+                'feed_minutes', 'tool_changes', 'tools', 'removed_volume', 'remaining_volume']
+
+# Per-process state of batch workers
+_batch_app = None
+_batch_options = None
+
+
+def _json_default(value):
+    """Convert NumPy scalars/arrays for json.dump."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _init_batch_worker(options: dict, machine_limits: Optional[MachineLimits]) -> None:
+    """Create one warm NCParser per worker process, reused for every file it is given."""
+    global _batch_app, _batch_options
+    sys.stdout = open(os.devnull, 'w')  # Keep worker progress output off the console
+    _batch_options = dict(options)
+    _batch_app = NCParser(cache_dir=_batch_options.pop('cache_dir'), machine_limits=machine_limits)
+    _batch_app.path_calculator.num_threads = 1  # Parallelism comes from the pool
+    _batch_app.point_cloud_generator.num_threads = 1
+
+
+def _process_batch_file(file_path: str) -> Dict:
+    """Analyze one file in a worker; only the small summary/statistics travel back."""
+    start_time = time.perf_counter()
+    row = {'file': file_path, 'status': 'ok', 'error': ''}
+    statistics = None
+    try:
+        results = _batch_app.process_nc_file(file_path, point_clouds=False, **_batch_options)
+        row.update(_batch_app.summarize_results(results))
+        statistics = dict(results['statistics'], removed_volume_by_tool={
+            str(tool): volume for tool, volume in results['removed_volume_by_tool'].items()},
+            tool_statistics=results['tool_statistics'], profile=results['profile'].to_dict())
+    except Exception as e:
+        row.update(status='error', error=str(e))
+    row['seconds'] = time.perf_counter() - start_time
+    return {'row': row, 'statistics': statistics}
+
+
+def find_nc_files(directory: str) -> List[str]:
+    """NC programs in a directory tree, sorted by path."""
+    files = []
+    for root, _, names in os.walk(directory):
+        files.extend(os.path.join(root, name) for name in names if name.lower().endswith(NC_EXTENSIONS))
+    return sorted(files)
+
+
+def run_batch(directory: str, output_dir: str = "batch_results", workers: int = 0,
+              machine_limits: Optional[MachineLimits] = None, **options) -> List[Dict]:
+    """
+    Analyze every NC file in a directory across a process pool.
+    
+    Each worker keeps one NCParser (parser, path calculator, cache) for all
+    of its files. At most two files per worker are in flight, and each
+    result is written as soon as it completes: per-file statistics to
+    <output_dir>/stats/<name>.json and a row to summary.csv. summary.json
+    holds all rows at the end. If a worker process dies, the files the pool
+    held get error rows and a new pool takes the remaining files.
+    
+    Args:
+        directory: Directory searched recursively for NC files
+        output_dir: Directory for the statistics and summaries
+        workers: Worker processes (0 = CPU count)
+        machine_limits: Machine limits for the cycle-time estimate
+        **options: process_nc_file keyword arguments plus 'cache_dir'
+        
+    Returns:
+        Summary rows in file order
+    """
+    files = find_nc_files(directory)
+    if not files:
+        print(f"No NC files found in {directory}")
+        return []
+    
+    workers = workers or os.cpu_count() or 1
+    stats_dir = os.path.join(output_dir, 'stats')
+    os.makedirs(stats_dir, exist_ok=True)
+    options.setdefault('cache_dir', None)
+    print(f"Processing {len(files)} files with {workers} workers...")
+    
+    start_time = time.perf_counter()
+    rows = {}
+    pending = iter(files)
+    csv_path = os.path.join(output_dir, 'summary.csv')
+    
+    def start_pool() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                   initargs=(options, machine_limits))
+    
+    executor = start_pool()
+    try:
+        with open(csv_path, 'w', newline='', encoding='utf-8') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=BATCH_FIELDS)
+            writer.writeheader()
             
-            with open(filename, 'w') as f:
-                f.write("ply\n")
-                f.write("format ascii 1.0\n")
-                f.write(f"element vertex {len(points_array)}\n")
-                f.write("property float x\n")
-                f.write("property float y\n")
-                f.write("property float z\n")
-                f.write("end_header\n")
+            def record(result: Dict) -> None:
+                row = result['row']
+                relative = os.path.relpath(row['file'], directory)
+                row['file'] = relative
+                rows[relative] = row
                 
-                for point in points_array:
-                    f.write(f"{point[0]:.6f} {point[1]:.6f} {point[2]:.6f}\n")
-                    
-        except Exception as e:
-            print(f"Error exporting PLY file: {e}")
+                if result['statistics'] is not None:
+                    stats_path = os.path.join(stats_dir, relative.replace(os.sep, '__') + '.json')
+                    with open(stats_path, 'w', encoding='utf-8') as f:
+                        json.dump(dict(row, statistics=result['statistics']), f, indent=2, default=_json_default)
+                writer.writerow(row)
+                csv_file.flush()
+                print(f"[{len(rows)}/{len(files)}] {relative}: {row['status']}"
+                      + (f" ({row['error']})" if row['error'] else f", {row['machining_time_minutes']:.2f} min"))
+            
+            in_flight = {}  # future -> file path
+            while True:
+                # Keep a bounded number of files queued so results never pile up
+                while len(in_flight) < 2 * workers:
+                    file_path = next(pending, None)
+                    if file_path is None:
+                        break
+                    in_flight[executor.submit(_process_batch_file, file_path)] = file_path
+                if not in_flight:
+                    break
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    file_path = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # A worker died (e.g. killed for memory); the pool fails every file it held
+                        broken = broken or isinstance(e, BrokenProcessPool)
+                        result = {'row': {'file': file_path, 'status': 'error',
+                                          'error': str(e) or type(e).__name__, 'seconds': 0.0},
+                                  'statistics': None}
+                    record(result)
+                
+                if broken:
+                    print("A worker process died; restarting the worker pool")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    for future, file_path in in_flight.items():
+                        record({'row': {'file': file_path, 'status': 'error', 'seconds': 0.0,
+                                        'error': 'worker process died while this file was queued'},
+                                'statistics': None})
+                    in_flight.clear()
+                    executor = start_pool()
+    finally:
+        executor.shutdown()
+    
+    ordered = [rows[key] for key in sorted(rows)]
+    with open(os.path.join(output_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(ordered, f, indent=2, default=_json_default)
+    
+    failed = sum(row['status'] != 'ok' for row in ordered)
+    print(f"Batch complete in {time.perf_counter() - start_time:.1f}s: "
+          f"{len(ordered) - failed} succeeded, {failed} failed. Summary written to {output_dir}")
+    return ordered
 
 
 def create_sample_nc_file():
@@ -356,24 +706,54 @@ def main():
     parser = argparse.ArgumentParser(description="NC File G-code Parser and 3D Visualizer with Multithreading")
     parser.add_argument("file", nargs='?', help="NC file to process")
     parser.add_argument("--tool-diameter", type=float, default=6.0, 
-                       help="Tool diameter in mm (default: 6.0)")
+                       help="Tool diameter in mm for tools without a diameter in their tool comment (default: 6.0)")
     parser.add_argument("--resolution", type=float, default=0.1,
                        help="Path interpolation resolution in mm (default: 0.1)")
+    parser.add_argument("--tolerance", type=float,
+                       help="Chordal tolerance in mm: lines keep only end points and arcs are split by "
+                            "chord error instead of --resolution (fewer points for display)")
     parser.add_argument("--backend", choices=['matplotlib', 'plotly', 'auto'], 
                        default='auto', help="Visualization backend")
     parser.add_argument("--export", type=str, help="Export results to directory")
+    parser.add_argument("--export-format", choices=POINT_FORMATS, default='ply',
+                       help="Point cloud export format: binary PLY, ASCII PLY, .npy or .npz (default: ply)")
+    parser.add_argument("--memmap", action='store_true',
+                       help="Write exported point files through a memory map")
+    parser.add_argument("--no-cache", action='store_true',
+                       help="Always reparse and recompute the tool path instead of using the on-disk cache")
+    parser.add_argument("--incremental", action='store_true',
+                       help="Checkpoint the program in chunks and re-parse only from the first edited chunk")
+    parser.add_argument("--cache-dir", type=str,
+                       help="Cache directory (default: $NC_PARSER_CACHE_DIR or ~/.cache/nc_parser)")
+    parser.add_argument("--view-points", type=str,
+                       help="Visualize a previously exported point file (.ply/.npy/.npz) without re-running")
+    parser.add_argument("--batch", type=str, metavar="DIR",
+                       help="Analyze every NC file in DIR across worker processes (--threads) and write "
+                            "per-file statistics plus summary.csv/summary.json to --export (default: batch_results)")
     parser.add_argument("--create-sample", action='store_true', 
                        help="Create sample NC file for testing")
     parser.add_argument("--no-viz", action='store_true', 
                        help="Skip visualizations")
     parser.add_argument("--threads", type=int, default=0,
-                       help="Number of threads to use (0=auto detect, default: 0)")
+                       help="Number of worker threads/processes to use (0=auto detect, default: 0)")
     parser.add_argument("--fast", action='store_true',
                        help="Fast mode: lower resolution and fewer points for large files")
     parser.add_argument("--show-part-only", action='store_true',
                        help="Show only the final machined part (skip tool path visualization)")
     parser.add_argument("--workpiece-resolution", type=float, default=1.5,
                        help="Workpiece point resolution in mm for part visualization (default: 1.5)")
+    parser.add_argument("--stock-resolution", type=float, default=0.5,
+                       help="Dexel spacing in mm for the stock removal model (default: 0.5)")
+    parser.add_argument("--plot-points", type=int,
+                       help="Maximum tool path points to draw; larger paths are decimated (default: per backend)")
+    parser.add_argument("--machine-config", type=str,
+                       help="JSON file with machine axis limits for the cycle-time estimate")
+    parser.add_argument("--profile", action='store_true',
+                       help="Print the time and counters of every processing stage")
+    parser.add_argument("--trace", type=str, metavar="FILE",
+                       help="Write the processing stages as Chrome trace JSON (chrome://tracing, Perfetto)")
+    parser.add_argument("--trace-memory", action='store_true',
+                       help="Also record per-stage allocations with tracemalloc (slower)")
     
     args = parser.parse_args()
     
@@ -389,6 +769,28 @@ def main():
         if not args.file:
             args.file = "examples/sample.nc"
     
+    if args.view_points:
+        points = load_points(args.view_points, mmap=True)
+        print(f"Loaded {len(points)} points from {args.view_points}")
+        Visualizer(backend=args.backend).plot_final_part(points, title=os.path.basename(args.view_points))
+        return 0
+    
+    if args.batch:
+        machine_limits = MachineLimits.from_json(args.machine_config) if args.machine_config else None
+        rows = run_batch(
+            args.batch,
+            output_dir=args.export or "batch_results",
+            workers=args.threads,
+            machine_limits=machine_limits,
+            cache_dir=args.cache_dir,
+            tool_diameter=args.tool_diameter,
+            resolution=args.resolution,
+            stock_resolution=args.stock_resolution,
+            use_cache=not args.no_cache,
+            tolerance=args.tolerance
+        )
+        return 0 if rows and all(row['status'] == 'ok' for row in rows) else 1
+    
     if not args.file:
         print("Error: No NC file specified. Use --create-sample to create a test file.")
         parser.print_help()
@@ -396,12 +798,16 @@ def main():
     
     try:
         # Initialize application
-        app = NCParser()
+        machine_limits = MachineLimits.from_json(args.machine_config) if args.machine_config else None
+        app = NCParser(cache_dir=args.cache_dir, machine_limits=machine_limits)
+        
+        app.plot_point_budget = args.plot_points
         
         # Configure threading if specified
         if args.threads > 0:
             app.path_calculator.num_threads = min(args.threads, 16)
             app.point_cloud_generator.num_threads = min(args.threads, 16)
+            app.parser.num_workers = min(args.threads, 16)
             print(f"Using {args.threads} threads")
         
         # Process NC file
@@ -410,7 +816,12 @@ def main():
             tool_diameter=args.tool_diameter,
             resolution=args.resolution,
             workpiece_resolution=args.workpiece_resolution,
-            visualization_backend=args.backend
+            visualization_backend=args.backend,
+            stock_resolution=args.stock_resolution,
+            use_cache=not args.no_cache,
+            tolerance=args.tolerance,
+            trace_memory=args.trace_memory,
+            incremental=args.incremental
         )
         
         # Show visualizations
@@ -419,7 +830,14 @@ def main():
         
         # Export results if requested
         if args.export:
-            app.export_results(results, args.export)
+            app.export_results(results, args.export, args.export_format, args.memmap)
+        
+        report = results['profile']
+        if args.profile:
+            print(report.summary())
+        if args.trace:
+            report.write_chrome_trace(args.trace)
+            print(f"Wrote stage trace: {args.trace}")
         
         print("Processing completed successfully!")
         return 0
@@ -0,0 +1,304 @@
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+
+# Fixed opcodes for motion commands; other commands are numbered on first use
+MOTION_OPCODES = {
+    'G00': 0, 'G01': 1, 'G02': 2, 'G03': 3,
+    'L_RAPID': 4, 'L_FEED': 5, 'C': 6, 'C_CW': 7, 'C_CCW': 8
+}
+GCODE_MOTION_OPCODES = (0, 1, 2, 3)
+HEIDENHAIN_MOTION_OPCODES = (4, 5, 6, 7, 8)
+
+# Opcode column type; int16 leaves room for the many distinct non-motion words of long programs
+OPCODE_DTYPE = np.int16
+
+# Column order of the coordinate block
+COLUMNS = ('x', 'y', 'z', 'i', 'j', 'k', 'f')
+
+# Rows buffered in Python before being flushed into NumPy blocks
+BUILD_BLOCK_SIZE = 65536
+
+
+class CommandView:
+    """Lightweight per-command view of a CommandTable row (GCodeCommand-compatible)."""
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table: 'CommandTable', row: int):
+        self._table = table
+        self._row = row
+
+    def _value(self, column: int) -> Optional[float]:
+        value = self._table.values[column, self._row]
+        return None if value != value else float(value)  # NaN marks a missing word
+
+    @property
+    def command(self) -> str:
+        return self._table.names[self._table.opcodes[self._row]]
+
+    @property
+    def x(self) -> Optional[float]:
+        return self._value(0)
+
+    @property
+    def y(self) -> Optional[float]:
+        return self._value(1)
+
+    @property
+    def z(self) -> Optional[float]:
+        return self._value(2)
+
+    @property
+    def i(self) -> Optional[float]:
+        return self._value(3)
+
+    @property
+    def j(self) -> Optional[float]:
+        return self._value(4)
+
+    @property
+    def k(self) -> Optional[float]:
+        return self._value(5)
+
+    @property
+    def f(self) -> Optional[float]:
+        return self._value(6)
+
+    @property
+    def is_heidenhain(self) -> bool:
+        return bool(self._table.heidenhain[self._row])
+
+    @property
+    def tool(self) -> Optional[int]:
+        tool = self._table.tools[self._row]
+        return None if tool < 0 else int(tool)
+
+    @property
+    def radius(self) -> Optional[float]:
+        return self._table.extras.get(self._row, (None, None))[0]
+
+    @property
+    def direction(self) -> Optional[str]:
+        return self._table.extras.get(self._row, (None, None))[1]
+
+    def __repr__(self):
+        if self.is_heidenhain:
+            return f"HCommand({self.command}, X={self.x}, Y={self.y}, Z={self.z})"
+        return f"GCommand({self.command}, X={self.x}, Y={self.y}, Z={self.z})"
+
+
+class CommandTable:
+    """
+    Columnar storage for a parsed NC program.
+
+    Coordinates and parameters live in one (7, N) float array (NaN where a
+    word is absent), the command in an int16 opcode column, the active tool
+    number in an int32 column (-1 if unknown), and the rarely used arc
+    radius/direction in a small side table keyed by row.
+    """
+
+    def __init__(self, values: Optional[np.ndarray] = None, opcodes: Optional[np.ndarray] = None,
+                 heidenhain: Optional[np.ndarray] = None,
+                 extras: Optional[Dict[int, Tuple[Optional[float], Optional[str]]]] = None,
+                 names: Optional[List[str]] = None, tools: Optional[np.ndarray] = None):
+        self.values = values if values is not None else np.empty((len(COLUMNS), 0))
+        self.opcodes = opcodes if opcodes is not None else np.empty(0, dtype=OPCODE_DTYPE)
+        self.heidenhain = heidenhain if heidenhain is not None else np.empty(0, dtype=bool)
+        self.extras = extras if extras is not None else {}
+        self.names = names if names is not None else list(MOTION_OPCODES)
+        self.tools = tools if tools is not None else np.full(len(self.opcodes), -1, dtype=np.int32)
+        self._codes = {name: code for code, name in enumerate(self.names)}
+
+    @classmethod
+    def from_commands(cls, commands: Iterable, block_size: int = BUILD_BLOCK_SIZE) -> 'CommandTable':
+        """Build a table from GCodeCommand-like objects, consuming them in one pass."""
+        table = cls()
+        value_blocks = []
+        opcode_blocks = []
+        heidenhain_blocks = []
+        tool_blocks = []
+
+        rows = []
+        opcodes = []
+        heidenhain = []
+        tools = []
+        row = 0
+        for command in commands:
+            rows.append((command.x, command.y, command.z, command.i, command.j, command.k, command.f))
+            opcodes.append(table.opcode(command.command))
+            heidenhain.append(command.is_heidenhain)
+            tool = getattr(command, 'tool', None)
+            tools.append(-1 if tool is None else tool)
+            if command.radius is not None or command.direction is not None:
+                table.extras[row] = (command.radius, command.direction)
+            row += 1
+
+            if len(rows) >= block_size:
+                value_blocks.append(np.array(rows, dtype=np.float64))
+                opcode_blocks.append(np.array(opcodes, dtype=OPCODE_DTYPE))
+                heidenhain_blocks.append(np.array(heidenhain, dtype=bool))
+                tool_blocks.append(np.array(tools, dtype=np.int32))
+                rows, opcodes, heidenhain, tools = [], [], [], []
+
+        if rows:
+            value_blocks.append(np.array(rows, dtype=np.float64))
+            opcode_blocks.append(np.array(opcodes, dtype=OPCODE_DTYPE))
+            heidenhain_blocks.append(np.array(heidenhain, dtype=bool))
+            tool_blocks.append(np.array(tools, dtype=np.int32))
+
+        if value_blocks:
+            table.values = np.ascontiguousarray(np.concatenate(value_blocks).T)
+            table.opcodes = np.concatenate(opcode_blocks)
+            table.heidenhain = np.concatenate(heidenhain_blocks)
+            table.tools = np.concatenate(tool_blocks)
+        return table
+
+    @classmethod
+    def concatenate(cls, tables: Iterable['CommandTable']) -> 'CommandTable':
+        """Join tables end to end, renumbering opcodes of commands that were numbered differently."""
+        tables = list(tables)
+        if not tables:
+            return cls()
+        result = cls(names=list(tables[0].names))
+        opcodes, extras, offset = [], {}, 0
+        for table in tables:
+            remap = np.array([result.opcode(name) for name in table.names], dtype=OPCODE_DTYPE)
+            opcodes.append(remap[table.opcodes] if len(table) else table.opcodes)
+            extras.update((row + offset, extra) for row, extra in table.extras.items())
+            offset += len(table)
+        result.values = np.concatenate([table.values for table in tables], axis=1)
+        result.opcodes = np.concatenate(opcodes).astype(OPCODE_DTYPE)
+        result.heidenhain = np.concatenate([table.heidenhain for table in tables])
+        result.tools = np.concatenate([table.tools for table in tables])
+        result.extras = extras
+        return result
+
+    def to_arrays(self, prefix: str = '') -> Dict[str, np.ndarray]:
+        """Plain NumPy arrays holding the whole table (e.g. for np.savez)."""
+        rows = np.fromiter(self.extras, dtype=np.int64, count=len(self.extras))
+        radii = [self.extras[row][0] for row in rows.tolist()]
+        directions = [self.extras[row][1] for row in rows.tolist()]
+        return {
+            prefix + 'values': self.values,
+            prefix + 'opcodes': self.opcodes,
+            prefix + 'heidenhain': self.heidenhain,
+            prefix + 'tools': self.tools,
+            prefix + 'names': np.array(self.names, dtype=str),
+            prefix + 'extra_rows': rows,
+            prefix + 'extra_radius': np.array([np.nan if r is None else r for r in radii], dtype=np.float64),
+            prefix + 'extra_direction': np.array(['' if d is None else d for d in directions], dtype=str),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str = '') -> 'CommandTable':
+        """Rebuild a table from the arrays produced by to_arrays."""
+        extras = {}
+        for row, radius, direction in zip(arrays[prefix + 'extra_rows'].tolist(),
+                                          arrays[prefix + 'extra_radius'].tolist(),
+                                          arrays[prefix + 'extra_direction'].tolist()):
+            extras[row] = (None if radius != radius else radius, direction or None)
+        return cls(np.array(arrays[prefix + 'values'], dtype=np.float64),
+                   np.array(arrays[prefix + 'opcodes'], dtype=OPCODE_DTYPE),
+                   np.array(arrays[prefix + 'heidenhain'], dtype=bool),
+                   extras,
+                   [str(name) for name in arrays[prefix + 'names']],
+                   np.array(arrays[prefix + 'tools'], dtype=np.int32))
+
+    def opcode(self, name: str) -> int:
+        """Return the opcode for a command name, assigning a new one if needed."""
+        code = self._codes.get(name)
+        if code is None:
+            code = len(self.names)
+            if code > np.iinfo(OPCODE_DTYPE).max:
+                raise ValueError(f"Too many distinct commands for {np.dtype(OPCODE_DTYPE).name} opcodes: {name}")
+            self.names.append(name)
+            self._codes[name] = code
+        return code
+
+    def mask_for(self, names: Iterable[str]) -> np.ndarray:
+        """Boolean row mask of commands whose name is in `names`."""
+        codes = [self._codes[name] for name in names if name in self._codes]
+        return np.isin(self.opcodes, codes)
+
+    def count(self, name: str) -> int:
+        """Number of rows with the given command name."""
+        code = self._codes.get(name)
+        return 0 if code is None else int(np.count_nonzero(self.opcodes == code))
+
+    def tool_runs(self) -> List[Tuple[Optional[int], int, int]]:
+        """(tool, start, stop) of every run of consecutive rows with the same active tool (None if unknown)."""
+        if len(self) == 0:
+            return []
+        bounds = np.flatnonzero(self.tools[1:] != self.tools[:-1]) + 1
+        starts = np.concatenate(([0], bounds))
+        stops = np.concatenate((bounds, [len(self)]))
+        return [(None if tool < 0 else tool, start, stop)
+                for tool, start, stop in zip(self.tools[starts].tolist(), starts.tolist(), stops.tolist())]
+
+    def take(self, rows: Union[slice, np.ndarray]) -> 'CommandTable':
+        """New table holding the selected rows (slice, index array or boolean mask)."""
+        index = np.arange(len(self))[rows]
+        extras = {}
+        if self.extras and len(index):
+            if np.all(index[1:] > index[:-1]):
+                # Sorted selection: locate side-table rows with a binary search
+                old_rows = np.fromiter(self.extras, dtype=np.int64, count=len(self.extras))
+                positions = np.minimum(np.searchsorted(index, old_rows), len(index) - 1)
+                hits = index[positions] == old_rows
+                for new_row, old_row in zip(positions[hits].tolist(), old_rows[hits].tolist()):
+                    extras[new_row] = self.extras[old_row]
+            else:
+                for new_row, old_row in enumerate(index.tolist()):
+                    if old_row in self.extras:
+                        extras[new_row] = self.extras[old_row]
+        return CommandTable(self.values[:, index], self.opcodes[index], self.heidenhain[index],
+                            extras, list(self.names), self.tools[index])
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.values[0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.values[1]
+
+    @property
+    def z(self) -> np.ndarray:
+        return self.values[2]
+
+    @property
+    def i(self) -> np.ndarray:
+        return self.values[3]
+
+    @property
+    def j(self) -> np.ndarray:
+        return self.values[4]
+
+    @property
+    def k(self) -> np.ndarray:
+        return self.values[5]
+
+    @property
+    def f(self) -> np.ndarray:
+        return self.values[6]
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.take(key)
+        row = int(key)
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("command index out of range")
+        return CommandView(self, row)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield CommandView(self, row)
+
+    def __repr__(self):
+        return f"CommandTable({len(self)} commands)"
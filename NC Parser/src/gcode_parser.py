@@ -1,6 +1,48 @@
+import os
 import re
 import numpy as np
-from typing import List, Dict, Tuple, Optional, Union
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Optional, Union, Iterator, Iterable
+from command_table import CommandTable, GCODE_MOTION_OPCODES, HEIDENHAIN_MOTION_OPCODES
+from mmap_reader import map_file, iter_mapped_lines, count_lines, split_byte_ranges
+
+
+# Bumped whenever parsing output changes, so cached programs are invalidated
+PARSER_VERSION = "4"
+
+# Precompiled patterns used by the single-pass line tokenizer
+WORD_PATTERN = re.compile(r'([A-Z])([+-]?\d*\.?\d+)')
+PAREN_COMMENT_PATTERN = re.compile(r'\(.*?\)')
+TOOL_COMMENT_PATTERN = re.compile(r'\* -(.+)\s+T(\d+)')
+TOOL_CALL_PATTERN = re.compile(r'TOOL CALL (\d+)')
+SPINDLE_SPEED_PATTERN = re.compile(r'S(\d+)')
+BLK_FORM_PATTERN = re.compile(r'BLK FORM 0\.([12])')
+
+# Files at least this large are parsed in byte ranges on worker processes (when num_workers > 1)
+PARALLEL_PARSE_MIN_BYTES = 8 * 1024 * 1024
+
+# Tool number given to commands read before a byte range's first tool change
+UNSET_TOOL = -2
+
+HEIDENHAIN_ARC_COMMANDS = ('C', 'C_CW', 'C_CCW')
+
+
+def tokenize_line(line: str) -> Tuple[Optional[str], Dict[str, float]]:
+    """
+    Scan an upper-case, comment-free line once into address words.
+    
+    Returns:
+        (command, words) where command is the first G/M code (e.g. 'G01') or
+        None, and words maps each address letter to its first value
+    """
+    command = None
+    words = {}
+    for letter, value in WORD_PATTERN.findall(line):
+        if command is None and (letter == 'G' or letter == 'M') and value[0].isdigit():
+            command = letter + value.partition('.')[0]
+        if letter not in words:
+            words[letter] = float(value)
+    return command, words
 
 
 class ToolInfo:
@@ -92,12 +134,41 @@ class ToolInfo:
         return f"ToolInfo(T{self.tool_number}, {self.get_cutter_type_description()}, D{self.diameter}mm)"
 
 
+class ToolSegment:
+    """A contiguous run of commands cut with one tool (rows start:stop of the command table)."""
+    
+    def __init__(self, tool_number: Optional[int], start: int, stop: int, tool_info: Optional[ToolInfo] = None):
+        self.tool_number = tool_number
+        self.start = start
+        self.stop = stop
+        self.tool_info = tool_info
+    
+    @property
+    def rows(self) -> slice:
+        return slice(self.start, self.stop)
+    
+    def diameter(self, default: float) -> float:
+        """Cutter diameter from the tool comment, or `default` if unknown."""
+        if self.tool_info is not None and self.tool_info.diameter > 0:
+            return self.tool_info.diameter
+        return default
+    
+    def __len__(self):
+        return self.stop - self.start
+    
+    def __repr__(self):
+        return f"ToolSegment(T{self.tool_number}, rows {self.start}-{self.stop})"
+
+
 class GCodeCommand:
     """Represents a single G-code or Heidenhain command with its parameters."""
     
+    __slots__ = ('command', 'x', 'y', 'z', 'i', 'j', 'k', 'f', 'is_heidenhain', 'radius', 'direction', 'tool')
+    
     def __init__(self, command: str, x: float = None, y: float = None, z: float = None, 
                  i: float = None, j: float = None, k: float = None, f: float = None,
-                 is_heidenhain: bool = False, radius: float = None, direction: str = None):
+                 is_heidenhain: bool = False, radius: float = None, direction: str = None,
+                 tool: int = None):
         self.command = command.upper()
         self.x = x
         self.y = y
@@ -109,6 +180,7 @@ class GCodeCommand:
         self.is_heidenhain = is_heidenhain
         self.radius = radius      # Arc radius (Heidenhain)
         self.direction = direction  # 'CW' or 'CCW' (Heidenhain)
+        self.tool = tool  # Active tool number when the command was read
         
     def __repr__(self):
         if self.is_heidenhain:
@@ -120,48 +192,192 @@ class GCodeParser:
     """Parser for G-code NC files and Heidenhain .H files."""
     
     def __init__(self):
-        self.commands = []
+        self.num_workers = 1  # Worker processes for files over PARALLEL_PARSE_MIN_BYTES
+        self.reset()
+    
+    def reset(self) -> None:
+        """Forget the previous program so the parser can be reused for another file."""
+        self.table = CommandTable()  # Columnar storage of the parsed program
         self.tools = {}  # Dictionary to store tool information
         self.current_position = {'x': 0.0, 'y': 0.0, 'z': 0.0}
         self.current_feed_rate = 100.0
         self.current_spindle_speed = 0.0
-        self.tool_number = 1
+        self.tool_number = None  # Unknown until the first tool call
         self.is_heidenhain = False
         self.current_tool_info = None
+        self.unresolved_tool_calls = None  # Range workers only: TOOL CALLs not yet resolvable to a tool
         
         # Heidenhain-specific state
         self.arc_center = {'x': None, 'y': None}  # For circular moves
         self.stock_dimensions = {'length': 0, 'width': 0, 'height': 0}
+        self.blk_form = {}  # 'min'/'max' stock corners from BLK FORM 0.1/0.2
+        
+    @property
+    def commands(self) -> CommandTable:
+        """Parsed program as a CommandTable (indexable and iterable like a list of commands)."""
+        return self.table
+    
+    @commands.setter
+    def commands(self, commands: Iterable[GCodeCommand]):
+        self.table = commands if isinstance(commands, CommandTable) else CommandTable.from_commands(commands)
+    
+    def parse_file(self, file_path: str) -> CommandTable:
+        """Parse a G-code file (.nc) or Heidenhain file (.h) into a columnar command table."""
+        if self.num_workers > 1 and os.path.isfile(file_path) and os.path.getsize(file_path) >= PARALLEL_PARSE_MIN_BYTES:
+            return self.parse_file_parallel(file_path, self.num_workers)
+        self.reset()
+        self.table = CommandTable.from_commands(self.iter_commands(file_path))
+        return self.table
+    
+    def parse_file_parallel(self, file_path: str, workers: int) -> CommandTable:
+        """
+        Parse a file in byte ranges on worker processes; the result equals parse_file.
+        
+        The file is split on line boundaries and every worker parses its range
+        from a memory map, without the modal state of the lines before it. A
+        sequential fix-up pass then carries that state from range to range:
+        commands read before a range's first tool change get the previous
+        tool, Heidenhain arcs read before its CC get the previous circle
+        centre, and the positions, feeds, tools and stock of the ranges are merged.
+        """
+        self.reset()
+        self.is_heidenhain = file_path.lower().endswith('.h')
+        try:
+            with map_file(file_path) as buffer:
+                ranges = split_byte_ranges(buffer, workers)
+                first_lines = np.cumsum([1] + [count_lines(buffer, start, stop) for start, stop in ranges[:-1]])
+        except FileNotFoundError:
+            raise FileNotFoundError(f"NC file not found: {file_path}")
+        
+        tasks = [(file_path, start, stop, int(first_line), self.is_heidenhain)
+                 for (start, stop), first_line in zip(ranges, first_lines)]
+        if len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+                results = list(executor.map(_parse_range_task, tasks))
+        else:
+            results = [_parse_range_task(task) for task in tasks]
+        
+        self.table = CommandTable.concatenate([self._merge_range(*result) for result in results])
+        return self.table
+    
+    def _merge_range(self, table: CommandTable, state: Dict, inherited_arcs: List[int]) -> CommandTable:
+        """Give a range's commands the state of the ranges before it, then adopt the range's final state."""
+        table.tools[table.tools == UNSET_TOOL] = -1 if self.tool_number is None else self.tool_number
+        for row in inherited_arcs:
+            for axis, column in (('x', 3), ('y', 4)):
+                if np.isnan(table.values[column, row]) and self.arc_center[axis] is not None:
+                    table.values[column, row] = self.arc_center[axis]
+            x, y, cx, cy = table.values[[0, 1, 3, 4], row]
+            if not np.isnan([x, y, cx, cy]).any():
+                dx = x - cx
+                dy = y - cy
+                table.extras[row] = (np.sqrt(dx*dx + dy*dy), table.extras.get(row, (None, None))[1])
+        
+        if state['tool_number'] != UNSET_TOOL:
+            self.tool_number = state['tool_number']
+        for target, values in ((self.current_position, state['current_position']),
+                               (self.arc_center, state['arc_center'])):
+            target.update((axis, value) for axis, value in values.items() if value is not None)
+        if state['current_feed_rate'] is not None:
+            self.current_feed_rate = state['current_feed_rate']
+        if state['current_spindle_speed'] is not None:
+            self.current_spindle_speed = state['current_spindle_speed']
+        self.tools.update((int(number), ToolInfo(string, int(number))) for number, string in state['tools'].items())
+        # TOOL CALLs after the range's last tool comment or resolved call may
+        # name tools defined in earlier ranges; the latest known one wins
+        called = [number for number in state['unresolved_tool_calls'] if number in self.tools]
+        if called:
+            self.current_tool_info = self.tools[called[-1]]
+        elif state['current_tool'] is not None:
+            self.current_tool_info = self.tools[state['current_tool']]
+        self.stock_dimensions.update(state['stock_dimensions'])
+        self.blk_form.update((corner, tuple(values)) for corner, values in state['blk_form'].items())
+        return table
+    
+    def iter_commands(self, file_path: str, 
+                      chunk_size: Optional[int] = None) -> Iterator[Union[GCodeCommand, CommandTable]]:
+        """
+        Parse a file incrementally, yielding commands as their lines are read.
+        
+        Unlike parse_file, commands are not collected in self.commands, so
+        memory use stays constant regardless of program length.
         
-    def parse_file(self, file_path: str) -> List[GCodeCommand]:
-        """Parse a G-code file (.nc) or Heidenhain file (.h) and return a list of commands."""
-        self.commands = []
+        Args:
+            file_path: Path to a G-code (.nc) or Heidenhain (.h) file
+            chunk_size: If given, yield CommandTable chunks of up to chunk_size
+                        commands instead of single commands
+        """
+        if chunk_size is None:
+            yield from self._iter_file(file_path)
+            return
         
+        chunk = []
+        for command in self._iter_file(file_path):
+            chunk.append(command)
+            if len(chunk) >= chunk_size:
+                yield CommandTable.from_commands(chunk)
+                chunk = []
+        if chunk:
+            yield CommandTable.from_commands(chunk)
+    
+    def _iter_file(self, file_path: str) -> Iterator[GCodeCommand]:
+        """Read a file line by line and yield every parsed command."""
         # Detect file type
         self.is_heidenhain = file_path.lower().endswith('.h')
         
         try:
             with open(file_path, 'r', encoding='utf-8') as file:
-                for line_num, line in enumerate(file, 1):
-                    try:
-                        if self.is_heidenhain:
-                            # Parse Heidenhain format
-                            command = self.parse_heidenhain_line(line.strip())
-                        else:
-                            # Parse standard G-code
-                            command = self.parse_line(line.strip())
-                            
-                        if command:
-                            self.commands.append(command)
-                    except Exception as e:
-                        print(f"Warning: Error parsing line {line_num}: {line.strip()} - {e}")
+                yield from self.iter_lines(file)
                         
         except FileNotFoundError:
             raise FileNotFoundError(f"NC file not found: {file_path}")
         except Exception as e:
             raise Exception(f"Error reading file: {e}")
+    
+    def iter_lines(self, lines: Iterable[str], first_line: int = 1) -> Iterator[GCodeCommand]:
+        """Parse lines of the current format (is_heidenhain) with the parser's current state."""
+        for line_num, line in enumerate(lines, first_line):
+            try:
+                if self.is_heidenhain:
+                    # Parse Heidenhain format
+                    command = self.parse_heidenhain_line(line.strip())
+                else:
+                    # Parse standard G-code
+                    command = self.parse_line(line.strip())
+            except Exception as e:
+                print(f"Warning: Error parsing line {line_num}: {line.strip()} - {e}")
+                continue
             
-        return self.commands
+            if command:
+                yield command
+    
+    def get_state(self) -> Dict:
+        """Modal state carried from one line to the next (JSON-serializable, see set_state)."""
+        return {
+            'is_heidenhain': self.is_heidenhain,
+            'tool_number': self.tool_number,
+            'current_tool': self.current_tool_info.tool_number if self.current_tool_info is not None else None,
+            'tools': {str(number): tool.raw_string for number, tool in self.tools.items()},
+            'current_position': dict(self.current_position),
+            'current_feed_rate': self.current_feed_rate,
+            'current_spindle_speed': self.current_spindle_speed,
+            'arc_center': dict(self.arc_center),
+            'stock_dimensions': dict(self.stock_dimensions),
+            'blk_form': {corner: list(values) for corner, values in self.blk_form.items()},
+        }
+    
+    def set_state(self, state: Dict) -> None:
+        """Restore modal state saved by get_state, e.g. to resume parsing in the middle of a file."""
+        self.is_heidenhain = state['is_heidenhain']
+        self.tool_number = state['tool_number']
+        self.tools = {int(number): ToolInfo(string, int(number)) for number, string in state['tools'].items()}
+        self.current_tool_info = self.tools.get(state['current_tool'])
+        self.current_position = dict(state['current_position'])
+        self.current_feed_rate = state['current_feed_rate']
+        self.current_spindle_speed = state['current_spindle_speed']
+        self.arc_center = dict(state['arc_center'])
+        self.stock_dimensions = dict(state['stock_dimensions'])
+        self.blk_form = {corner: tuple(values) for corner, values in state['blk_form'].items()}
     
     def parse_line(self, line: str) -> Optional[GCodeCommand]:
         """Parse a single line of G-code."""
@@ -169,28 +385,28 @@ class GCodeParser:
             return None  # Skip comments and empty lines
             
         # Remove comments
-        line = re.sub(r';.*$', '', line)
-        line = re.sub(r'\(.*?\)', '', line)
+        line = line.partition(';')[0]
+        if '(' in line:
+            line = PAREN_COMMENT_PATTERN.sub('', line)
         line = line.strip().upper()
         
         if not line:
             return None
             
-        # Extract G/M command
-        g_match = re.search(r'[GM]\d+', line)
-        if not g_match:
+        # Scan the line once into its G/M command and address words
+        command, words = tokenize_line(line)
+        if 'T' in words:
+            self.tool_number = int(words['T'])
+        if command is None:
             return None
-            
-        command = g_match.group()
         
-        # Extract coordinates and parameters
-        x = self._extract_coordinate(line, 'X')
-        y = self._extract_coordinate(line, 'Y')
-        z = self._extract_coordinate(line, 'Z')
-        i = self._extract_coordinate(line, 'I')
-        j = self._extract_coordinate(line, 'J')
-        k = self._extract_coordinate(line, 'K')
-        f = self._extract_coordinate(line, 'F')
+        x = words.get('X')
+        y = words.get('Y')
+        z = words.get('Z')
+        i = words.get('I')
+        j = words.get('J')
+        k = words.get('K')
+        f = words.get('F')
         
         # Update current position for incremental coordinates
         if x is not None:
@@ -202,56 +418,38 @@ class GCodeParser:
         if f is not None:
             self.current_feed_rate = f
             
-        return GCodeCommand(command, x, y, z, i, j, k, f)
-    
-    def _extract_coordinate(self, line: str, axis: str) -> Optional[float]:
-        """Extract coordinate value for given axis from G-code line."""
-        pattern = f'{axis}([+-]?\\d*\\.?\\d+)'
-        match = re.search(pattern, line)
-        if match:
-            try:
-                return float(match.group(1))
-            except ValueError:
-                return None
-        return None
+        return GCodeCommand(command, x, y, z, i, j, k, f, tool=self.tool_number)
     
-    def get_commands_by_type(self, command_type: str) -> List[GCodeCommand]:
+    def get_commands_by_type(self, command_type: str) -> CommandTable:
         """Get all commands of a specific type (e.g., 'G01', 'G00')."""
-        return [cmd for cmd in self.commands if cmd.command == command_type.upper()]
+        return self.table.take(self.table.mask_for([command_type.upper()]))
+    
+    def _movement_mask(self) -> np.ndarray:
+        """Boolean mask of movement rows in the command table."""
+        codes = HEIDENHAIN_MOTION_OPCODES if self.is_heidenhain else GCODE_MOTION_OPCODES
+        return np.isin(self.table.opcodes, codes)
     
-    def get_movement_commands(self) -> List[GCodeCommand]:
+    def get_movement_commands(self) -> CommandTable:
         """Get all movement commands (G00, G01, G02, G03 for standard G-code; L, C for Heidenhain)."""
-        if self.is_heidenhain:
-            movement_commands = ['L_RAPID', 'L_FEED', 'C', 'C_CW', 'C_CCW']
-        else:
-            movement_commands = ['G00', 'G01', 'G02', 'G03']
-        return [cmd for cmd in self.commands if cmd.command in movement_commands]
+        return self.table.take(self._movement_mask())
     
     def get_bounding_box(self) -> Dict[str, Tuple[float, float]]:
         """Calculate the bounding box of all movements."""
-        movement_commands = self.get_movement_commands()
+        movement = self.table.values[:3, self._movement_mask()]
         
-        if not movement_commands:
-            return {'x': (0, 0), 'y': (0, 0), 'z': (0, 0)}
-        
-        x_coords = [cmd.x for cmd in movement_commands if cmd.x is not None]
-        y_coords = [cmd.y for cmd in movement_commands if cmd.y is not None]
-        z_coords = [cmd.z for cmd in movement_commands if cmd.z is not None]
-        
-        return {
-            'x': (min(x_coords) if x_coords else 0, max(x_coords) if x_coords else 0),
-            'y': (min(y_coords) if y_coords else 0, max(y_coords) if y_coords else 0),
-            'z': (min(z_coords) if z_coords else 0, max(z_coords) if z_coords else 0)
-        }
+        bounding_box = {}
+        for axis, values in zip(('x', 'y', 'z'), movement):
+            values = values[~np.isnan(values)]
+            bounding_box[axis] = (float(values.min()), float(values.max())) if len(values) else (0, 0)
+        return bounding_box
     
     def get_statistics(self) -> Dict:
         """Get statistics about the parsed code."""
-        movement_commands = self.get_movement_commands()
         bounding_box = self.get_bounding_box()
         
         stats = {
-            'total_commands': len(self.commands),
-            'movement_commands': len(movement_commands),
+            'total_commands': len(self.table),
+            'movement_commands': int(np.count_nonzero(self._movement_mask())),
             'bounding_box': bounding_box,
             'x_range': bounding_box['x'][1] - bounding_box['x'][0],
             'y_range': bounding_box['y'][1] - bounding_box['y'][0],
@@ -263,11 +461,11 @@ class GCodeParser:
         if self.is_heidenhain:
             # Heidenhain-specific statistics
             stats.update({
-                'rapid_moves': len(self.get_commands_by_type('L_RAPID')),
-                'linear_moves': len(self.get_commands_by_type('L_FEED')),
-                'clockwise_arcs': len(self.get_commands_by_type('C_CW')),
-                'counter_clockwise_arcs': len(self.get_commands_by_type('C_CCW')),
-                'general_arcs': len(self.get_commands_by_type('C')),
+                'rapid_moves': self.table.count('L_RAPID'),
+                'linear_moves': self.table.count('L_FEED'),
+                'clockwise_arcs': self.table.count('C_CW'),
+                'counter_clockwise_arcs': self.table.count('C_CCW'),
+                'general_arcs': self.table.count('C'),
                 'stock_dimensions': self.stock_dimensions
             })
             
@@ -286,10 +484,10 @@ class GCodeParser:
         else:
             # Standard G-code statistics
             stats.update({
-                'rapid_moves': len(self.get_commands_by_type('G00')),
-                'linear_moves': len(self.get_commands_by_type('G01')),
-                'clockwise_arcs': len(self.get_commands_by_type('G02')),
-                'counter_clockwise_arcs': len(self.get_commands_by_type('G03'))
+                'rapid_moves': self.table.count('G00'),
+                'linear_moves': self.table.count('G01'),
+                'clockwise_arcs': self.table.count('G02'),
+                'counter_clockwise_arcs': self.table.count('G03')
             })
             
         return stats
@@ -301,12 +499,14 @@ class GCodeParser:
             
         # Handle tool information comments
         if line.startswith('* -') and '_' in line and 'T' in line:
-            tool_match = re.search(r'\* -(.+)\s+T(\d+)', line)
+            tool_match = TOOL_COMMENT_PATTERN.search(line)
             if tool_match:
                 tool_string = tool_match.group(1).strip()
                 tool_num = int(tool_match.group(2))
                 self.tools[tool_num] = ToolInfo(tool_string, tool_num)
                 self.current_tool_info = self.tools[tool_num]
+                if self.unresolved_tool_calls:
+                    self.unresolved_tool_calls.clear()
                 print(f"Found tool T{tool_num}: {self.current_tool_info}")
             return None
             
@@ -320,32 +520,44 @@ class GCodeParser:
             return None
             
         # Remove comments
-        line = re.sub(r';.*$', '', line)
-        line = line.strip().upper()
+        line = line.partition(';')[0].strip().upper()
         
         if not line:
             return None
             
         # Handle tool calls: TOOL CALL 7 Z S10000
         if line.startswith('TOOL CALL'):
-            tool_match = re.search(r'TOOL CALL (\d+)', line)
+            tool_match = TOOL_CALL_PATTERN.search(line)
             if tool_match:
                 self.tool_number = int(tool_match.group(1))
                 if self.tool_number in self.tools:
                     self.current_tool_info = self.tools[self.tool_number]
+                    if self.unresolved_tool_calls:
+                        self.unresolved_tool_calls.clear()
+                elif self.unresolved_tool_calls is not None:
+                    # The tool may be defined in an earlier range; keep the latest call last
+                    if self.tool_number in self.unresolved_tool_calls:
+                        self.unresolved_tool_calls.remove(self.tool_number)
+                    self.unresolved_tool_calls.append(self.tool_number)
                     
                 # Extract spindle speed if present
-                speed_match = re.search(r'S(\d+)', line)
+                speed_match = SPINDLE_SPEED_PATTERN.search(line)
                 if speed_match:
                     self.current_spindle_speed = float(speed_match.group(1))
             return None
             
+        # Handle stock definition: BLK FORM 0.1 Z X+0 Y+0 Z-20 / BLK FORM 0.2 X+100 Y+50 Z+0
+        if line.startswith('BLK FORM'):
+            self._parse_blk_form(line)
+            return None
+            
         # Handle linear movements: L X+15.9092 Y+70.2758 FMAX
         if line.startswith('L '):
-            x = self._extract_coordinate(line, 'X')
-            y = self._extract_coordinate(line, 'Y')
-            z = self._extract_coordinate(line, 'Z')
-            f = None if 'FMAX' in line else self._extract_coordinate(line, 'F')
+            _, words = tokenize_line(line)
+            x = words.get('X')
+            y = words.get('Y')
+            z = words.get('Z')
+            f = None if 'FMAX' in line else words.get('F')
             
             command = 'L_RAPID' if 'FMAX' in line else 'L_FEED'
             
@@ -358,13 +570,14 @@ class GCodeParser:
             if f is not None:
                 self.current_feed_rate = f
                 
-            return GCodeCommand(command, x, y, z, f=f, is_heidenhain=True)
+            return GCodeCommand(command, x, y, z, f=f, is_heidenhain=True, tool=self.tool_number)
             
         # Handle circular movements
         if line.startswith('CC '):
             # Store circle center
-            x = self._extract_coordinate(line, 'X')
-            y = self._extract_coordinate(line, 'Y')
+            _, words = tokenize_line(line)
+            x = words.get('X')
+            y = words.get('Y')
             if x is not None:
                 self.arc_center['x'] = x
             if y is not None:
@@ -372,10 +585,11 @@ class GCodeParser:
             return None
             
         if line.startswith('C '):
-            x = self._extract_coordinate(line, 'X')
-            y = self._extract_coordinate(line, 'Y')
-            z = self._extract_coordinate(line, 'Z')
-            f = None if 'FMAX' in line else self._extract_coordinate(line, 'F')
+            _, words = tokenize_line(line)
+            x = words.get('X')
+            y = words.get('Y')
+            z = words.get('Z')
+            f = None if 'FMAX' in line else words.get('F')
             
             # Determine direction
             direction = 'CCW' if 'DR-' in line else 'CW' if 'DR+' in line else None
@@ -399,7 +613,8 @@ class GCodeParser:
                 
             return GCodeCommand(command, x, y, z, 
                               i=self.arc_center['x'], j=self.arc_center['y'],
-                              f=f, is_heidenhain=True, radius=radius, direction=direction)
+                              f=f, is_heidenhain=True, radius=radius, direction=direction,
+                              tool=self.tool_number)
         
         return None
     
@@ -418,17 +633,25 @@ class GCodeParser:
             if match:
                 self.stock_dimensions['height'] = float(match.group(1))
     
-    def _extract_coordinate(self, line: str, axis: str) -> Optional[float]:
-        """Extract coordinate value for given axis from G-code or Heidenhain line."""
-        # Handle both standard G-code format (X1.0) and Heidenhain format (X+1.0)
-        pattern = f'{axis}([+-]?\\d*\\.?\\d+)'
-        match = re.search(pattern, line)
-        if match:
-            try:
-                return float(match.group(1))
-            except ValueError:
-                return None
-        return None
+    def _parse_blk_form(self, line: str):
+        """Parse a BLK FORM stock corner (0.1 = minimum point, 0.2 = maximum point)."""
+        match = BLK_FORM_PATTERN.match(line)
+        if not match:
+            return
+        _, words = tokenize_line(line[match.end():])
+        corner = 'min' if match.group(1) == '1' else 'max'
+        self.blk_form[corner] = tuple(words.get(axis, 0.0) for axis in ('X', 'Y', 'Z'))
+    
+    def get_stock_bounds(self) -> Optional[Tuple[Tuple[float, float], Tuple[float, float], Tuple[float, float]]]:
+        """Get the BLK FORM stock as ((x_min, x_max), (y_min, y_max), (z_min, z_max)), if defined."""
+        if 'min' not in self.blk_form or 'max' not in self.blk_form:
+            return None
+        return tuple((min(lo, hi), max(lo, hi)) for lo, hi in zip(self.blk_form['min'], self.blk_form['max']))
+    
+    def get_tool_segments(self) -> List[ToolSegment]:
+        """Split the parsed program at every tool change into per-tool command runs."""
+        return [ToolSegment(tool, start, stop, self.tools.get(tool))
+                for tool, start, stop in self.table.tool_runs()]
     
     def get_tools(self) -> Dict[int, ToolInfo]:
         """Get dictionary of all tools found in the file."""
@@ -437,3 +660,39 @@ class GCodeParser:
     def get_current_tool(self) -> Optional[ToolInfo]:
         """Get the currently active tool."""
         return self.current_tool_info
+
+
+def _parse_range_task(task: Tuple[str, int, int, int, bool]) -> Tuple[CommandTable, Dict, List[int]]:
+    """
+    Parse the byte range [start, stop) of a file without the state of earlier lines (worker process).
+    
+    Returns:
+        (commands, final state as in get_state with None/UNSET_TOOL for state
+        the range never set plus the TOOL CALL numbers the range could not
+        resolve after its last tool selection, rows of Heidenhain arcs read
+        before both circle centre coordinates were set)
+    """
+    file_path, start, stop, first_line, is_heidenhain = task
+    parser = GCodeParser()
+    parser.is_heidenhain = is_heidenhain
+    parser.tool_number = UNSET_TOOL
+    parser.current_position = {'x': None, 'y': None, 'z': None}
+    parser.current_feed_rate = None
+    parser.current_spindle_speed = None
+    parser.stock_dimensions = {}
+    parser.unresolved_tool_calls = []
+    inherited_arcs = []
+    
+    def commands():
+        with map_file(file_path) as buffer:
+            lines = iter_mapped_lines(buffer, start, stop)
+            for row, command in enumerate(parser.iter_lines(lines, first_line)):
+                if command.is_heidenhain and command.command in HEIDENHAIN_ARC_COMMANDS \
+                        and None in parser.arc_center.values():
+                    inherited_arcs.append(row)
+                yield command
+    
+    table = CommandTable.from_commands(commands())
+    state = parser.get_state()
+    state['unresolved_tool_calls'] = parser.unresolved_tool_calls
+    return table, state, inherited_arcs
@@ -0,0 +1,160 @@
+"""
+Incremental re-parsing and path calculation of edited NC programs.
+"""
+import hashlib
+import json
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from command_table import CommandTable
+from gcode_parser import GCodeParser
+from interpolation import MOTION_OPCODE_LIST, plan_segments, interpolate_plan, _forward_fill
+from program_cache import ProgramCache
+
+
+# Lines per checkpointed chunk
+DEFAULT_CHECKPOINT_LINES = 10_000
+
+
+def chunk_digests(lines: List[str], chunk_lines: int) -> List[str]:
+    """SHA-1 of every run of chunk_lines lines."""
+    return [hashlib.sha1(''.join(lines[start:start + chunk_lines]).encode('utf-8')).hexdigest()
+            for start in range(0, len(lines), chunk_lines)]
+
+
+class IncrementalPipeline:
+    """
+    Parse and interpolate a program, resuming from the first chunk edited since the last run.
+
+    The file is split into chunks of checkpoint_lines lines. Each run stores,
+    in the program cache, the hash of every chunk and a checkpoint at every
+    chunk boundary: the parser's modal state (position, feed, tool, arc
+    centre, tools, stock), the command row, the tool path point count and
+    the machine position. On the next run the chunks before the first
+    changed one are taken from the cache as they are. The parser is restored
+    to the checkpoint there, and only the remaining lines are parsed and
+    interpolated.
+    """
+
+    def __init__(self, cache: ProgramCache, checkpoint_lines: int = DEFAULT_CHECKPOINT_LINES):
+        if checkpoint_lines <= 0:
+            raise ValueError("checkpoint_lines must be positive")
+        self.cache = cache
+        self.checkpoint_lines = checkpoint_lines
+        self.reused_chunks = 0  # Chunks taken from the cache by the last run
+        self.total_chunks = 0
+
+    def _first_changed_chunk(self, previous: Optional[Dict[str, np.ndarray]], digests: List[str]) -> int:
+        if previous is None or int(previous['checkpoint_lines']) != self.checkpoint_lines:
+            return 0
+        old = previous['chunk_digests'].tolist()
+        for chunk, (old_digest, new_digest) in enumerate(zip(old, digests)):
+            if old_digest != new_digest:
+                return chunk
+        return min(len(old), len(digests))
+
+    def run(self, file_path: str, parser: GCodeParser, resolution: float,
+            tolerance: Optional[float] = None) -> Tuple[CommandTable, np.ndarray]:
+        """
+        Parse `file_path` into `parser` and compute its tool path, reusing unchanged leading chunks.
+
+        Returns:
+            (commands, path_points) for the whole program
+        """
+        with open(file_path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        digests = chunk_digests(lines, self.checkpoint_lines)
+        key = self.cache.checkpoint_key(file_path, resolution, tolerance)
+        previous = self.cache.load_arrays(key)
+        try:
+            first = self._first_changed_chunk(previous, digests)
+            if first > 0:
+                states = json.loads(str(previous['checkpoint_states']))
+                rows = previous['checkpoint_rows'][:first + 1].tolist()
+                points = previous['checkpoint_points'][:first + 1].tolist()
+                positions = list(previous['checkpoint_positions'][:first + 1])
+                prefix_table = CommandTable.from_arrays(previous, prefix='table_').take(slice(0, rows[first]))
+                prefix_path = previous['path_points'][:points[first]]
+                states = states[:first + 1]
+        except (KeyError, ValueError, IndexError) as e:
+            self.cache.discard(key, e)
+            first = 0
+
+        parser.reset()
+        parser.is_heidenhain = file_path.lower().endswith('.h')
+        if first == 0:
+            states, rows, points, positions = [parser.get_state()], [0], [0], [np.zeros(3)]
+            prefix_table, prefix_path = CommandTable(), np.empty((0, 3))
+        else:
+            parser.set_state(states[first])
+        self.reused_chunks, self.total_chunks = first, len(digests)
+
+        if first == len(digests):
+            # Every chunk is unchanged (the file may have lost whole trailing chunks)
+            parser.commands = prefix_table
+            if previous is None or len(previous['chunk_digests']) != first:
+                self._store(key, prefix_table, prefix_path, digests, states, rows, points, positions)
+            return prefix_table, prefix_path
+
+        # Parse the remaining chunks, recording the parser state at every chunk boundary
+        chunk_rows = []
+
+        def remaining_commands():
+            count = 0
+            for chunk in range(first, len(digests)):
+                if chunk > first:
+                    states.append(parser.get_state())
+                    chunk_rows.append(count)
+                start = chunk * self.checkpoint_lines
+                for command in parser.iter_lines(lines[start:start + self.checkpoint_lines], start + 1):
+                    count += 1
+                    yield command
+
+        suffix = CommandTable.from_commands(remaining_commands())
+        states.append(parser.get_state())
+        chunk_rows.append(len(suffix))
+        chunk_rows = np.array(chunk_rows, dtype=np.int64)
+
+        start_position = np.asarray(positions[first], dtype=np.float64)
+        if len(suffix):
+            plan = plan_segments(suffix, resolution, start_position, tolerance)
+            suffix_path = interpolate_plan(plan)
+            segment_counts = np.searchsorted(plan.rows, chunk_rows)
+            suffix_points = plan.offsets[segment_counts]
+
+            # Machine position before each boundary row, from the modal motion targets
+            motion = np.isin(suffix.opcodes, MOTION_OPCODE_LIST)
+            targets = np.column_stack([_forward_fill(suffix.values[axis, motion], start_position[axis])
+                                       for axis in range(3)])
+            modal = np.vstack((start_position[None, :], targets))
+            suffix_positions = modal[np.searchsorted(np.flatnonzero(motion), chunk_rows)]
+        else:
+            suffix_path = np.empty((0, 3))
+            suffix_points = np.zeros(len(chunk_rows), dtype=np.int64)
+            suffix_positions = np.repeat(start_position[None, :], len(chunk_rows), axis=0)
+
+        rows += (rows[first] + chunk_rows).tolist()
+        points += (points[first] + suffix_points).tolist()
+        positions += list(suffix_positions)
+        table = CommandTable.concatenate([prefix_table, suffix]) if first > 0 else suffix
+        path_points = np.concatenate((prefix_path, suffix_path)) if first > 0 else suffix_path
+        parser.commands = table
+        self._store(key, table, path_points, digests, states, rows, points, positions)
+        return table, path_points
+
+    def _store(self, key: str, table: CommandTable, path_points: np.ndarray, digests: List[str],
+               states: List[Dict], rows: List[int], points: List[int], positions: List[np.ndarray]) -> None:
+        arrays = table.to_arrays(prefix='table_')
+        arrays.update(
+            path_points=path_points,
+            chunk_digests=np.array(digests, dtype=str),
+            checkpoint_lines=np.array(self.checkpoint_lines),
+            checkpoint_rows=np.array(rows, dtype=np.int64),
+            checkpoint_points=np.array(points, dtype=np.int64),
+            checkpoint_positions=np.array(positions, dtype=np.float64).reshape(-1, 3),
+            checkpoint_states=np.array(json.dumps(states)),
+        )
+        try:
+            self.cache.store_arrays(key, arrays)
+        except Exception as e:
+            print(f"Warning: Could not write checkpoint entry: {e}")
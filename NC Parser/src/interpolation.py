@@ -0,0 +1,456 @@
+import math
+import numpy as np
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+from gcode_parser import GCodeCommand
+from command_table import CommandTable, MOTION_OPCODES
+
+
+# Motion commands understood by the interpolation engine
+LINEAR_COMMANDS = ('G00', 'G01', 'L_RAPID', 'L_FEED')
+ARC_COMMANDS = {'G02': True, 'G03': False}  # command -> clockwise
+HEIDENHAIN_ARC_COMMANDS = {'C_CW': True, 'C_CCW': False, 'C': False}
+
+# Opcode groups for planning directly from a CommandTable
+LINEAR_OPCODES = [MOTION_OPCODES[name] for name in LINEAR_COMMANDS]
+CLOCKWISE_OPCODES = [MOTION_OPCODES[name] for name in ('G02', 'C_CW')]
+HEIDENHAIN_ARC_OPCODES = [MOTION_OPCODES[name] for name in HEIDENHAIN_ARC_COMMANDS]
+MOTION_OPCODE_LIST = list(MOTION_OPCODES.values())
+
+# Segment kinds stored in SegmentPlan.kinds
+SEGMENT_LINEAR = 0
+SEGMENT_ARC = 1
+
+# Upper bound on points generated per vectorized block (limits temporaries)
+DEFAULT_BLOCK_POINTS = 1_000_000
+
+# Segment ranges handed out per worker process (helps load balancing)
+RANGES_PER_WORKER = 4
+
+# Per-process state of parallel interpolation workers
+_worker_plan = None
+_worker_out = None
+
+
+class SegmentPlan:
+    """
+    Geometry of every interpolated segment of a program, stored column-wise.
+
+    Point k of segment s (0 <= k < counts[s]) lies at parameter
+    t = (k + first[s]) / divisions[s] and is written to row offsets[s] + k
+    of the output array. rows[s] is the index of the command that produced
+    segment s.
+    """
+
+    def __init__(self, kinds: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                 centers: np.ndarray, radii: np.ndarray, start_angles: np.ndarray,
+                 sweeps: np.ndarray, divisions: np.ndarray, first: np.ndarray,
+                 end_position: np.ndarray, rows: Optional[np.ndarray] = None):
+        self.kinds = kinds
+        self.starts = starts
+        self.ends = ends
+        self.centers = centers
+        self.radii = radii
+        self.start_angles = start_angles
+        self.sweeps = sweeps
+        self.divisions = divisions
+        self.first = first
+        self.end_position = end_position
+        self.rows = rows if rows is not None else np.arange(len(kinds), dtype=np.int64)
+
+        self.counts = divisions - first + 1
+        self.offsets = np.zeros(len(kinds) + 1, dtype=np.int64)
+        np.cumsum(self.counts, out=self.offsets[1:])
+
+    @property
+    def num_segments(self) -> int:
+        return len(self.kinds)
+
+    @property
+    def num_points(self) -> int:
+        return int(self.offsets[-1])
+
+    def row_range(self, start: int, stop: int) -> Tuple[int, int]:
+        """Segments lo:hi produced by command rows start:stop (rows are in program order)."""
+        lo, hi = np.searchsorted(self.rows, [start, stop])
+        return int(lo), int(hi)
+
+    def take(self, lo: int, hi: int, row_offset: int = 0) -> 'SegmentPlan':
+        """
+        Segments lo:hi as a plan of their own, with rows shifted down by row_offset.
+
+        Its points are points offsets[lo]:offsets[hi] of this plan's output.
+        """
+        if hi > lo:
+            end_position = self.ends[hi - 1].copy()
+        else:
+            end_position = self.starts[lo].copy() if lo < self.num_segments else self.end_position.copy()
+        return SegmentPlan(self.kinds[lo:hi], self.starts[lo:hi], self.ends[lo:hi], self.centers[lo:hi],
+                           self.radii[lo:hi], self.start_angles[lo:hi], self.sweeps[lo:hi],
+                           self.divisions[lo:hi], self.first[lo:hi], end_position,
+                           self.rows[lo:hi] - row_offset)
+
+    def __repr__(self):
+        return f"SegmentPlan({self.num_segments} segments, {self.num_points} points)"
+
+
+def segment_divisions(is_arc: np.ndarray, lengths: np.ndarray, radii: np.ndarray,
+                      sweeps: np.ndarray, min_divisions: np.ndarray, resolution: float,
+                      tolerance: Optional[float] = None) -> np.ndarray:
+    """
+    Number of divisions of each segment.
+
+    With no tolerance every segment is split into steps of `resolution`.
+    With a chordal tolerance, lines are a single step (endpoints only) and
+    arcs get the fewest equal steps whose chord deviates from the arc by
+    at most `tolerance`: each step spans at most 2 * acos(1 - tolerance / r).
+    """
+    if tolerance is None:
+        return np.maximum(min_divisions, (lengths / resolution).astype(np.int64))
+
+    if tolerance <= 0:
+        raise ValueError("tolerance must be positive")
+    ratio = np.clip(1.0 - tolerance / np.maximum(radii, 1e-12), -1.0, 1.0)
+    max_step = 2.0 * np.arccos(ratio)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        steps = np.where(is_arc & (max_step > 0), np.ceil(np.abs(sweeps) / max_step), 1)
+    return np.maximum(min_divisions, steps.astype(np.int64))
+
+
+def plan_segments(commands: Sequence[GCodeCommand], resolution: float,
+                  start_position: Optional[Sequence[float]] = None,
+                  tolerance: Optional[float] = None) -> SegmentPlan:
+    """
+    Resolve start/end positions and point counts of every motion command.
+
+    This is the only sequential pass over the program; it touches each command
+    once and does no per-point work.
+
+    Args:
+        commands: Parsed G-code or Heidenhain commands
+        resolution: Distance between interpolated points (mm)
+        start_position: Machine position before the first command (default origin)
+        tolerance: Chordal tolerance (mm); if given, lines emit only their end
+                   point and arcs are segmented by chord error instead of resolution
+
+    Returns:
+        SegmentPlan describing every segment that produces points
+    """
+    if isinstance(commands, CommandTable):
+        return _plan_table_segments(commands, resolution, start_position, tolerance)
+    
+    if start_position is None:
+        x, y, z = 0.0, 0.0, 0.0
+    else:
+        x, y, z = (float(v) for v in start_position)
+
+    kinds = []
+    starts = []
+    ends = []
+    centers = []
+    radii = []
+    start_angles = []
+    sweeps = []
+    lengths = []
+    min_divisions = []
+    first = []
+    rows = []
+    missing_centers = 0
+
+    for row, command in enumerate(commands):
+        name = command.command
+
+        if name in LINEAR_COMMANDS:
+            kind = SEGMENT_LINEAR
+        elif name in ARC_COMMANDS or name in HEIDENHAIN_ARC_COMMANDS:
+            kind = SEGMENT_ARC
+        else:
+            continue  # Non-motion commands do not move the tool
+
+        tx = x if command.x is None else command.x
+        ty = y if command.y is None else command.y
+        tz = z if command.z is None else command.z
+
+        if kind == SEGMENT_ARC:
+            if name in ARC_COMMANDS:
+                # Standard G-code: I/J are offsets from the start point
+                clockwise = ARC_COMMANDS[name]
+                cx = x + (command.i if command.i is not None else 0.0)
+                cy = y + (command.j if command.j is not None else 0.0)
+                arc_min_divisions, first_index = 1, 1
+            elif command.i is not None and command.j is not None:
+                # Heidenhain: I/J hold the absolute CC centre
+                clockwise = HEIDENHAIN_ARC_COMMANDS[name]
+                cx, cy = command.i, command.j
+                arc_min_divisions, first_index = 2, 0
+            else:
+                # Arc centre not defined, fall back to a straight move
+                missing_centers += 1
+                kind = SEGMENT_LINEAR
+
+        if kind == SEGMENT_LINEAR:
+            dx, dy, dz = tx - x, ty - y, tz - z
+            distance = math.sqrt(dx * dx + dy * dy + dz * dz)
+            if distance < 1e-6:  # Very small movement
+                x, y, z = tx, ty, tz
+                continue
+
+            kinds.append(SEGMENT_LINEAR)
+            centers.append((0.0, 0.0))
+            radii.append(0.0)
+            start_angles.append(0.0)
+            sweeps.append(0.0)
+            lengths.append(distance)
+            min_divisions.append(1)
+            first.append(1)
+        else:
+            sx, sy = x - cx, y - cy
+            start_angle = math.atan2(sy, sx)
+            end_angle = math.atan2(ty - cy, tx - cx)
+            radius = math.sqrt(sx * sx + sy * sy)
+
+            # Adjust angles for clockwise/counter-clockwise
+            if clockwise:
+                if end_angle > start_angle:
+                    end_angle -= 2 * math.pi
+            else:
+                if end_angle < start_angle:
+                    end_angle += 2 * math.pi
+
+            sweep = end_angle - start_angle
+            arc_length = radius * abs(sweep)
+
+            kinds.append(SEGMENT_ARC)
+            centers.append((cx, cy))
+            radii.append(radius)
+            start_angles.append(start_angle)
+            sweeps.append(sweep)
+            lengths.append(arc_length)
+            min_divisions.append(arc_min_divisions)
+            first.append(first_index)
+
+        starts.append((x, y, z))
+        ends.append((tx, ty, tz))
+        rows.append(row)
+        x, y, z = tx, ty, tz
+
+    if missing_centers:
+        print(f"Warning: Arc center not defined for {missing_centers} arcs, using linear interpolation")
+
+    kinds = np.array(kinds, dtype=np.int8)
+    radii = np.array(radii, dtype=np.float64)
+    sweeps = np.array(sweeps, dtype=np.float64)
+    divisions = segment_divisions(kinds == SEGMENT_ARC, np.array(lengths, dtype=np.float64), radii, sweeps,
+                                  np.array(min_divisions, dtype=np.int64), resolution, tolerance)
+
+    return SegmentPlan(
+        kinds=kinds,
+        starts=np.array(starts, dtype=np.float64).reshape(-1, 3),
+        ends=np.array(ends, dtype=np.float64).reshape(-1, 3),
+        centers=np.array(centers, dtype=np.float64).reshape(-1, 2),
+        radii=radii,
+        start_angles=np.array(start_angles, dtype=np.float64),
+        sweeps=sweeps,
+        divisions=divisions,
+        first=np.array(first, dtype=np.int64),
+        end_position=np.array([x, y, z], dtype=np.float64),
+        rows=np.array(rows, dtype=np.int64)
+    )
+
+
+def _forward_fill(column: np.ndarray, start: float) -> np.ndarray:
+    """Replace NaN (absent word) entries with the last present value, starting from `start`."""
+    present = ~np.isnan(column)
+    source = np.where(present, np.arange(1, len(column) + 1), 0)
+    np.maximum.accumulate(source, out=source)
+    return np.concatenate(([start], column))[source]
+
+
+def _plan_table_segments(table: CommandTable, resolution: float,
+                         start_position: Optional[Sequence[float]] = None,
+                         tolerance: Optional[float] = None) -> SegmentPlan:
+    """Vectorized plan_segments for a columnar CommandTable."""
+    start = np.zeros(3) if start_position is None else np.asarray(start_position, dtype=np.float64)
+
+    motion = np.isin(table.opcodes, MOTION_OPCODE_LIST)
+    opcodes = table.opcodes[motion]
+    values = table.values[:, motion]
+
+    # Modal positions: absent axis words keep the previous value
+    targets = np.column_stack([_forward_fill(values[axis], start[axis]) for axis in range(3)])
+    starts = np.vstack((start[None, :], targets[:-1]))
+    end_position = targets[-1].copy() if len(targets) else start.copy()
+
+    i_words, j_words = values[3], values[4]
+    heidenhain_arc = np.isin(opcodes, HEIDENHAIN_ARC_OPCODES)
+    has_center = ~np.isnan(i_words) & ~np.isnan(j_words)
+    missing_centers = int(np.count_nonzero(heidenhain_arc & ~has_center))
+    if missing_centers:
+        print(f"Warning: Arc center not defined for {missing_centers} arcs, using linear interpolation")
+
+    is_arc = ~np.isin(opcodes, LINEAR_OPCODES) & (~heidenhain_arc | has_center)
+    heidenhain_arc &= has_center
+
+    # Linear segments; very small movements produce no points
+    delta = targets - starts
+    distance = np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1] + delta[:, 2] * delta[:, 2])
+    keep = is_arc | (distance >= 1e-6)
+
+    # Arc centres: G-code I/J are offsets from the start, Heidenhain I/J are absolute
+    centers = np.zeros((len(opcodes), 2))
+    gcode_arc = is_arc & ~heidenhain_arc
+    centers[gcode_arc, 0] = starts[gcode_arc, 0] + np.nan_to_num(i_words[gcode_arc])
+    centers[gcode_arc, 1] = starts[gcode_arc, 1] + np.nan_to_num(j_words[gcode_arc])
+    centers[heidenhain_arc, 0] = i_words[heidenhain_arc]
+    centers[heidenhain_arc, 1] = j_words[heidenhain_arc]
+
+    sx = starts[:, 0] - centers[:, 0]
+    sy = starts[:, 1] - centers[:, 1]
+    start_angles = np.arctan2(sy, sx)
+    end_angles = np.arctan2(targets[:, 1] - centers[:, 1], targets[:, 0] - centers[:, 0])
+    radii = np.sqrt(sx * sx + sy * sy)
+
+    # Adjust angles for clockwise/counter-clockwise
+    clockwise = np.isin(opcodes, CLOCKWISE_OPCODES)
+    end_angles[clockwise & (end_angles > start_angles)] -= 2 * math.pi
+    end_angles[~clockwise & (end_angles < start_angles)] += 2 * math.pi
+    sweeps = end_angles - start_angles
+
+    lengths = np.where(is_arc, radii * np.abs(sweeps), distance)
+    min_divisions = np.where(heidenhain_arc, 2, 1)
+    divisions = segment_divisions(is_arc, lengths, radii, sweeps, min_divisions, resolution, tolerance)
+    first = np.where(heidenhain_arc, 0, 1)
+
+    linear = ~is_arc
+    centers[linear] = 0.0
+    radii[linear] = 0.0
+    start_angles[linear] = 0.0
+    sweeps[linear] = 0.0
+
+    return SegmentPlan(
+        kinds=np.where(is_arc, SEGMENT_ARC, SEGMENT_LINEAR).astype(np.int8)[keep],
+        starts=starts[keep],
+        ends=targets[keep],
+        centers=centers[keep],
+        radii=radii[keep],
+        start_angles=start_angles[keep],
+        sweeps=sweeps[keep],
+        divisions=divisions[keep],
+        first=first[keep].astype(np.int64),
+        end_position=end_position,
+        rows=np.flatnonzero(motion)[keep]
+    )
+
+
+def fill_segments(plan: SegmentPlan, out: np.ndarray, seg_start: int = 0,
+                  seg_end: Optional[int] = None,
+                  block_points: int = DEFAULT_BLOCK_POINTS) -> None:
+    """
+    Write the points of segments [seg_start, seg_end) into `out`.
+
+    `out` is the full (plan.num_points, 3) output array; the segments are
+    written to their own disjoint rows, so independent ranges can be filled
+    concurrently.
+    """
+    if seg_end is None:
+        seg_end = plan.num_segments
+
+    # Split the range into blocks of roughly block_points points each
+    lo = seg_start
+    while lo < seg_end:
+        limit = plan.offsets[lo] + block_points
+        hi = int(np.searchsorted(plan.offsets, limit, side='right')) - 1
+        hi = min(max(hi, lo + 1), seg_end)
+        _fill_block(plan, out, lo, hi)
+        lo = hi
+
+
+def _fill_block(plan: SegmentPlan, out: np.ndarray, lo: int, hi: int) -> None:
+    """Vectorized interpolation of segments [lo, hi) in a single pass."""
+    counts = plan.counts[lo:hi]
+    row_start = int(plan.offsets[lo])
+    row_end = int(plan.offsets[hi])
+    if row_end == row_start:
+        return
+
+    segment = np.repeat(np.arange(lo, hi), counts)
+    local = np.arange(row_end - row_start) - np.repeat(plan.offsets[lo:hi] - row_start, counts)
+    t = (local + plan.first[segment]) / plan.divisions[segment]
+
+    starts = plan.starts[segment]
+    block = out[row_start:row_end]
+    np.add(starts, t[:, None] * (plan.ends[segment] - starts), out=block)
+
+    # Arcs replace X/Y with points on the circle, Z stays linearly interpolated
+    arc_rows = np.nonzero(plan.kinds[segment] == SEGMENT_ARC)[0]
+    if len(arc_rows):
+        arc_segment = segment[arc_rows]
+        angle = plan.start_angles[arc_segment] + t[arc_rows] * plan.sweeps[arc_segment]
+        radius = plan.radii[arc_segment]
+        block[arc_rows, 0] = plan.centers[arc_segment, 0] + radius * np.cos(angle)
+        block[arc_rows, 1] = plan.centers[arc_segment, 1] + radius * np.sin(angle)
+
+
+def interpolate_plan(plan: SegmentPlan, block_points: int = DEFAULT_BLOCK_POINTS) -> np.ndarray:
+    """Generate all points of a plan as one contiguous (N, 3) float array."""
+    out = np.empty((plan.num_points, 3), dtype=np.float64)
+    fill_segments(plan, out, block_points=block_points)
+    return out
+
+
+def split_segment_ranges(plan: SegmentPlan, num_ranges: int) -> List[Tuple[int, int]]:
+    """Split the segments into contiguous ranges holding roughly equal numbers of points."""
+    targets = np.linspace(0, plan.num_points, num_ranges + 1)
+    bounds = np.searchsorted(plan.offsets, targets, side='left')
+    bounds = np.unique(np.clip(bounds, 0, plan.num_segments))
+    return [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+def _init_worker(shared_points, plan: SegmentPlan) -> None:
+    """Attach a worker process to the shared output buffer."""
+    global _worker_plan, _worker_out
+    _worker_plan = plan
+    _worker_out = np.frombuffer(shared_points, dtype=np.float64).reshape(-1, 3)
+
+
+def _fill_worker_range(segment_range: Tuple[int, int]) -> int:
+    """Fill one segment range inside a worker process."""
+    seg_start, seg_end = segment_range
+    fill_segments(_worker_plan, _worker_out, seg_start, seg_end)
+    return seg_end - seg_start
+
+
+def interpolate_plan_parallel(plan: SegmentPlan, num_workers: int) -> np.ndarray:
+    """
+    Generate all points of a plan using worker processes.
+
+    Every segment already knows its start point and output rows from the
+    planning pass, so workers fill disjoint row ranges of one shared-memory
+    array without any coordination.
+    """
+    shared_points = mp.RawArray('d', max(1, plan.num_points * 3))
+    out = np.frombuffer(shared_points, dtype=np.float64)[:plan.num_points * 3].reshape(-1, 3)
+
+    ranges = split_segment_ranges(plan, num_workers * RANGES_PER_WORKER)
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker,
+                             initargs=(shared_points, plan)) as executor:
+        for _ in executor.map(_fill_worker_range, ranges):
+            pass
+
+    return out
+
+
+def interpolate_commands(commands: Sequence[GCodeCommand], resolution: float,
+                         start_position: Optional[Sequence[float]] = None,
+                         tolerance: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Interpolate a whole program in batch.
+
+    `tolerance` is the chordal tolerance passed on to plan_segments.
+
+    Returns:
+        (points, end_position) where points is an (N, 3) float array
+    """
+    plan = plan_segments(commands, resolution, start_position, tolerance)
+    return interpolate_plan(plan), plan.end_position
@@ -0,0 +1,76 @@
+"""
+Memory-mapped line reading and block-aligned byte ranges of NC files.
+"""
+import mmap
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple, Union
+
+# Bytes decoded at once when iterating lines (extended to the next line end)
+DECODE_BLOCK_BYTES = 4 * 1024 * 1024
+
+Buffer = Union[mmap.mmap, bytes]
+
+
+@contextmanager
+def map_file(file_path: str) -> Iterator[Buffer]:
+    """Read-only memory map of a file (empty bytes for an empty file, which mmap rejects)."""
+    with open(file_path, 'rb') as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            yield b''
+            return
+        try:
+            yield buffer
+        finally:
+            buffer.close()
+
+
+def line_end(buffer: Buffer, position: int, stop: int) -> int:
+    """Offset just past the line containing `position` (or `stop` if that line does not end before it)."""
+    if position <= 0:
+        return 0
+    end = buffer.find(b'\n', position - 1, stop)
+    return stop if end < 0 else end + 1
+
+
+def iter_mapped_lines(buffer: Buffer, start: int = 0, stop: int = None,
+                      block_bytes: int = DECODE_BLOCK_BYTES) -> Iterator[str]:
+    """
+    Yield the lines of buffer[start:stop] as text, without their line ends.
+
+    Line boundaries are found in the raw bytes and only one block of whole
+    lines is decoded at a time, so the file is never held as one string.
+    `start` must be the first byte of a line.
+    """
+    stop = len(buffer) if stop is None else stop
+    position = start
+    while position < stop:
+        end = line_end(buffer, min(position + block_bytes, stop), stop)
+        lines = buffer[position:end].decode('utf-8').split('\n')
+        if lines[-1] == '':
+            lines.pop()  # The block ended with a line end
+        yield from lines
+        position = end
+
+
+def count_lines(buffer: Buffer, start: int = 0, stop: int = None,
+                block_bytes: int = DECODE_BLOCK_BYTES) -> int:
+    """Number of line ends in buffer[start:stop]."""
+    stop = len(buffer) if stop is None else stop
+    return sum(buffer[lo:min(lo + block_bytes, stop)].count(b'\n') for lo in range(start, stop, block_bytes))
+
+
+def split_byte_ranges(buffer: Buffer, parts: int) -> List[Tuple[int, int]]:
+    """
+    Split a buffer into up to `parts` byte ranges of about equal size that start and end on line boundaries.
+    """
+    size = len(buffer)
+    bounds = [0]
+    for part in range(1, max(parts, 1)):
+        bound = line_end(buffer, size * part // parts, size)
+        if bound > bounds[-1]:
+            bounds.append(bound)
+    if size > bounds[-1]:
+        bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
@@ -0,0 +1,295 @@
+"""
+Kinematic motion planner for cycle-time estimation.
+
+Only depends on NumPy and works on plain per-segment arrays of line and
+arc segments (see path_calculator.plan_cycle_time for the NC Parser side).
+"""
+import json
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+
+
+# Bisection steps when solving for the peak speed of short segments
+PEAK_SPEED_ITERATIONS = 40
+
+# Cosine thresholds for straight-through and full-reversal junctions
+STRAIGHT_JUNCTION_COS = -0.999999
+REVERSAL_JUNCTION_COS = 0.999999
+
+
+class MachineLimits:
+    """Axis velocity/acceleration/jerk limits of a machine tool."""
+
+    def __init__(self,
+                 rapid_rates: Sequence[float] = (15000.0, 15000.0, 10000.0),
+                 max_accelerations: Sequence[float] = (1500.0, 1500.0, 1000.0),
+                 max_jerk: Optional[float] = 30000.0,
+                 max_feed_rate: float = 10000.0,
+                 junction_deviation: float = 0.02,
+                 tool_change_time: float = 0.0):
+        """
+        Args:
+            rapid_rates: Rapid traverse rate per X/Y/Z axis (mm/min)
+            max_accelerations: Acceleration limit per X/Y/Z axis (mm/s²)
+            max_jerk: Path jerk limit (mm/s³), None for a trapezoidal profile
+            max_feed_rate: Upper limit for programmed feed rates (mm/min)
+            junction_deviation: Allowed corner rounding when blending segments (mm)
+            tool_change_time: Time per tool change (s)
+        """
+        self.rapid_rates = np.asarray(rapid_rates, dtype=np.float64)
+        self.max_accelerations = np.asarray(max_accelerations, dtype=np.float64)
+        self.max_jerk = max_jerk
+        self.max_feed_rate = float(max_feed_rate)
+        self.junction_deviation = float(junction_deviation)
+        self.tool_change_time = float(tool_change_time)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MachineLimits':
+        """Create limits from a dictionary using the constructor's argument names."""
+        names = ('rapid_rates', 'max_accelerations', 'max_jerk', 'max_feed_rate',
+                 'junction_deviation', 'tool_change_time')
+        return cls(**{name: data[name] for name in names if name in data})
+
+    @classmethod
+    def from_json(cls, path: str) -> 'MachineLimits':
+        """Load limits from a JSON file (see from_dict)."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self) -> Dict:
+        return {
+            'rapid_rates': self.rapid_rates.tolist(),
+            'max_accelerations': self.max_accelerations.tolist(),
+            'max_jerk': self.max_jerk,
+            'max_feed_rate': self.max_feed_rate,
+            'junction_deviation': self.junction_deviation,
+            'tool_change_time': self.tool_change_time,
+        }
+
+    def __repr__(self):
+        return (f"MachineLimits(rapid={self.rapid_rates.tolist()} mm/min, "
+                f"accel={self.max_accelerations.tolist()} mm/s², jerk={self.max_jerk} mm/s³)")
+
+
+class MotionProfile:
+    """Per-segment result of motion planning (speeds in mm/s, times in s)."""
+
+    def __init__(self, lengths: np.ndarray, times: np.ndarray, entry_speeds: np.ndarray,
+                 exit_speeds: np.ndarray, peak_speeds: np.ndarray, rapid: np.ndarray,
+                 tool_changes: int = 0, tool_change_time: float = 0.0):
+        self.lengths = lengths
+        self.times = times
+        self.entry_speeds = entry_speeds
+        self.exit_speeds = exit_speeds
+        self.peak_speeds = peak_speeds
+        self.rapid = rapid
+        self.tool_changes = tool_changes
+        self.tool_change_time = tool_change_time
+
+    @classmethod
+    def concatenate(cls, profiles: Sequence['MotionProfile']) -> 'MotionProfile':
+        """Join the profiles of consecutive program sections (e.g. separately planned tool segments)."""
+        if not profiles:
+            empty = np.empty(0)
+            return cls(empty, empty, empty, empty, empty, np.empty(0, dtype=bool))
+        arrays = [np.concatenate([getattr(profile, name) for profile in profiles])
+                  for name in ('lengths', 'times', 'entry_speeds', 'exit_speeds', 'peak_speeds', 'rapid')]
+        return cls(*arrays, tool_changes=sum(profile.tool_changes for profile in profiles),
+                   tool_change_time=profiles[0].tool_change_time)
+
+    @property
+    def rapid_time(self) -> float:
+        return float(self.times[self.rapid].sum())
+
+    @property
+    def feed_time(self) -> float:
+        return float(self.times[~self.rapid].sum())
+
+    @property
+    def total_time(self) -> float:
+        """Total cycle time in seconds, including tool changes."""
+        return float(self.times.sum()) + self.tool_changes * self.tool_change_time
+
+    @property
+    def total_minutes(self) -> float:
+        return self.total_time / 60.0
+
+    def __repr__(self):
+        return f"MotionProfile({len(self.times)} segments, {self.total_time:.1f}s)"
+
+
+def segment_geometry(starts: np.ndarray, ends: np.ndarray, is_arc: Optional[np.ndarray] = None,
+                     radii: Optional[np.ndarray] = None, start_angles: Optional[np.ndarray] = None,
+                     sweeps: Optional[np.ndarray] = None) -> Tuple[np.ndarray, ...]:
+    """
+    True lengths and tangents of line and XY-plane arc (helix) segments.
+
+    Returns:
+        (lengths, entry_dirs, exit_dirs, axis_weights, curvature_radii) where
+        axis_weights holds the largest |direction component| per axis over the
+        segment and curvature_radii is inf for lines
+    """
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 3)
+    ends = np.asarray(ends, dtype=np.float64).reshape(-1, 3)
+    count = len(starts)
+    delta = ends - starts
+    chord = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        directions = np.where(chord[:, None] > 0, delta / chord[:, None], 0.0)
+    lengths = chord.copy()
+    entry_dirs = directions.copy()
+    exit_dirs = directions.copy()
+    axis_weights = np.abs(directions)
+    curvature_radii = np.full(count, np.inf)
+
+    if is_arc is not None and np.any(is_arc):
+        arc = np.flatnonzero(is_arc)
+        radius = np.asarray(radii, dtype=np.float64)[arc]
+        sweep = np.asarray(sweeps, dtype=np.float64)[arc]
+        angle = np.asarray(start_angles, dtype=np.float64)[arc]
+        planar = radius * np.abs(sweep)
+        dz = delta[arc, 2]
+        length = np.sqrt(planar * planar + dz * dz)
+        safe = np.where(length > 0, length, 1.0)
+        turn = np.sign(sweep)
+
+        for target, phi in ((entry_dirs, angle), (exit_dirs, angle + sweep)):
+            target[arc, 0] = -turn * np.sin(phi) * planar / safe
+            target[arc, 1] = turn * np.cos(phi) * planar / safe
+            target[arc, 2] = dz / safe
+
+        lengths[arc] = length
+        # Either planar axis may run at the full planar speed somewhere on the arc
+        axis_weights[arc, 0] = planar / safe
+        axis_weights[arc, 1] = planar / safe
+        axis_weights[arc, 2] = np.abs(dz) / safe
+        curvature_radii[arc] = np.where(radius > 0, radius, np.inf)
+
+    return lengths, entry_dirs, exit_dirs, axis_weights, curvature_radii
+
+
+def _phase_time(dv: np.ndarray, accel: np.ndarray, jerk: Optional[float]) -> np.ndarray:
+    """Time of a jerk-limited (S-curve) speed change of dv, trapezoidal if jerk is None."""
+    dv = np.maximum(dv, 0.0)
+    if not jerk:
+        return dv / accel
+    reaches_accel = dv * jerk >= accel * accel
+    return np.where(reaches_accel, dv / accel + accel / jerk, 2.0 * np.sqrt(dv / jerk))
+
+
+def _ramp_distance(v_from: np.ndarray, v_to: np.ndarray, accel: np.ndarray,
+                   jerk: Optional[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """Distance and time of a symmetric speed ramp between two speeds."""
+    time = _phase_time(np.abs(v_to - v_from), accel, jerk)
+    return 0.5 * (v_from + v_to) * time, time
+
+
+def plan_motion(lengths: np.ndarray, entry_dirs: np.ndarray, exit_dirs: np.ndarray,
+                feeds: np.ndarray, rapid: np.ndarray, limits: MachineLimits,
+                axis_weights: Optional[np.ndarray] = None,
+                curvature_radii: Optional[np.ndarray] = None,
+                stops: Optional[np.ndarray] = None,
+                tool_changes: int = 0) -> MotionProfile:
+    """
+    Plan speeds and segment times for a sequence of connected segments.
+
+    The steps are all whole-array operations:
+    1. Cap each segment's speed by its feed (or axis rapid rates), the axis
+       velocity limits and, for arcs, the centripetal acceleration.
+    2. Limit junction speeds by corner angle (junction deviation model).
+    3. Look ahead: propagate deceleration backwards and acceleration
+       forwards. With w = v², the recurrence w[i] <= w[i+1] + 2*a*L is a
+       min-plus scan, solved in closed form by prefix/suffix minima.
+    4. Time each segment as an accelerate/cruise/decelerate profile, with
+       jerk-limited ramps when max_jerk is set.
+
+    Args:
+        lengths: Path length of every segment (mm)
+        entry_dirs, exit_dirs: Unit tangents at the start/end of each segment
+        feeds: Programmed feed rate per segment (mm/min), ignored for rapids
+        rapid: True for rapid traverse segments
+        limits: Machine limits
+        axis_weights: Largest |direction component| per axis (defaults to |entry_dirs|)
+        curvature_radii: Path radius for the centripetal limit (inf for lines)
+        stops: True where the machine must stop before a segment (e.g. tool change)
+        tool_changes: Number of tool changes to add to the total time
+
+    Returns:
+        MotionProfile with per-segment speeds and times
+    """
+    lengths = np.asarray(lengths, dtype=np.float64)
+    rapid = np.asarray(rapid, dtype=bool)
+    count = len(lengths)
+    if count == 0:
+        empty = np.empty(0)
+        return MotionProfile(empty, empty, empty, empty, empty, np.empty(0, dtype=bool),
+                             tool_changes, limits.tool_change_time)
+
+    entry_dirs = np.asarray(entry_dirs, dtype=np.float64).reshape(-1, 3)
+    exit_dirs = np.asarray(exit_dirs, dtype=np.float64).reshape(-1, 3)
+    weights = np.abs(entry_dirs) if axis_weights is None else np.asarray(axis_weights, dtype=np.float64)
+
+    with np.errstate(divide='ignore'):
+        # Axis limits scaled to the path direction
+        axis_speed = np.min(limits.rapid_rates / 60.0 / weights, axis=1)
+        accel = np.min(limits.max_accelerations / weights, axis=1)
+    accel = np.where(np.isfinite(accel), accel, limits.max_accelerations.min())
+
+    feed_speed = np.minimum(np.nan_to_num(np.asarray(feeds, dtype=np.float64), nan=0.0),
+                            limits.max_feed_rate) / 60.0
+    speed = np.where(rapid, axis_speed, np.minimum(feed_speed, axis_speed))
+    if curvature_radii is not None:
+        speed = np.minimum(speed, np.sqrt(accel * np.asarray(curvature_radii, dtype=np.float64)))
+    speed = np.maximum(speed, 1e-9)
+
+    # Junction limits between segment i and i + 1 (node i + 1)
+    junction = np.zeros(count + 1)
+    if count > 1:
+        cos_theta = -np.einsum('ij,ij->i', exit_dirs[:-1], entry_dirs[1:])
+        sin_half = np.sqrt(np.clip(0.5 * (1.0 - cos_theta), 0.0, 1.0))
+        corner_accel = np.minimum(accel[:-1], accel[1:])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corner = corner_accel * limits.junction_deviation * sin_half / (1.0 - sin_half)
+        corner = np.where(cos_theta < STRAIGHT_JUNCTION_COS, np.inf, corner)
+        corner = np.where(cos_theta > REVERSAL_JUNCTION_COS, 0.0, corner)
+        corner = np.minimum(corner, np.minimum(speed[:-1], speed[1:]) ** 2)
+        if stops is not None:
+            corner = np.where(np.asarray(stops, dtype=bool)[1:], 0.0, corner)
+        junction[1:-1] = corner
+
+    # Look-ahead over squared speeds: w[k] <= w[k+1] + reach[k] and w[k+1] <= w[k] + reach[k]
+    reach = 2.0 * accel * lengths
+    prefix = np.concatenate(([0.0], np.cumsum(reach)))
+    backward = np.minimum.accumulate((junction + prefix)[::-1])[::-1] - prefix
+    squared = np.minimum.accumulate(backward - prefix) + prefix
+    squared = np.maximum(np.minimum(squared, backward), 0.0)
+
+    v0 = np.minimum(np.sqrt(squared[:-1]), speed)
+    v1 = np.minimum(np.sqrt(squared[1:]), speed)
+    jerk = limits.max_jerk
+
+    # Peak speed: full cruise speed if the ramps fit, else solve ramps == length
+    low = np.maximum(v0, v1)
+    peak = speed.copy()
+    up, _ = _ramp_distance(v0, peak, accel, jerk)
+    down, _ = _ramp_distance(peak, v1, accel, jerk)
+    short = up + down > lengths
+    if np.any(short):
+        lo, hi = low[short], speed[short]
+        a_short, v0_short, v1_short, l_short = accel[short], v0[short], v1[short], lengths[short]
+        for _ in range(PEAK_SPEED_ITERATIONS):
+            mid = 0.5 * (lo + hi)
+            distance = (_ramp_distance(v0_short, mid, a_short, jerk)[0]
+                        + _ramp_distance(mid, v1_short, a_short, jerk)[0])
+            too_far = distance > l_short
+            hi = np.where(too_far, mid, hi)
+            lo = np.where(too_far, lo, mid)
+        peak[short] = lo
+
+    up, up_time = _ramp_distance(v0, peak, accel, jerk)
+    down, down_time = _ramp_distance(peak, v1, accel, jerk)
+    cruise = np.maximum(lengths - up - down, 0.0) / peak
+    times = up_time + down_time + cruise
+
+    return MotionProfile(lengths, times, v0, v1, peak, rapid, tool_changes, limits.tool_change_time)
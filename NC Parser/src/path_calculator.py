@@ -1,55 +1,231 @@
 import numpy as np
 import math
-from typing import List, Tuple, Optional
-from gcode_parser import GCodeCommand
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import List, Tuple, Optional, Iterable, Iterator, Sequence
+from gcode_parser import GCodeCommand, ToolInfo, ToolSegment
+from interpolation import (SegmentPlan, SEGMENT_ARC, plan_segments, interpolate_plan,
+                           interpolate_plan_parallel, _forward_fill)
+from command_table import CommandTable
+from motion_planner import MachineLimits, MotionProfile, plan_motion, segment_geometry
+from stock_model import cutter_profile
 import multiprocessing as mp
-from functools import partial
 import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Footprint stencil of calculate_material_removal: directions around the tool axis and rings out to its radius
+FOOTPRINT_ANGLES = 12
+FOOTPRINT_RINGS = 3
+
+
+def footprint_stencil(tool_radius: float, cutter_type: str = '', corner_radius: float = 0.0,
+                      angles: int = FOOTPRINT_ANGLES, rings: int = FOOTPRINT_RINGS) -> np.ndarray:
+    """
+    Offsets from the tool tip of points on the cutter's underside.
+
+    Points lie on `rings` evenly spaced rings from the axis (one point) to
+    the tool radius, `angles` per ring. Their Z offsets follow the cutter
+    profile, so ball and bull nose cutters curve up towards the rim while
+    flat end mills stay at the tip height (see stock_model.cutter_profile).
+
+    Returns:
+        (1 + (rings - 1) * angles, 3) array of offsets
+    """
+    theta = np.linspace(0, 2 * np.pi, angles, endpoint=False)
+    radii = np.linspace(0, tool_radius, rings)[1:]
+    ring_x = np.outer(radii, np.cos(theta)).ravel()
+    ring_y = np.outer(radii, np.sin(theta)).ravel()
+    ring_z = cutter_profile(np.repeat(radii, angles), tool_radius, cutter_type, corner_radius)
+    return np.vstack(([0.0, 0.0, 0.0], np.column_stack((ring_x, ring_y, ring_z))))
+
+
+def footprint_points(path_points: np.ndarray, tool_radius: float, cutter_type: str = '',
+                     corner_radius: float = 0.0,
+                     workpiece_bounds: Optional[Tuple[Tuple[float, float], Tuple[float, float],
+                                                      Tuple[float, float]]] = None) -> np.ndarray:
+    """Cutter footprint stencil placed at every path point, keeping the points inside workpiece_bounds."""
+    stencil = footprint_stencil(tool_radius, cutter_type, corner_radius)
+    points = (path_points[:, None, :] + stencil[None, :, :]).reshape(-1, 3)
+    if workpiece_bounds is None:
+        return points
+    lower = np.array([bounds[0] for bounds in workpiece_bounds])
+    upper = np.array([bounds[1] for bounds in workpiece_bounds])
+    return points[np.all((points >= lower) & (points <= upper), axis=1)]
+
+
+def plan_cycle_time(table: CommandTable, plan: SegmentPlan, limits: MachineLimits,
+                    tool_change_at_start: bool = False) -> MotionProfile:
+    """
+    Kinematic motion profile of the segments of `plan`, which was planned from `table`.
+    
+    Loading the first tool is not a tool change; set tool_change_at_start
+    when `table` continues a program after a change to its first tool.
+    """
+    lengths, entry_dirs, exit_dirs, weights, curvature = segment_geometry(
+        plan.starts, plan.ends, plan.kinds == SEGMENT_ARC, plan.radii, plan.start_angles, plan.sweeps)
+    
+    # Modal feed rate (default 100 mm/min, as in calculate_machining_time)
+    feeds = _forward_fill(table.values[6], 100.0)[plan.rows]
+    rapid_opcodes = [table.opcode(name) for name in ('G00', 'L_RAPID')]
+    rapid = np.isin(table.opcodes[plan.rows], rapid_opcodes)
+    
+    # The machine stops for every tool change
+    known = table.tools[table.tools >= 0]
+    tool_changes = int(np.count_nonzero(known[1:] != known[:-1])) + int(tool_change_at_start)
+    segment_tools = table.tools[plan.rows]
+    stops = np.concatenate(([True], segment_tools[1:] != segment_tools[:-1]))
+    
+    return plan_motion(lengths, entry_dirs, exit_dirs, feeds, rapid, limits,
+                       axis_weights=weights, curvature_radii=curvature,
+                       stops=stops, tool_changes=tool_changes)
+
+
+class ToolSegmentResult:
+    """Path, removal and timing of one tool segment (see PathCalculator.simulate_tool_segments)."""
+    
+    def __init__(self, segment: ToolSegment, diameter: float, path_points: int,
+                 removal_points: np.ndarray, profile: MotionProfile):
+        self.segment = segment
+        self.diameter = diameter
+        self.path_points = path_points  # Number of points of the dense tool path
+        self.removal_points = removal_points
+        self.profile = profile
+    
+    @property
+    def tool_number(self) -> Optional[int]:
+        return self.segment.tool_number
+    
+    @property
+    def cutter_type(self) -> str:
+        return self.segment.tool_info.cutter_type if self.segment.tool_info is not None else ''
+    
+    @property
+    def corner_radius(self) -> float:
+        return self.segment.tool_info.corner_radius if self.segment.tool_info is not None else 0.0
+    
+    @property
+    def path_length(self) -> float:
+        return float(self.profile.lengths.sum())
+    
+    @property
+    def cutting_length(self) -> float:
+        return float(self.profile.lengths[~self.profile.rapid].sum())
+    
+    def __repr__(self):
+        return (f"ToolSegmentResult(T{self.tool_number}, D{self.diameter}mm, "
+                f"{self.path_length:.1f}mm, {self.profile.total_time:.1f}s)")
+
+
+def simulate_tool_segment(table: CommandTable, segment: ToolSegment, plan: SegmentPlan,
+                          path_points: np.ndarray, diameter: float, limits: MachineLimits,
+                          workpiece_bounds=None, removal: bool = True,
+                          tool_change_at_start: bool = False) -> ToolSegmentResult:
+    """
+    Material removal and cycle time of one tool segment from its slice of the program's path.
+    
+    `table` holds only the segment's rows, with the feed column already
+    forward-filled so the modal feed carries over from earlier segments,
+    and `plan`/`path_points` are the segment's part of the whole program's
+    plan and dense tool path (see SegmentPlan.take).
+    Set tool_change_at_start when an earlier segment had a known tool.
+    """
+    removal_points = np.empty((0, 3))
+    if removal and len(path_points):
+        info = segment.tool_info
+        removal_points = footprint_points(
+            path_points, diameter / 2.0,
+            info.cutter_type if info is not None else '',
+            info.corner_radius if info is not None else 0.0,
+            workpiece_bounds)
+    return ToolSegmentResult(segment, diameter, plan.num_points, removal_points,
+                             plan_cycle_time(table, plan, limits, tool_change_at_start))
+
+
+def _simulate_tool_segment_task(task: Tuple) -> ToolSegmentResult:
+    """Unpack simulate_tool_segment arguments in a worker process."""
+    return simulate_tool_segment(*task)
 
 
 class PathCalculator:
-    """Calculates tool paths and generates interpolated points with multithreading support."""
+    """Calculates tool paths and generates interpolated points with multiprocessing support."""
     
-    def __init__(self, resolution: float = 0.1):
+    def __init__(self, resolution: float = 0.1, tolerance: Optional[float] = None):
         """
         Initialize path calculator.
         
         Args:
             resolution: Distance between interpolated points (mm)
+            tolerance: Chordal tolerance (mm) for adaptive discretization; lines then
+                       emit only their end points and arcs are split by chord error
         """
         self.resolution = resolution
+        self.tolerance = tolerance
         self.current_position = np.array([0.0, 0.0, 0.0])
-        self.num_threads = min(mp.cpu_count(), 8)  # Limit to 8 threads max
-        self.parallel_threshold = 1000  # Use parallel processing for files with >1000 commands
+        self.num_threads = min(mp.cpu_count(), 16)  # Worker processes for large paths
+        self.parallel_threshold = 2_000_000  # Use worker processes for paths with >2M points
+        self.tool_parallel_threshold = 20_000  # Simulate tool segments in workers for programs this long
         print(f"PathCalculator initialized with {self.num_threads} threads")
         
-    def calculate_tool_path(self, commands: List[GCodeCommand]) -> List[np.ndarray]:
+    def calculate_tool_path(self, commands: List[GCodeCommand], dense: bool = False) -> np.ndarray:
         """
-        Calculate complete tool path from G-code commands with parallel processing.
+        Calculate complete tool path from G-code commands with batch interpolation.
+        
+        Segment geometry (including the start point of every segment) is
+        resolved in one pass over the commands, then all points are generated
+        with vectorized NumPy math, split across worker processes for large paths.
         
         Args:
             commands: List of G-code commands
+            dense: Sample every segment at `resolution` even if a tolerance is set
+                   (for consumers such as material removal that need evenly spaced points)
             
         Returns:
-            List of 3D points representing the tool path
+            (N, 3) array of points representing the tool path
         """
         start_time = time.time()
         print(f"Calculating tool path for {len(commands)} commands...")
         
-        if len(commands) > self.parallel_threshold:
-            print(f"Using parallel processing with {self.num_threads} threads")
-            path_points = self._calculate_path_parallel(commands)
-        else:
-            print("Using single-threaded processing")
-            path_points = self._calculate_path_sequential(commands)
+        plan = plan_segments(commands, self.resolution, tolerance=None if dense else self.tolerance)
+        path_points = self._interpolate(plan)
+        self.current_position = plan.end_position.copy()
         
         elapsed = time.time() - start_time
         print(f"Path calculation completed in {elapsed:.2f}s, generated {len(path_points)} points")
         return path_points
     
+    def iter_tool_path(self, command_chunks: Iterable[Sequence[GCodeCommand]],
+                       dense: bool = False) -> Iterator[np.ndarray]:
+        """
+        Calculate the tool path chunk by chunk from a stream of command chunks.
+        
+        The machine position is carried from one chunk to the next, so the
+        concatenated output equals calculate_tool_path on the whole program
+        while only one chunk is held in memory at a time.
+        
+        Args:
+            command_chunks: Iterable of command lists, e.g. GCodeParser.iter_commands(path, chunk_size=...)
+            dense: Sample at `resolution` even if a tolerance is set
+            
+        Yields:
+            (M, 3) arrays of tool path points
+        """
+        self.current_position = np.array([0.0, 0.0, 0.0])
+        
+        for chunk in command_chunks:
+            plan = plan_segments(chunk, self.resolution, self.current_position,
+                                 None if dense else self.tolerance)
+            self.current_position = plan.end_position.copy()
+            if plan.num_points > 0:
+                yield self._interpolate(plan)
+    
+    def _interpolate(self, plan: SegmentPlan) -> np.ndarray:
+        """Generate the points of a plan, using worker processes for large paths."""
+        if self.num_threads > 1 and plan.num_points > self.parallel_threshold:
+            print(f"Using parallel processing with {self.num_threads} worker processes")
+            return self._calculate_path_parallel(plan)
+        return interpolate_plan(plan)
+    
     def _calculate_path_sequential(self, commands: List[GCodeCommand]) -> List[np.ndarray]:
-        """Calculate path using single thread (original method)."""
+        """Calculate path one point at a time (reference implementation for the batch engine)."""
         path_points = []
         self.current_position = np.array([0.0, 0.0, 0.0])
         
@@ -59,42 +235,13 @@ class PathCalculator:
             
         return path_points
     
-    def _calculate_path_parallel(self, commands: List[GCodeCommand]) -> List[np.ndarray]:
-        """Calculate path using multiple threads for better performance."""
+    def _calculate_path_parallel(self, plan: SegmentPlan) -> np.ndarray:
+        """Interpolate disjoint segment ranges in worker processes into a shared output array."""
         try:
-            # Split commands into chunks for parallel processing
-            chunk_size = max(100, len(commands) // self.num_threads)
-            command_chunks = [commands[i:i + chunk_size] for i in range(0, len(commands), chunk_size)]
-            
-            # Process chunks in parallel
-            with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
-                chunk_results = list(executor.map(self._process_command_chunk, command_chunks))
-            
-            # Combine results
-            all_points = []
-            for chunk_points in chunk_results:
-                all_points.extend(chunk_points)
-                
-            return all_points
-            
+            return interpolate_plan_parallel(plan, self.num_threads)
         except Exception as e:
             print(f"Parallel processing failed: {e}, falling back to sequential")
-            return self._calculate_path_sequential(commands)
-    
-    def _process_command_chunk(self, commands: List[GCodeCommand]) -> List[np.ndarray]:
-        """Process a chunk of commands in a separate thread."""
-        path_points = []
-        current_pos = np.array([0.0, 0.0, 0.0])  # Local position tracker
-        
-        for command in commands:
-            points = self._process_command_isolated(command, current_pos)
-            path_points.extend(points)
-            
-            # Update local position
-            if points:
-                current_pos = points[-1].copy()
-        
-        return path_points
+            return interpolate_plan(plan)
     
     def _process_command(self, command: GCodeCommand) -> List[np.ndarray]:
         """Process a single G-code command and return interpolated points."""
@@ -122,27 +269,6 @@ class PathCalculator:
         
         return points
     
-    def _process_command_isolated(self, command: GCodeCommand, current_pos: np.ndarray) -> List[np.ndarray]:
-        """Process a single command with isolated position tracking for parallel processing."""
-        points = []
-        
-        # Handle standard G-code commands
-        if command.command in ['G00', 'G01']:
-            points = self._interpolate_linear_isolated(command, current_pos)
-        elif command.command == 'G02':
-            points = self._interpolate_arc_isolated(command, current_pos, clockwise=True)
-        elif command.command == 'G03':
-            points = self._interpolate_arc_isolated(command, current_pos, clockwise=False)
-        
-        # Handle Heidenhain commands
-        elif command.command in ['L_RAPID', 'L_FEED']:
-            points = self._interpolate_linear_isolated(command, current_pos)
-        elif command.command in ['C_CW', 'C_CCW', 'C']:
-            clockwise = command.command == 'C_CW'
-            points = self._interpolate_heidenhain_arc_isolated(command, current_pos, clockwise)
-        
-        return points
-    
     def _interpolate_linear(self, command: GCodeCommand) -> List[np.ndarray]:
         """Interpolate points along a linear path."""
         # Get target position
@@ -170,30 +296,6 @@ class PathCalculator:
         
         return points
     
-    def _interpolate_linear_isolated(self, command: GCodeCommand, current_pos: np.ndarray) -> List[np.ndarray]:
-        """Interpolate points along a linear path with isolated position tracking."""
-        # Get target position
-        target = self._get_target_position(command)
-        
-        # Calculate distance and direction
-        direction = target - current_pos
-        distance = np.linalg.norm(direction)
-        
-        if distance < 1e-6:  # Very small movement
-            return []
-        
-        # Calculate number of points based on resolution
-        num_points = max(1, int(distance / self.resolution))
-        
-        # Generate interpolated points
-        points = []
-        for i in range(1, num_points + 1):
-            t = i / num_points
-            point = current_pos + t * direction
-            points.append(point.copy())
-        
-        return points
-    
     def _interpolate_arc(self, command: GCodeCommand, clockwise: bool = True) -> List[np.ndarray]:
         """Interpolate points along an arc."""
         target = self._get_target_position(command)
@@ -247,63 +349,14 @@ class PathCalculator:
         
         return points
     
-    def _interpolate_arc_isolated(self, command: GCodeCommand, current_pos: np.ndarray, clockwise: bool = True) -> List[np.ndarray]:
-        """Interpolate points along an arc with isolated position tracking."""
-        target = self._get_target_position(command)
-        
-        # Get arc center offsets
-        i = command.i if command.i is not None else 0.0
-        j = command.j if command.j is not None else 0.0
-        
-        # Calculate arc center
-        center = current_pos[:2] + np.array([i, j])
-        
-        # Calculate start and end angles
-        start_vector = current_pos[:2] - center
-        end_vector = target[:2] - center
-        
-        start_angle = math.atan2(start_vector[1], start_vector[0])
-        end_angle = math.atan2(end_vector[1], end_vector[0])
-        
-        # Calculate radius
-        radius = np.linalg.norm(start_vector)
-        
-        # Adjust angles for clockwise/counter-clockwise
-        if clockwise:
-            if end_angle > start_angle:
-                end_angle -= 2 * math.pi
-        else:
-            if end_angle < start_angle:
-                end_angle += 2 * math.pi
-        
-        # Calculate arc length and number of points
-        angle_diff = abs(end_angle - start_angle)
-        arc_length = radius * angle_diff
-        num_points = max(1, int(arc_length / self.resolution))
-        
-        # Generate interpolated points
-        points = []
-        for i in range(1, num_points + 1):
-            t = i / num_points
-            angle = start_angle + t * (end_angle - start_angle)
-            
-            x = center[0] + radius * math.cos(angle)
-            y = center[1] + radius * math.sin(angle)
-            
-            # Linear interpolation for Z coordinate
-            z = current_pos[2] + t * (target[2] - current_pos[2])
-            
-            points.append(np.array([x, y, z]))
-        
-        return points
-    
     def _interpolate_heidenhain_arc(self, command: GCodeCommand, clockwise: bool = True) -> List[np.ndarray]:
         """Interpolate points along a Heidenhain circular arc."""
         target = self._get_target_position(command)
         
         # For Heidenhain arcs, we need the center point
-        if command.center_x is not None and command.center_y is not None:
-            center = np.array([command.center_x, command.center_y, self.current_position[2]])
+        # Heidenhain arcs carry the absolute CC centre in I/J
+        if command.i is not None and command.j is not None:
+            center = np.array([command.i, command.j, self.current_position[2]])
             
             # Calculate start and end angles
             start_vector = self.current_position[:2] - center[:2]
@@ -353,51 +406,6 @@ class PathCalculator:
             print("Warning: Arc center not defined, using linear interpolation")
             return self._interpolate_linear(command)
     
-    def _interpolate_heidenhain_arc_isolated(self, command: GCodeCommand, current_pos: np.ndarray, clockwise: bool = True) -> List[np.ndarray]:
-        """Interpolate points along a Heidenhain arc with isolated position tracking."""
-        target = self._get_target_position(command)
-        
-        # Get center coordinates
-        center_x = command.cc_x if command.cc_x is not None else current_pos[0]
-        center_y = command.cc_y if command.cc_y is not None else current_pos[1]
-        center = np.array([center_x, center_y])
-        
-        # Calculate start and end vectors
-        start_vector = current_pos[:2] - center
-        end_vector = target[:2] - center
-        
-        start_angle = math.atan2(start_vector[1], start_vector[0])
-        end_angle = math.atan2(end_vector[1], end_vector[0])
-        
-        # Calculate radius
-        radius = np.linalg.norm(start_vector)
-        
-        # Adjust angles for direction
-        if clockwise:
-            if end_angle > start_angle:
-                end_angle -= 2 * math.pi
-        else:
-            if end_angle < start_angle:
-                end_angle += 2 * math.pi
-        
-        # Calculate arc length and interpolation points
-        angle_diff = abs(end_angle - start_angle)
-        arc_length = radius * angle_diff
-        num_points = max(1, int(arc_length / self.resolution))
-        
-        points = []
-        for i in range(1, num_points + 1):
-            t = i / num_points
-            angle = start_angle + t * (end_angle - start_angle)
-            
-            x = center[0] + radius * math.cos(angle)
-            y = center[1] + radius * math.sin(angle)
-            z = current_pos[2] + t * (target[2] - current_pos[2])
-            
-            points.append(np.array([x, y, z]))
-        
-        return points
-    
     def _get_target_position(self, command: GCodeCommand) -> np.ndarray:
         """Get target position from command, using current position for missing coordinates."""
         target = self.current_position.copy()
@@ -415,59 +423,116 @@ class PathCalculator:
                                   tool_diameter: float = 6.0,
                                   workpiece_bounds: Optional[Tuple[Tuple[float, float], 
                                                                  Tuple[float, float], 
-                                                                 Tuple[float, float]]] = None) -> List[np.ndarray]:
+                                                                 Tuple[float, float]]] = None,
+                                  tool: Optional[ToolInfo] = None) -> np.ndarray:
         """
         Calculate material removal simulation points.
         
+        The cutter footprint stencil is built once and broadcast onto every
+        tool position; points outside the workpiece are dropped with a single mask.
+        
         Args:
             path_points: Tool path points
             tool_diameter: Diameter of the cutting tool (mm)
             workpiece_bounds: ((x_min, x_max), (y_min, y_max), (z_min, z_max))
+            tool: Tool whose cutter type, corner radius and (if known) diameter
+                  shape the footprint; a flat end mill of tool_diameter if None
             
         Returns:
-            List of points representing removed material
+            (N, 3) array of points representing removed material
         """
-        if not path_points:
-            return []
+        path_array = np.asarray(path_points, dtype=np.float64).reshape(-1, 3)
+        if len(path_array) == 0:
+            return np.empty((0, 3))
+        
+        cutter_type, corner_radius = '', 0.0
+        if tool is not None:
+            cutter_type, corner_radius = tool.cutter_type, tool.corner_radius
+            if tool.diameter > 0:
+                tool_diameter = tool.diameter
         
         # Default workpiece bounds if not provided
         if workpiece_bounds is None:
-            path_array = np.array(path_points)
             margin = tool_diameter
-            workpiece_bounds = (
-                (path_array[:, 0].min() - margin, path_array[:, 0].max() + margin),
-                (path_array[:, 1].min() - margin, path_array[:, 1].max() + margin),
-                (path_array[:, 2].min() - margin, path_array[:, 2].max() + margin)
-            )
-        
-        tool_radius = tool_diameter / 2.0
-        removal_points = []
-        
-        # Generate points around each tool position
-        for point in path_points:
-            # Create circular pattern around tool center
-            angles = np.linspace(0, 2 * np.pi, 12, endpoint=False)
+            workpiece_bounds = tuple((path_array[:, axis].min() - margin, path_array[:, axis].max() + margin)
+                                     for axis in range(3))
+        
+        return footprint_points(path_array, tool_diameter / 2.0, cutter_type, corner_radius, workpiece_bounds)
+    
+    def simulate_tool_segments(self, commands: Sequence[GCodeCommand], segments: Sequence[ToolSegment],
+                               default_diameter: float = 6.0, limits: Optional[MachineLimits] = None,
+                               workpiece_bounds: Optional[Tuple[Tuple[float, float], Tuple[float, float],
+                                                                Tuple[float, float]]] = None,
+                               removal: bool = True,
+                               path_points: Optional[np.ndarray] = None) -> List[ToolSegmentResult]:
+        """
+        Simulate every tool segment with its own cutter geometry.
+        
+        The program is planned once and its dense tool path is cut into the
+        segments' slices by their command rows, so nothing is re-planned or
+        re-interpolated per segment. Each segment gets material removal points
+        from its tool's footprint (diameter, cutter type, corner radius) and a
+        kinematic time estimate. The machine stops at every tool change, so
+        segments are independent once sliced, and large programs with several
+        segments are simulated in worker processes.
+        
+        Args:
+            commands: Parsed program (commands or a CommandTable)
+            segments: Tool segments, e.g. GCodeParser.get_tool_segments()
+            default_diameter: Cutter diameter for tools without a known diameter (mm)
+            limits: Machine limits for the time estimate (defaults to MachineLimits())
+            workpiece_bounds: Drop removal points outside these bounds
+            removal: Compute material removal points (False: path and time only)
+            path_points: The program's dense tool path, e.g. from calculate_tool_path
+                         without a tolerance or the program cache; interpolated here if None
             
-            for angle in angles:
-                for radius in np.linspace(0, tool_radius, 3):
-                    x = point[0] + radius * np.cos(angle)
-                    y = point[1] + radius * np.sin(angle)
-                    z = point[2]
-                    
-                    # Check if point is within workpiece bounds
-                    if (workpiece_bounds[0][0] <= x <= workpiece_bounds[0][1] and
-                        workpiece_bounds[1][0] <= y <= workpiece_bounds[1][1] and
-                        workpiece_bounds[2][0] <= z <= workpiece_bounds[2][1]):
-                        removal_points.append(np.array([x, y, z]))
-        
-        return removal_points
+        Returns:
+            One ToolSegmentResult per segment, in program order
+        """
+        table = commands if isinstance(commands, CommandTable) else CommandTable.from_commands(commands)
+        limits = limits or MachineLimits()
+        
+        plan = plan_segments(table, self.resolution)
+        if path_points is None:
+            if removal:
+                path_points = self._interpolate(plan)
+        elif len(path_points) != plan.num_points:
+            raise ValueError(f"Tool path has {len(path_points)} points, the dense path at "
+                             f"{self.resolution}mm has {plan.num_points}")
+        
+        feeds = _forward_fill(table.values[6], np.nan)
+        # Loading the first known tool is not a tool change, as in plan_cycle_time
+        known_rows = np.flatnonzero(table.tools >= 0)
+        first_known = known_rows[0] if len(known_rows) else len(table)
+        
+        tasks = []
+        for segment in segments:
+            part = table[segment.rows]
+            part.values[6] = feeds[segment.rows]
+            lo, hi = plan.row_range(segment.start, segment.stop)
+            points = path_points[plan.offsets[lo]:plan.offsets[hi]] if path_points is not None else np.empty((0, 3))
+            tool_change = segment.tool_number is not None and segment.start > first_known
+            tasks.append((part, segment, plan.take(lo, hi, segment.start), points,
+                          segment.diameter(default_diameter), limits, workpiece_bounds, removal, tool_change))
+        
+        if removal and self.num_threads > 1 and len(tasks) > 1 and len(table) >= self.tool_parallel_threshold:
+            print(f"Simulating {len(tasks)} tool segments with {self.num_threads} worker processes")
+            try:
+                with ProcessPoolExecutor(max_workers=min(self.num_threads, len(tasks))) as executor:
+                    return list(executor.map(_simulate_tool_segment_task, tasks))
+            except Exception as e:
+                print(f"Parallel tool segment simulation failed: {e}, falling back to sequential")
+        return [_simulate_tool_segment_task(task) for task in tasks]
     
-    def calculate_machining_time(self, commands: List[GCodeCommand]) -> float:
+    def calculate_machining_time(self, commands: Iterable[GCodeCommand]) -> float:
         """
         Estimate total machining time in minutes.
         
+        Commands are consumed in a single forward pass, so a streaming source
+        such as GCodeParser.iter_commands(path) can be passed directly.
+        
         Args:
-            commands: List of G-code commands
+            commands: Iterable of G-code commands
             
         Returns:
             Estimated machining time in minutes
@@ -503,3 +568,23 @@ class PathCalculator:
             current_position = target
         
         return total_time
+    
+    def estimate_cycle_time(self, commands: Iterable[GCodeCommand],
+                            limits: Optional[MachineLimits] = None) -> MotionProfile:
+        """
+        Estimate cycle time with a kinematic machine model.
+        
+        Unlike calculate_machining_time, segments use their true (arc/helix)
+        length, rapids run at the per-axis rapid rates, and every speed change
+        is limited by the machine's acceleration and jerk with look-ahead
+        corner blending (see motion_planner.plan_motion).
+        
+        Args:
+            commands: G-code commands or a CommandTable
+            limits: Machine limits (defaults to MachineLimits())
+            
+        Returns:
+            MotionProfile; total_minutes holds the estimated cycle time
+        """
+        table = commands if isinstance(commands, CommandTable) else CommandTable.from_commands(commands)
+        return plan_cycle_time(table, plan_segments(table, self.resolution), limits or MachineLimits())
@@ -0,0 +1,258 @@
+"""
+Level-of-detail decimation of tool paths for interactive plotting.
+"""
+import numpy as np
+from typing import List, Optional
+
+
+# Simplified levels as Douglas-Peucker tolerances relative to the path's bounding box diagonal
+LOD_RELATIVE_TOLERANCES = (1e-5, 1e-4, 1e-3, 1e-2)
+
+# Split at the point nearest the interval middle among those within this fraction
+# of the farthest distance (keeps the recursion shallow on periodic paths)
+SPLIT_SLACK = 0.1
+
+# Passes of the pre-thinning step; each may drop every other remaining point
+PRETHIN_PASSES = 8
+
+# Number of Z buckets used when no Z step is given
+DEFAULT_Z_BUCKETS = 64
+
+# Interior points processed per block when measuring chord distances (limits temporaries)
+DISTANCE_BLOCK_POINTS = 1_000_000
+
+
+def _extent(points: np.ndarray) -> np.ndarray:
+    """Per-axis size of the points' bounding box (column-wise, faster than axis reductions)."""
+    return np.array([np.ptp(points[:, axis]) if len(points) else 0.0 for axis in range(3)])
+
+
+def _chord_distances(points: np.ndarray, indices: np.ndarray, starts: np.ndarray,
+                     chords: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """Squared distance of points[indices] from the chord line of their interval (blocked)."""
+    lengths = np.sqrt(np.einsum('ij,ij->i', chords, chords))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        unit = np.where(lengths[:, None] > 0, chords / lengths[:, None], 0.0)
+    distances = np.empty(len(indices))
+    for lo in range(0, len(indices), DISTANCE_BLOCK_POINTS):
+        hi = lo + DISTANCE_BLOCK_POINTS
+        group = groups[lo:hi]
+        offset = points[indices[lo:hi]] - starts[group]
+        along = np.einsum('ij,ij->i', offset, unit[group])
+        distances[lo:hi] = np.einsum('ij,ij->i', offset, offset) - along * along
+    return np.maximum(distances, 0.0, out=distances)
+
+
+def prethin(points: np.ndarray, indices: np.ndarray, fixed: np.ndarray, budget: float,
+            passes: int = PRETHIN_PASSES) -> np.ndarray:
+    """
+    Drop points that barely change the path, with a bounded total deviation.
+
+    Each pass looks at every other remaining point and drops it if it lies
+    within budget / passes of the segment joining its neighbours. A dropped
+    point is therefore at most `budget` away from the thinned path. Each pass
+    is a few whole-array operations, so this cheaply shrinks dense paths
+    before Douglas-Peucker.
+
+    Args:
+        points: (N, 3) path points
+        indices: Increasing indices of the points to consider
+        fixed: Mask of points that must be kept
+        budget: Maximum distance of a dropped point from the thinned path
+
+    Returns:
+        Increasing indices of the remaining points
+    """
+    step = budget / passes
+    columns = [points[:, axis][indices] for axis in range(3)]
+    movable = ~fixed[indices]
+    for _ in range(passes):
+        if len(indices) < 3 or step <= 0:
+            break
+
+        # Distance of every other point from the segment joining its neighbours
+        chord = [column[2::2] - column[0:-2:2] for column in columns]
+        offset = [column[1:-1:2] - column[0:-2:2] for column in columns]
+        squared_length = chord[0] * chord[0] + chord[1] * chord[1] + chord[2] * chord[2]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = (offset[0] * chord[0] + offset[1] * chord[1] + offset[2] * chord[2]) / squared_length
+        t = np.clip(np.nan_to_num(t, nan=0.0), 0.0, 1.0)
+        squared = sum((o - t * c) ** 2 for o, c in zip(offset, chord))
+
+        drop = (squared <= step * step) & movable[1:-1:2]
+        if not drop.any():
+            break
+        keep = np.ones(len(indices), dtype=bool)
+        keep[1:-1:2] = ~drop
+        indices, movable = indices[keep], movable[keep]
+        columns = [column[keep] for column in columns]
+    return indices
+
+
+def _bends(points: np.ndarray, fixed: np.ndarray) -> np.ndarray:
+    """Indices of fixed points and of points that are not inside a straight run."""
+    before = points[1:-1] - points[:-2]
+    after = points[2:] - points[1:-1]
+    bend = np.cross(before, after)
+    straight = ((np.sqrt(np.einsum('ij,ij->i', bend, bend)) <= 1e-9 * np.linalg.norm(before, axis=1)
+                 * np.linalg.norm(after, axis=1)) & (np.einsum('ij,ij->i', before, after) > 0))
+    return np.flatnonzero(fixed | np.concatenate(([True], ~straight, [True])))
+
+
+def douglas_peucker_significance(points: np.ndarray, fixed: Optional[np.ndarray] = None,
+                                 slack: float = SPLIT_SLACK, min_tolerance: float = 0.0,
+                                 prethin_budget: float = 0.0) -> np.ndarray:
+    """
+    Douglas-Peucker significance of every path point.
+
+    Douglas-Peucker with tolerance `tol` keeps exactly the points whose
+    significance is greater than `tol`, so one call serves every detail
+    level. All open intervals are split together in each pass, so the work is
+    whole-array NumPy per recursion depth rather than per point. Interior points of
+    straight runs (or, with a prethin budget, points prethin() drops) are
+    removed up front and get significance 0.
+
+    Plain Douglas-Peucker splits at the farthest point, which on zig-zag
+    pocketing peels off one pass per level. Splitting at any point within
+    `slack` of the farthest distance still bounds the error by the
+    tolerance, so the split nearest the interval middle is taken instead.
+
+    Args:
+        points: (N, 3) path points
+        fixed: Points that every level must keep (significance inf); the
+               first and last points are always fixed
+        slack: Relative distance slack when choosing split points (0 = classic)
+        min_tolerance: Stop refining intervals within this distance of their
+                       chord (their points get significance 0)
+        prethin_budget: Thin the path with prethin() first; simplifications
+                        may then deviate by up to tolerance + prethin_budget
+
+    Returns:
+        (N,) significance values
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    count = len(points)
+    significance = np.zeros(count)
+    if count <= 2:
+        significance[:] = np.inf
+        return significance
+
+    keep = np.zeros(count, dtype=bool) if fixed is None else np.array(fixed, dtype=bool)
+    keep[[0, -1]] = True
+    scale = float(_extent(points).max())
+    floor = max(scale * 1e-12, min_tolerance)
+
+    if prethin_budget > 0:
+        candidates = prethin(points, np.arange(count), keep, prethin_budget)
+    else:
+        candidates = _bends(points, keep)
+    candidate_points = points[candidates]
+    candidate_significance = np.where(keep[candidates], np.inf, 0.0)
+
+    bounds = np.flatnonzero(keep[candidates])
+    lo, hi = bounds[:-1], bounds[1:]
+    cap = np.full(len(lo), np.inf)
+
+    while True:
+        sizes = hi - lo - 1
+        active = sizes > 0
+        lo, hi, cap, sizes = lo[active], hi[active], cap[active], sizes[active]
+        if len(lo) == 0:
+            break
+
+        offsets = np.zeros(len(lo) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        groups = np.repeat(np.arange(len(lo)), sizes)
+        interior = np.arange(offsets[-1]) - offsets[:-1][groups] + lo[groups] + 1
+
+        starts = candidate_points[lo]
+        squared = _chord_distances(candidate_points, interior, starts, candidate_points[hi] - starts, groups)
+
+        # Split near the middle among the (nearly) farthest points of each interval
+        farthest_squared = np.maximum.reduceat(squared, offsets[:-1])
+        farthest = np.sqrt(farthest_squared)
+        near = np.flatnonzero(squared >= farthest_squared[groups] * (1.0 - slack) ** 2)
+        gap = np.abs(2 * interior[near] - lo[groups[near]] - hi[groups[near]])
+        order = np.lexsort((gap, groups[near]))
+        _, first = np.unique(groups[near][order], return_index=True)
+        split = interior[near[order[first]]]
+
+        # A point is only reached if every enclosing interval was split
+        split_more = farthest > floor
+        value = np.minimum(farthest, cap)[split_more]
+        split = split[split_more]
+        candidate_significance[split] = value
+        lo, hi = np.concatenate((lo[split_more], split)), np.concatenate((split, hi[split_more]))
+        cap = np.concatenate((value, value))
+
+    significance[candidates] = candidate_significance
+    return significance
+
+
+def z_bucket_transitions(z: np.ndarray, z_step: float) -> np.ndarray:
+    """Mask of the points on both sides of every change of Z bucket (floor(z / z_step))."""
+    buckets = np.floor(np.asarray(z) / z_step)
+    change = np.flatnonzero(buckets[1:] != buckets[:-1])
+    mask = np.zeros(len(buckets), dtype=bool)
+    mask[change] = True
+    mask[change + 1] = True
+    return mask
+
+
+class PathLOD:
+    """
+    Precomputed detail levels of a tool path.
+
+    Level 0 is the full path; the following levels are Douglas-Peucker
+    simplifications at increasing tolerances, all read from one
+    significance pass that stops refining below the finest tolerance. The
+    path is pre-thinned with half the finest tolerance, so level k deviates
+    from the path by at most tolerances[k] + tolerances[0] / 2.
+    The path is bucketed by Z level and the points where it moves between
+    buckets are fixed, so step-downs and plunges keep their shape at every level.
+    """
+
+    def __init__(self, points: np.ndarray, z_step: Optional[float] = None,
+                 relative_tolerances=LOD_RELATIVE_TOLERANCES):
+        """
+        Args:
+            points: (N, 3) tool path points
+            z_step: Height of a Z bucket in mm (default: 1/64 of the Z range)
+            relative_tolerances: Tolerance of each level relative to the bounding box diagonal
+        """
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        extent = _extent(self.points)
+        self.diagonal = float(np.linalg.norm(extent))
+
+        if z_step is None:
+            z_step = extent[2] / DEFAULT_Z_BUCKETS if extent[2] > 0 else 1.0
+        self.z_step = z_step
+        fixed = z_bucket_transitions(self.points[:, 2], z_step) if len(self.points) else None
+
+        self.tolerances = [relative * self.diagonal for relative in relative_tolerances]
+        finest = min(self.tolerances, default=0.0)
+        self.significance = douglas_peucker_significance(self.points, fixed, min_tolerance=finest,
+                                                         prethin_budget=finest / 2)
+        self.levels: List[np.ndarray] = [np.arange(len(self.points))]
+        self.levels += [np.flatnonzero(self.significance > tolerance) for tolerance in self.tolerances]
+
+    def level_points(self, level: int) -> np.ndarray:
+        return self.points[self.levels[level]]
+
+    def select(self, point_budget: int) -> np.ndarray:
+        """
+        Finest level with at most `point_budget` points.
+
+        If even the coarsest level is too large it is thinned uniformly,
+        keeping its first and last points.
+        """
+        for indices in self.levels:
+            if len(indices) <= point_budget:
+                return self.points[indices]
+
+        coarsest = self.levels[-1]
+        picks = np.unique(np.linspace(0, len(coarsest) - 1, max(point_budget, 2)).astype(np.int64))
+        return self.points[coarsest[picks]]
+
+    def __repr__(self):
+        return f"PathLOD({len(self.points)} points, levels={[len(level) for level in self.levels]})"
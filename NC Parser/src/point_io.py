@@ -0,0 +1,188 @@
+import os
+import numpy as np
+from typing import Dict
+
+
+# PLY property types and their NumPy equivalents
+PLY_TYPES = {
+    'char': 'i1', 'int8': 'i1', 'uchar': 'u1', 'uint8': 'u1',
+    'short': 'i2', 'int16': 'i2', 'ushort': 'u2', 'uint16': 'u2',
+    'int': 'i4', 'int32': 'i4', 'uint': 'u4', 'uint32': 'u4',
+    'float': 'f4', 'float32': 'f4', 'double': 'f8', 'float64': 'f8'
+}
+PLY_BYTE_ORDERS = {'binary_little_endian': '<', 'binary_big_endian': '>'}
+
+# Points copied per block when writing through a memory map
+MEMMAP_BLOCK_POINTS = 1_000_000
+
+POINT_FORMATS = ('ply', 'ply-ascii', 'npy', 'npz')
+
+
+def _as_points(points) -> np.ndarray:
+    """View any point container as an (N, 3) array without copying contiguous input."""
+    return np.asarray(points).reshape(-1, 3)
+
+
+def _ply_header(num_points: int, binary: bool) -> bytes:
+    format_name = 'binary_little_endian' if binary else 'ascii'
+    return (
+        "ply\n"
+        f"format {format_name} 1.0\n"
+        f"element vertex {num_points}\n"
+        "property float x\n"
+        "property float y\n"
+        "property float z\n"
+        "end_header\n"
+    ).encode('ascii')
+
+
+def write_ply(points, filename: str, binary: bool = True, use_memmap: bool = False) -> None:
+    """
+    Write points as a PLY vertex cloud with float x/y/z properties.
+
+    Args:
+        points: (N, 3) points
+        filename: Output path
+        binary: Write binary little-endian (default) instead of ASCII
+        use_memmap: Fill the vertex block through np.memmap in fixed-size
+                    blocks instead of converting the whole array in memory
+    """
+    points = _as_points(points)
+    header = _ply_header(len(points), binary)
+
+    if not binary:
+        with open(filename, 'wb') as f:
+            f.write(header)
+            np.savetxt(f, points, fmt='%.6f')
+        return
+
+    if not use_memmap or len(points) == 0:
+        with open(filename, 'wb') as f:
+            f.write(header)
+            np.ascontiguousarray(points, dtype='<f4').tofile(f)
+        return
+
+    with open(filename, 'wb') as f:
+        f.write(header)
+        f.truncate(len(header) + points.size * 4)
+    vertices = np.memmap(filename, dtype='<f4', mode='r+', offset=len(header), shape=points.shape)
+    for lo in range(0, len(points), MEMMAP_BLOCK_POINTS):
+        vertices[lo:lo + MEMMAP_BLOCK_POINTS] = points[lo:lo + MEMMAP_BLOCK_POINTS]
+    vertices.flush()
+    del vertices
+
+
+def read_ply(filename: str, mmap: bool = False) -> np.ndarray:
+    """
+    Read the x/y/z vertex coordinates of an ASCII or binary PLY file.
+
+    Args:
+        filename: PLY file path
+        mmap: Memory-map binary vertex data instead of reading it into memory
+
+    Returns:
+        (N, 3) array of points (a read-only memmap view when mmap is set)
+    """
+    with open(filename, 'rb') as f:
+        if f.readline().strip() != b'ply':
+            raise ValueError(f"Not a PLY file: {filename}")
+
+        file_format = None
+        num_vertices = 0
+        properties = []
+        element = None
+        while True:
+            line = f.readline()
+            if not line:
+                raise ValueError(f"PLY header has no end_header: {filename}")
+            words = line.decode('ascii').split()
+            if not words or words[0] == 'comment':
+                continue
+            if words[0] == 'end_header':
+                break
+            if words[0] == 'format':
+                file_format = words[1]
+            elif words[0] == 'element':
+                element = words[1]
+                if element == 'vertex':
+                    num_vertices = int(words[2])
+            elif words[0] == 'property' and element == 'vertex':
+                if words[1] == 'list':
+                    raise ValueError("List properties on vertices are not supported")
+                properties.append((words[2], PLY_TYPES[words[1]]))
+        data_offset = f.tell()
+
+        names = [name for name, _ in properties]
+        if not all(axis in names for axis in ('x', 'y', 'z')):
+            raise ValueError(f"PLY vertices have no x/y/z properties: {filename}")
+
+        if file_format == 'ascii':
+            columns = [names.index(axis) for axis in ('x', 'y', 'z')]
+            values = np.loadtxt(f, max_rows=num_vertices, ndmin=2)
+            return values[:, columns] if len(values) else np.empty((0, 3))
+
+        if file_format not in PLY_BYTE_ORDERS:
+            raise ValueError(f"Unsupported PLY format: {file_format}")
+        order = PLY_BYTE_ORDERS[file_format]
+        dtype = np.dtype([(name, order + code) for name, code in properties])
+
+        if mmap:
+            vertices = np.memmap(filename, dtype=dtype, mode='r', offset=data_offset, shape=(num_vertices,))
+        else:
+            vertices = np.fromfile(f, dtype=dtype, count=num_vertices)
+
+    if names[:3] == ['x', 'y', 'z'] and len({code for _, code in properties[:3]}) == 1:
+        # x/y/z are the leading fields of one type: view them as an (N, 3) array without copying
+        coordinate_type = np.dtype(order + properties[0][1])
+        return np.ndarray((num_vertices, 3), dtype=coordinate_type, buffer=vertices,
+                          strides=(dtype.itemsize, coordinate_type.itemsize))
+    return np.column_stack([vertices['x'], vertices['y'], vertices['z']])
+
+
+def save_points(points, filename: str, use_memmap: bool = False, **arrays) -> None:
+    """
+    Save points by file extension: .ply (binary), .npy or .npz.
+
+    Args:
+        points: (N, 3) points
+        filename: Output path
+        use_memmap: Write .ply/.npy through a memory map
+        **arrays: Extra named arrays stored alongside 'points' in .npz files
+    """
+    points = _as_points(points)
+    extension = os.path.splitext(filename)[1].lower()
+
+    if extension == '.ply':
+        write_ply(points, filename, use_memmap=use_memmap)
+    elif extension == '.npy':
+        if use_memmap:
+            output = np.lib.format.open_memmap(filename, mode='w+', dtype=points.dtype, shape=points.shape)
+            output[:] = points
+            output.flush()
+            del output
+        else:
+            np.save(filename, points)
+    elif extension == '.npz':
+        np.savez(filename, points=points, **arrays)
+    else:
+        raise ValueError(f"Unsupported point file extension: {extension}")
+
+
+def load_points(filename: str, mmap: bool = False) -> np.ndarray:
+    """Load points saved by save_points/write_ply (.ply, .npy or .npz)."""
+    extension = os.path.splitext(filename)[1].lower()
+
+    if extension == '.ply':
+        return read_ply(filename, mmap=mmap)
+    if extension == '.npy':
+        return np.load(filename, mmap_mode='r' if mmap else None)
+    if extension == '.npz':
+        with np.load(filename) as archive:
+            return archive['points']
+    raise ValueError(f"Unsupported point file extension: {extension}")
+
+
+def load_point_archive(filename: str) -> Dict[str, np.ndarray]:
+    """Load every array stored in an .npz point archive."""
+    with np.load(filename) as archive:
+        return {name: archive[name] for name in archive.files}
@@ -0,0 +1,173 @@
+"""
+Stage timing and counters for the processing pipeline.
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+
+class StageRecord:
+    """Timing, counters and (optionally) traced allocations of one pipeline stage."""
+
+    def __init__(self, name: str, start: float, depth: int, counters: Dict):
+        self.name = name
+        self.start = start
+        self.end = start
+        self.depth = depth
+        self.counters = dict(counters)
+        self.peak_bytes: Optional[int] = None  # Peak traced memory above the stage's starting level
+        self.net_bytes: Optional[int] = None  # Traced memory still held when the stage ended
+        self.error: Optional[str] = None
+        self.thread_id = threading.get_ident()
+
+    @property
+    def seconds(self) -> float:
+        return self.end - self.start
+
+    def count(self, **counters) -> None:
+        """Set counters such as commands=..., points=... for this stage."""
+        self.counters.update(counters)
+
+    def to_dict(self) -> Dict:
+        data = {'name': self.name, 'seconds': self.seconds, 'depth': self.depth, 'counters': dict(self.counters)}
+        if self.peak_bytes is not None:
+            data.update(peak_bytes=self.peak_bytes, net_bytes=self.net_bytes)
+        if self.error is not None:
+            data['error'] = self.error
+        return data
+
+    def __repr__(self):
+        return f"StageRecord({self.name!r}, {self.seconds:.3f}s, {self.counters})"
+
+
+class ProfileReport:
+    """
+    Collects per-stage timings of one run.
+
+    Stages are context managers and may nest:
+
+        report = ProfileReport('program.h')
+        with report.stage('parse') as stage:
+            commands = parser.parse_file(path)
+            stage.count(commands=len(commands))
+
+    With trace_memory=True every stage also records its peak and net
+    allocations through tracemalloc (which slows Python-level code down,
+    so it is off by default). Reports print as a table or dump as Chrome
+    trace JSON for chrome://tracing or https://ui.perfetto.dev.
+    """
+
+    def __init__(self, name: str = '', trace_memory: bool = False):
+        self.name = name
+        self.trace_memory = trace_memory
+        self.stages: List[StageRecord] = []
+        self.origin = time.perf_counter()
+        self._open: List[StageRecord] = []
+        self._peaks: List[int] = []  # Highest absolute traced memory seen so far by each open stage
+        self._bases: List[int] = []
+        self._owns_tracing = False
+
+    @contextmanager
+    def stage(self, name: str, **counters) -> Iterator[StageRecord]:
+        """Time the enclosed block as a stage, with optional initial counters."""
+        record = StageRecord(name, time.perf_counter(), len(self._open), counters)
+        self.stages.append(record)
+        if self.trace_memory:
+            self._start_tracing()
+        self._open.append(record)
+        try:
+            yield record
+        except BaseException as e:
+            record.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record.end = time.perf_counter()
+            self._open.pop()
+            if self.trace_memory:
+                self._stop_tracing(record)
+
+    def _start_tracing(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+        current, peak = tracemalloc.get_traced_memory()
+        if self._peaks:
+            # The enclosing stage keeps its own peak across the reset below
+            self._peaks[-1] = max(self._peaks[-1], peak)
+        tracemalloc.reset_peak()
+        self._bases.append(current)
+        self._peaks.append(current)
+
+    def _stop_tracing(self, record: StageRecord) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        base = self._bases.pop()
+        peak = max(self._peaks.pop(), peak)
+        record.peak_bytes = peak - base
+        record.net_bytes = current - base
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], peak)
+        elif self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    @property
+    def total_seconds(self) -> float:
+        """Wall time covered by the top-level stages."""
+        return sum(record.seconds for record in self.stages if record.depth == 0)
+
+    def seconds(self, name: str) -> float:
+        """Total time of every stage with this name."""
+        return sum(record.seconds for record in self.stages if record.name == name)
+
+    def to_dict(self) -> Dict:
+        return {'name': self.name, 'total_seconds': self.total_seconds,
+                'stages': [record.to_dict() for record in self.stages]}
+
+    def summary(self) -> str:
+        """Table of stages with time, share of the total, memory and counters."""
+        total = self.total_seconds or 1.0
+        lines = [f"{'Stage':<28}{'Seconds':>10}{'Share':>8}{'Peak MB':>10}  Counters"]
+        for record in self.stages:
+            peak = f"{record.peak_bytes / 1e6:10.1f}" if record.peak_bytes is not None else f"{'-':>10}"
+            counters = ', '.join(f"{key}={value}" for key, value in record.counters.items())
+            if record.error is not None:
+                counters = f"{counters}, failed: {record.error}" if counters else f"failed: {record.error}"
+            lines.append(f"{'  ' * record.depth + record.name:<28}{record.seconds:>10.3f}"
+                         f"{100.0 * record.seconds / total:>7.1f}%{peak}  {counters}")
+        lines.append(f"{'Total':<28}{self.total_seconds:>10.3f}")
+        return '\n'.join(lines)
+
+    def chrome_trace(self) -> Dict:
+        """Stages as Chrome trace 'complete' events (timestamps in microseconds)."""
+        pid = os.getpid()
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                   'args': {'name': self.name or 'NC Parser'}}]
+        for record in self.stages:
+            args = dict(record.counters)
+            if record.peak_bytes is not None:
+                args.update(peak_bytes=record.peak_bytes, net_bytes=record.net_bytes)
+            if record.error is not None:
+                args['error'] = record.error
+            events.append({
+                'name': record.name,
+                'cat': 'stage',
+                'ph': 'X',
+                'ts': (record.start - self.origin) * 1e6,
+                'dur': record.seconds * 1e6,
+                'pid': pid,
+                'tid': record.thread_id,
+                'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Write the trace JSON, loadable in chrome://tracing or Perfetto."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, default=str)
+
+    def __repr__(self):
+        return f"ProfileReport({self.name!r}, {len(self.stages)} stages, {self.total_seconds:.3f}s)"
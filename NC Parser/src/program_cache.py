@@ -0,0 +1,183 @@
+import os
+import hashlib
+import tempfile
+import numpy as np
+from typing import Dict, Optional
+
+from command_table import CommandTable
+from gcode_parser import GCodeParser, ToolInfo, PARSER_VERSION
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'nc_parser')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_digest(file_path: str) -> str:
+    """SHA-256 of a file's contents, read in fixed-size blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ProgramCache:
+    """
+    Content-addressed on-disk cache of parsed programs and tool paths.
+
+    Entries are .npz files named by a hash of the NC file contents, the
+    parser version and the path resolution/tolerance, so edited files,
+    parser changes and different discretizations never share an entry. Reads refresh
+    an entry's modification time; once the directory exceeds max_bytes the
+    least recently used entries are deleted.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory or os.environ.get('NC_PARSER_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+
+    def key(self, file_path: str, resolution: float, tolerance: Optional[float] = None) -> str:
+        """Cache key for a file parsed with the current parser and interpolated at `resolution`/`tolerance`."""
+        tolerance = None if tolerance is None else float(tolerance)
+        identity = f"{file_digest(file_path)}:{PARSER_VERSION}:{float(resolution)!r}:{tolerance!r}"
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+    def checkpoint_key(self, file_path: str, resolution: float, tolerance: Optional[float] = None) -> str:
+        """Key of the checkpointed entry of a file path; unlike key() it does not depend on the contents."""
+        tolerance = None if tolerance is None else float(tolerance)
+        identity = f"checkpoints:{os.path.abspath(file_path)}:{PARSER_VERSION}:{float(resolution)!r}:{tolerance!r}"
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def load(self, file_path: str, resolution: float, parser: GCodeParser,
+             tolerance: Optional[float] = None) -> Optional[np.ndarray]:
+        """
+        Restore a cached program into `parser` and return its tool path.
+
+        Returns:
+            (N, 3) tool path points, or None on a cache miss
+        """
+        try:
+            key = self.key(file_path, resolution, tolerance)
+        except OSError:
+            return None  # Unreadable NC file: let the parser report it
+
+        arrays = self.load_arrays(key)
+        if arrays is None:
+            return None
+        try:
+            table = CommandTable.from_arrays(arrays, prefix='table_')
+            path_points = arrays['path_points']
+            tool_numbers = arrays['tool_numbers'].tolist()
+            tool_strings = arrays['tool_strings'].tolist()
+            blk_form = arrays['blk_form']
+            is_heidenhain = bool(arrays['is_heidenhain'])
+            stock_dimensions = arrays['stock_dimensions'].tolist()
+        except (KeyError, ValueError) as e:
+            self.discard(key, e)
+            return None
+
+        parser.reset()
+        parser.commands = table
+        parser.is_heidenhain = is_heidenhain
+        parser.tools = {number: ToolInfo(string, number) for number, string in zip(tool_numbers, tool_strings)}
+        parser.blk_form = {corner: tuple(values) for corner, values in zip(('min', 'max'), blk_form)
+                           if not np.isnan(values).any()}
+        parser.stock_dimensions = dict(zip(('length', 'width', 'height'), stock_dimensions))
+
+        return path_points
+
+    def store(self, file_path: str, resolution: float, parser: GCodeParser, path_points: np.ndarray,
+              tolerance: Optional[float] = None) -> None:
+        """Save the parsed program and tool path, then evict old entries over the size limit."""
+        blk_form = np.full((2, 3), np.nan)
+        for row, corner in enumerate(('min', 'max')):
+            if corner in parser.blk_form:
+                blk_form[row] = parser.blk_form[corner]
+
+        arrays = parser.commands.to_arrays(prefix='table_')
+        arrays.update(
+            path_points=np.asarray(path_points, dtype=np.float64).reshape(-1, 3),
+            tool_numbers=np.array(list(parser.tools), dtype=np.int64),
+            tool_strings=np.array([tool.raw_string for tool in parser.tools.values()], dtype=str),
+            blk_form=blk_form,
+            is_heidenhain=np.array(parser.is_heidenhain),
+            stock_dimensions=np.array([parser.stock_dimensions.get(name, 0)
+                                       for name in ('length', 'width', 'height')], dtype=np.float64),
+        )
+        self.store_arrays(self.key(file_path, resolution, tolerance), arrays)
+
+    def load_arrays(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """All arrays of an entry (marking it as recently used), or None if missing or unreadable."""
+        entry = self._entry_path(key)
+        try:
+            with np.load(entry) as data:
+                arrays = {name: np.array(data[name]) for name in data.files}
+        except (OSError, KeyError, ValueError) as e:
+            if os.path.exists(entry):
+                self.discard(key, e)
+            return None
+        os.utime(entry)  # Mark as recently used
+        return arrays
+
+    def store_arrays(self, key: str, arrays: Dict[str, np.ndarray]) -> None:
+        """Atomically write an entry, then evict old entries over the size limit."""
+        os.makedirs(self.directory, exist_ok=True)
+        entry = self._entry_path(key)
+
+        # Write to a temporary file first so readers never see a partial entry
+        handle, temp_path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(handle, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(temp_path, entry)
+        except Exception:
+            self._remove(temp_path)
+            raise
+
+        self.evict()
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits in max_bytes. Returns entries removed."""
+        entries = []
+        for name in os.listdir(self.directory) if os.path.isdir(self.directory) else []:
+            if name.endswith('.npz'):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Delete every cache entry."""
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith('.npz'):
+                    self._remove(os.path.join(self.directory, name))
+
+    def discard(self, key: str, reason: Exception) -> None:
+        """Delete an entry that could not be read or restored."""
+        entry = self._entry_path(key)
+        print(f"Warning: Discarding unreadable cache entry {entry}: {reason}")
+        self._remove(entry)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,125 @@
+import numpy as np
+from typing import Optional
+
+
+# Upper bound on candidate (query, point) pairs evaluated at once
+DEFAULT_MAX_PAIRS = 4_000_000
+
+# Neighbour cell offsets, centre cell first so most hits resolve on the first pass
+NEIGHBOUR_OFFSETS = sorted(
+    ((dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)),
+    key=lambda offset: abs(offset[0]) + abs(offset[1]) + abs(offset[2])
+)
+
+
+class UniformGridIndex:
+    """
+    Uniform voxel hash over a 3D point set for fixed-radius queries.
+
+    Points are binned into cubic cells whose edge is at least the query
+    radius, so every neighbour of a query point lies in the 3x3x3 block of
+    cells around it. Cells are stored as sorted linear keys with start/count
+    ranges into the reordered point array; lookups are binary searches.
+    """
+
+    def __init__(self, points: np.ndarray, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.cell_size = float(cell_size)
+        self.origin = points.min(axis=0) if len(points) else np.zeros(3)
+
+        cells = self._cells(points)
+        # One empty cell of padding on every side keeps neighbour keys unambiguous
+        self.dims = (cells.max(axis=0) + 3) if len(points) else np.full(3, 3, dtype=np.int64)
+
+        keys = self._keys(cells)
+        order = np.argsort(keys, kind='stable')
+        self.points = points[order]
+        self.cell_keys, self.cell_starts, self.cell_counts = np.unique(
+            keys[order], return_index=True, return_counts=True
+        )
+
+    def __len__(self):
+        return len(self.points)
+
+    def _cells(self, points: np.ndarray) -> np.ndarray:
+        """Padded integer cell coordinates of the given points."""
+        return np.floor((points - self.origin) / self.cell_size).astype(np.int64) + 1
+
+    def _keys(self, cells: np.ndarray) -> np.ndarray:
+        return (cells[:, 0] * self.dims[1] + cells[:, 1]) * self.dims[2] + cells[:, 2]
+
+    def _lookup(self, cells: np.ndarray):
+        """Start and count of the indexed points in each cell (count 0 if empty)."""
+        inside = np.all((cells >= 1) & (cells < self.dims - 1), axis=1)
+        keys = self._keys(np.where(inside[:, None], cells, 0))
+        positions = np.minimum(np.searchsorted(self.cell_keys, keys), len(self.cell_keys) - 1)
+        found = inside & (self.cell_keys[positions] == keys)
+        starts = np.where(found, self.cell_starts[positions], 0)
+        counts = np.where(found, self.cell_counts[positions], 0)
+        return starts, counts
+
+    def any_within(self, queries: np.ndarray, radius: float,
+                   max_pairs: Optional[int] = None) -> np.ndarray:
+        """
+        Boolean mask of query points with at least one indexed point within `radius`.
+
+        Args:
+            queries: (N, 3) query points
+            radius: Euclidean search radius (must not exceed the cell size)
+            max_pairs: Limit on candidate pairs held in memory at once
+        """
+        if radius > self.cell_size:
+            raise ValueError("radius must not exceed the index cell size")
+
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+        hits = np.zeros(len(queries), dtype=bool)
+        if len(queries) == 0 or len(self.points) == 0:
+            return hits
+
+        max_pairs = max_pairs or DEFAULT_MAX_PAIRS
+        query_cells = self._cells(queries)
+
+        for offset in NEIGHBOUR_OFFSETS:
+            pending = np.flatnonzero(~hits)
+            if len(pending) == 0:
+                break
+
+            starts, counts = self._lookup(query_cells[pending] + offset)
+            occupied = counts > 0
+            pending, starts, counts = pending[occupied], starts[occupied], counts[occupied]
+
+            # Split the candidates so each batch expands to at most max_pairs pairs
+            ends = np.cumsum(counts)
+            lo = 0
+            while lo < len(pending):
+                base = ends[lo - 1] if lo else 0
+                hi = max(lo + 1, int(np.searchsorted(ends, base + max_pairs, side='right')))
+                hits[self._pair_hits(queries, pending[lo:hi], starts[lo:hi], counts[lo:hi], radius)] = True
+                lo = hi
+
+        return hits
+
+    def _pair_hits(self, queries: np.ndarray, rows: np.ndarray, starts: np.ndarray,
+                   counts: np.ndarray, radius: float) -> np.ndarray:
+        """Query rows with an indexed point inside `radius` among their candidate cells."""
+        total = int(counts.sum())
+        group_offsets = np.cumsum(counts) - counts
+        query_rows = np.repeat(rows, counts)
+        point_rows = np.repeat(starts - group_offsets, counts) + np.arange(total)
+
+        diff = queries[query_rows] - self.points[point_rows]
+        distances = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+        return query_rows[distances <= radius]
+
+
+def points_within_radius(points: np.ndarray, centers: np.ndarray, radius: float,
+                         max_pairs: Optional[int] = None) -> np.ndarray:
+    """Boolean mask of `points` lying within `radius` of any of `centers`."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+    if len(points) == 0 or len(centers) == 0 or radius <= 0:
+        return np.zeros(len(points), dtype=bool)
+    return UniformGridIndex(centers, radius).any_within(points, radius, max_pairs)
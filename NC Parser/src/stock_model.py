@@ -0,0 +1,200 @@
+import numpy as np
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from command_table import CommandTable
+from interpolation import plan_segments, interpolate_plan
+
+
+# Cutter types (ToolInfo.cutter_type) with a full-radius ball tip
+BALL_CUTTERS = ('BAL', 'BEM')
+# Pointed cutters and their included tip angle in degrees
+CONE_CUTTERS = {'DRL': 118.0, 'CHM': 90.0}
+
+# Upper bound on (tool position, cell) pairs evaluated at once
+DEFAULT_MAX_PAIRS = 4_000_000
+
+
+def cutter_profile(distances: np.ndarray, radius: float, cutter_type: str = '',
+                   corner_radius: float = 0.0) -> np.ndarray:
+    """
+    Height of the cutter surface above its tip at radial distances from the tool axis.
+
+    Ball cutters use a corner radius equal to the tool radius, drills and
+    chamfer mills are cones, and all other cutters are flat end mills with
+    an optional (bull nose) corner radius.
+    """
+    cutter_type = (cutter_type or '').upper()
+    if cutter_type in CONE_CUTTERS:
+        return distances / np.tan(np.radians(CONE_CUTTERS[cutter_type] / 2.0))
+
+    corner = radius if cutter_type in BALL_CUTTERS else min(max(corner_radius, 0.0), radius)
+    if corner <= 0:
+        return np.zeros_like(distances)
+    excess = np.clip(distances - (radius - corner), 0.0, corner)
+    return corner - np.sqrt(corner * corner - excess * excess)
+
+
+class DexelStock:
+    """
+    Z-dexel (height map) model of rectangular stock.
+
+    The stock is a grid of vertical columns over XY; each column holds
+    material from the stock bottom up to its current top height. Cutting
+    lowers the tops to the envelope of the tool shape at every tool
+    position, so the model is updated in bulk with array operations and
+    can be fed the program one command chunk at a time.
+    """
+
+    def __init__(self, bounds: Tuple[Tuple[float, float], Tuple[float, float], Tuple[float, float]],
+                 resolution: float = 0.5):
+        """
+        Initialize the stock.
+
+        Args:
+            bounds: ((x_min, x_max), (y_min, y_max), (z_min, z_max)), e.g. from GCodeParser.get_stock_bounds()
+            resolution: Column spacing in mm
+        """
+        if resolution <= 0:
+            raise ValueError("resolution must be positive")
+
+        (x_min, x_max), (y_min, y_max), (z_min, z_max) = bounds
+        self.resolution = float(resolution)
+        self.origin = np.array([x_min, y_min], dtype=np.float64)
+        self.z_min = float(z_min)
+        self.z_max = float(z_max)
+
+        nx = max(1, int(np.ceil((x_max - x_min) / resolution)))
+        ny = max(1, int(np.ceil((y_max - y_min) / resolution)))
+        self.top = np.full((nx, ny), self.z_max)
+        self.removed_volume_by_tool: Dict[Optional[int], float] = {}
+        self.current_position = np.array([0.0, 0.0, 0.0])
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.top.shape
+
+    @property
+    def cell_area(self) -> float:
+        return self.resolution * self.resolution
+
+    def volume(self) -> float:
+        """Remaining material volume in mm³."""
+        return float((self.top - self.z_min).sum() * self.cell_area)
+
+    def removed_volume(self) -> float:
+        """Total material volume removed so far in mm³."""
+        return float((self.z_max - self.top).sum() * self.cell_area)
+
+    def cell_centers(self) -> Tuple[np.ndarray, np.ndarray]:
+        """X and Y coordinates of the column centres along each axis."""
+        x = self.origin[0] + (np.arange(self.shape[0]) + 0.5) * self.resolution
+        y = self.origin[1] + (np.arange(self.shape[1]) + 0.5) * self.resolution
+        return x, y
+
+    def carve(self, path_points: np.ndarray, radius: float, cutter_type: str = '',
+              corner_radius: float = 0.0, tool_number: Optional[int] = None,
+              max_pairs: int = DEFAULT_MAX_PAIRS) -> float:
+        """
+        Remove the volume swept by a cutter whose tip follows path_points.
+
+        Args:
+            path_points: (N, 3) tool tip positions
+            radius: Cutter radius in mm
+            cutter_type: ToolInfo cutter type (SEM, BAL, BUL, DRL, CHM, ...)
+            corner_radius: Corner radius for bull nose cutters
+            tool_number: Tool the removed volume is booked against
+            max_pairs: Limit on (position, column) pairs held in memory at once
+
+        Returns:
+            Volume removed by this call in mm³
+        """
+        points = np.asarray(path_points, dtype=np.float64).reshape(-1, 3)
+        # Positions with the tip at or above the stock top cannot cut
+        points = points[points[:, 2] < self.z_max]
+        if len(points) == 0 or radius <= 0:
+            return 0.0
+
+        # Column offsets that can lie within the radius from anywhere in the centre column
+        reach = int(np.ceil(radius / self.resolution)) + 1
+        di, dj = np.meshgrid(np.arange(-reach, reach + 1), np.arange(-reach, reach + 1), indexing='ij')
+        gap = np.maximum(np.abs(di) - 1, 0) ** 2 + np.maximum(np.abs(dj) - 1, 0) ** 2
+        keep = gap * self.resolution ** 2 <= radius * radius
+        di, dj = di[keep], dj[keep]
+
+        before = self.top.sum()
+        heights = self.top.reshape(-1)
+        nx, ny = self.shape
+        batch = max(1, max_pairs // len(di))
+
+        for lo in range(0, len(points), batch):
+            tips = points[lo:lo + batch]
+            base = np.floor((tips[:, :2] - self.origin) / self.resolution).astype(np.int64)
+            ci = base[:, 0:1] + di
+            cj = base[:, 1:2] + dj
+
+            dx = self.origin[0] + (ci + 0.5) * self.resolution - tips[:, 0:1]
+            dy = self.origin[1] + (cj + 0.5) * self.resolution - tips[:, 1:2]
+            distances = np.sqrt(dx * dx + dy * dy)
+            inside = (distances <= radius) & (ci >= 0) & (ci < nx) & (cj >= 0) & (cj < ny)
+
+            surface = tips[:, 2:3] + cutter_profile(distances, radius, cutter_type, corner_radius)
+            np.minimum.at(heights, (ci * ny + cj)[inside], surface[inside])
+
+        np.maximum(self.top, self.z_min, out=self.top)
+        removed = float((before - self.top.sum()) * self.cell_area)
+        self.removed_volume_by_tool[tool_number] = self.removed_volume_by_tool.get(tool_number, 0.0) + removed
+        return removed
+
+    def carve_commands(self, commands: Sequence, tools: Optional[Dict] = None,
+                       path_resolution: float = 0.1, default_diameter: float = 6.0) -> float:
+        """
+        Carve a chunk of commands, switching cutter geometry at every tool change.
+
+        The machine position is kept between calls, so a long program can be
+        simulated chunk by chunk (e.g. from GCodeParser.iter_commands with a
+        chunk_size) in bounded memory.
+
+        Args:
+            commands: Commands or a CommandTable chunk
+            tools: Tool number -> ToolInfo, e.g. GCodeParser.get_tools()
+            path_resolution: Interpolation step along the path in mm
+            default_diameter: Cutter diameter used when a tool has no ToolInfo
+
+        Returns:
+            Volume removed by this chunk in mm³
+        """
+        table = commands if isinstance(commands, CommandTable) else CommandTable.from_commands(commands)
+        tools = tools or {}
+        removed = 0.0
+
+        for tool_number, start, stop in table.tool_runs():
+            plan = plan_segments(table[start:stop], path_resolution, self.current_position)
+            self.current_position = plan.end_position.copy()
+            if plan.num_points == 0:
+                continue
+
+            info = tools.get(tool_number)
+            diameter = info.diameter if info is not None and info.diameter > 0 else default_diameter
+            removed += self.carve(
+                interpolate_plan(plan), diameter / 2.0,
+                cutter_type=info.cutter_type if info is not None else '',
+                corner_radius=info.corner_radius if info is not None else 0.0,
+                tool_number=tool_number
+            )
+
+        return removed
+
+    def simulate(self, command_chunks: Iterable[Sequence], tools: Optional[Dict] = None,
+                 path_resolution: float = 0.1, default_diameter: float = 6.0) -> float:
+        """Carve a stream of command chunks and return the total volume removed in mm³."""
+        removed = 0.0
+        for chunk in command_chunks:
+            removed += self.carve_commands(chunk, tools, path_resolution, default_diameter)
+        return removed
+
+    def to_points(self) -> np.ndarray:
+        """Top-surface points (column centre, top height) of every column that still holds material."""
+        x, y = self.cell_centers()
+        gx, gy = np.meshgrid(x, y, indexing='ij')
+        solid = self.top > self.z_min + 1e-9
+        return np.column_stack([gx[solid], gy[solid], self.top[solid]])
@@ -6,6 +6,7 @@ import plotly.express as px
 from plotly.subplots import make_subplots
 from typing import List, Optional, Tuple, Dict, Any
 from gcode_parser import GCodeCommand
+from path_lod import PathLOD
 
 # Open3D is optional
 OPEN3D_AVAILABLE = False
@@ -15,18 +16,24 @@ try:
 except ImportError:
     OPEN3D_AVAILABLE = False
 
+# Tool path points drawn per backend; larger paths are shown at a coarser level of detail
+POINT_BUDGETS = {'matplotlib': 100_000, 'plotly': 200_000, 'open3d': 2_000_000}
+
 
 class Visualizer:
     """3D visualization for G-code tool paths and point clouds."""
     
-    def __init__(self, backend: str = 'matplotlib'):
+    def __init__(self, backend: str = 'matplotlib', point_budget: Optional[int] = None):
         """
         Initialize visualizer.
         
         Args:
             backend: Visualization backend ('matplotlib', 'plotly', 'open3d')
+            point_budget: Maximum tool path points to draw (default: per backend, see POINT_BUDGETS)
         """
         self.backend = backend
+        self.point_budget = point_budget
+        self.path_lod = None  # Detail levels of the last large tool path
         self.fig = None
         self.ax = None
         
@@ -41,11 +48,12 @@ class Visualizer:
             title: Plot title
             show_start_end: Whether to highlight start and end points
         """
-        if not path_points:
+        if len(path_points) == 0:
             print("No path points to visualize")
             return
         
-        points_array = np.array(path_points)
+        backend = self.backend if self.backend in POINT_BUDGETS else 'matplotlib'
+        points_array = self._level_of_detail(np.asarray(path_points, dtype=np.float64).reshape(-1, 3), backend)
         
         if self.backend == 'matplotlib':
             self._plot_path_matplotlib(points_array, title, show_start_end)
@@ -57,6 +65,18 @@ class Visualizer:
             print(f"Backend '{self.backend}' not available, falling back to matplotlib")
             self._plot_path_matplotlib(points_array, title, show_start_end)
     
+    def _level_of_detail(self, points: np.ndarray, backend: str) -> np.ndarray:
+        """Decimate the path to the backend's point budget (detail levels are computed once per path)."""
+        budget = self.point_budget or POINT_BUDGETS[backend]
+        if len(points) <= budget:
+            return points
+        
+        if self.path_lod is None or self.path_lod.points is not points:
+            self.path_lod = PathLOD(points)
+        selected = self.path_lod.select(budget)
+        print(f"Showing {len(selected):,} of {len(points):,} tool path points (level of detail)")
+        return selected
+    
     def _plot_path_matplotlib(self, points: np.ndarray, title: str, show_start_end: bool):
         """Plot using matplotlib."""
         fig = plt.figure(figsize=(12, 8))
@@ -142,18 +162,16 @@ class Visualizer:
         pcd.points = o3d.utility.Vector3dVector(points)
         
         # Color points based on sequence (blue to red gradient)
-        colors = np.zeros((len(points), 3))
-        for i in range(len(points)):
-            ratio = i / max(len(points) - 1, 1)
-            colors[i] = [ratio, 0, 1 - ratio]  # Blue to red
+        ratio = np.linspace(0.0, 1.0, len(points))
+        colors = np.column_stack([ratio, np.zeros(len(points)), 1 - ratio])
         pcd.colors = o3d.utility.Vector3dVector(colors)
         
         # Create line set for path
-        lines = [[i, i + 1] for i in range(len(points) - 1)]
+        lines = np.column_stack([np.arange(len(points) - 1), np.arange(1, len(points))])
         line_set = o3d.geometry.LineSet()
         line_set.points = o3d.utility.Vector3dVector(points)
         line_set.lines = o3d.utility.Vector2iVector(lines)
-        line_set.colors = o3d.utility.Vector3dVector([[0, 0, 1] for _ in lines])
+        line_set.colors = o3d.utility.Vector3dVector(np.tile([0.0, 0.0, 1.0], (len(lines), 1)))
         
         # Visualize
         o3d.visualization.draw_geometries([pcd, line_set], window_name=title)
@@ -346,7 +364,7 @@ class Visualizer:
             workpiece_bounds: Original workpiece boundaries
             title: Plot title
         """
-        if not final_part_points:
+        if len(final_part_points) == 0:
             print("No final part points to visualize")
             return
         
@@ -41,7 +41,7 @@ class Visualizer:
             title: Plot title
             show_start_end: Whether to highlight start and end points
         """
-        if not path_points:
+        if len(path_points) == 0:
             print("No path points to visualize")
             return
         
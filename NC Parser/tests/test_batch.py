@@ -0,0 +1,84 @@
+import unittest
+import tempfile
+import shutil
+import json
+import csv
+import sys
+import os
+
+# main.py adds src to the path itself
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from unittest import mock
+import main
+from main import run_batch, find_nc_files
+
+
+GCODE_PROGRAM = "G00 X0 Y0 Z5\nG01 Z-1 F200\nG01 X20\nG02 X30 Y10 I0 J10\nM30\n"
+
+_process_batch_file = main._process_batch_file
+
+
+def _crash_on_marked_file(file_path):
+    """Batch worker task that kills its process for files named *crash*, like an OOM kill."""
+    if 'crash' in os.path.basename(file_path):
+        os._exit(1)
+    return _process_batch_file(file_path)
+
+
+class TestBatchMode(unittest.TestCase):
+    """Test cases for directory batch processing."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.programs = os.path.join(self.directory, 'programs')
+        os.makedirs(os.path.join(self.programs, 'nested'))
+        for name in ('a.nc', os.path.join('nested', 'b.NC')):
+            with open(os.path.join(self.programs, name), 'w') as f:
+                f.write(GCODE_PROGRAM)
+        with open(os.path.join(self.programs, 'broken.nc'), 'w') as f:
+            f.write("not a program\n")
+        with open(os.path.join(self.programs, 'notes.txt'), 'w') as f:
+            f.write("ignored\n")
+        self.output = os.path.join(self.directory, 'out')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_finds_nc_files_recursively(self):
+        """Only NC extensions are picked up, in any letter case."""
+        names = [os.path.relpath(path, self.programs) for path in find_nc_files(self.programs)]
+        self.assertEqual(names, ['a.nc', 'broken.nc', os.path.join('nested', 'b.NC')])
+
+    def test_batch_writes_summaries(self):
+        """Every file gets a summary row; failures are reported, not raised."""
+        rows = run_batch(self.programs, self.output, workers=2, use_cache=False, resolution=0.5)
+
+        self.assertEqual([row['status'] for row in rows], ['ok', 'error', 'ok'])
+        self.assertEqual(rows[0]['machining_time_minutes'], rows[2]['machining_time_minutes'])
+        self.assertGreater(rows[0]['machining_time_minutes'], 0)
+
+        with open(os.path.join(self.output, 'summary.csv'), newline='') as f:
+            self.assertEqual(len(list(csv.DictReader(f))), 3)
+        with open(os.path.join(self.output, 'summary.json')) as f:
+            self.assertEqual(json.load(f), rows)
+        with open(os.path.join(self.output, 'stats', 'a.nc.json')) as f:
+            self.assertEqual(json.load(f)['statistics']['total_commands'], 5)
+
+    def test_dead_worker_does_not_stop_batch(self):
+        """A worker that dies fails only the files in flight; the rest run on a new pool."""
+        with open(os.path.join(self.programs, '0_crash.nc'), 'w') as f:
+            f.write(GCODE_PROGRAM)
+        with mock.patch('main._process_batch_file', _crash_on_marked_file):
+            rows = run_batch(self.programs, self.output, workers=1, use_cache=False, resolution=0.5)
+
+        statuses = {row['file']: row['status'] for row in rows}
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(statuses['0_crash.nc'], 'error')
+        self.assertEqual(statuses[os.path.join('nested', 'b.NC')], 'ok')
+        with open(os.path.join(self.output, 'summary.csv'), newline='') as f:
+            self.assertEqual(len(list(csv.DictReader(f))), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import tempfile
+import shutil
+import sys
+import os
+
+# benchmark.py adds src to the path itself
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmark import create_synthetic_program, compare_reports, run_suite
+from src.gcode_parser import GCodeParser
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """Test cases for the in-process benchmark harness."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _parse(self, text, extension):
+        path = os.path.join(self.directory, 'program' + extension)
+        with open(path, 'w') as f:
+            f.write(text)
+        return GCodeParser().parse_file(path)
+
+    def test_synthetic_programs_parse(self):
+        """Both formats produce the requested number of moves with the requested arc share."""
+        for heidenhain, extension, arc_names in ((False, '.nc', ('G02', 'G03')),
+                                                 (True, '.h', ('C_CW', 'C_CCW', 'C'))):
+            table = self._parse(create_synthetic_program(400, arc_fraction=0.5, heidenhain=heidenhain), extension)
+            arcs = sum(table.count(name) for name in arc_names)
+            self.assertGreaterEqual(len(table), 400)
+            self.assertTrue(150 < arcs < 250)
+
+    def test_suite_report_and_comparison(self):
+        """The suite reports every stage and the comparison flags slowdowns."""
+        output = os.path.join(self.directory, 'results.json')
+        report = run_suite(sizes=(50,), formats=('gcode',), trace_memory=False, output=output)
+
+        self.assertTrue(os.path.exists(output))
+        self.assertEqual([r['stage'] for r in report['results']],
+                         ['parse', 'path', 'cycle_time', 'stock', 'removal', 'export'])
+
+        slower = dict(report, results=[dict(r, seconds=r['seconds'] * 2 + 1) for r in report['results']])
+        self.assertEqual(len(compare_reports(report, slower)), 6)
+        self.assertEqual(compare_reports(report, report), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
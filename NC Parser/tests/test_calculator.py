@@ -7,7 +7,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from src.path_calculator import PathCalculator
-from src.gcode_parser import GCodeCommand
+from src.gcode_parser import GCodeCommand, ToolInfo
 
 
 class TestPathCalculator(unittest.TestCase):
@@ -67,6 +67,39 @@ class TestPathCalculator(unittest.TestCase):
         
         self.assertGreater(len(removal_points), 0)
     
+    def test_material_removal_matches_point_loop(self):
+        """The broadcast stencil gives the old per-point loop's points (without repeated centers)."""
+        path_points = np.array([[0.0, 0.0, 0.0], [5.0, 1.0, -1.0], [9.0, 9.0, -2.0]])
+        bounds = ((-1.0, 12.0), (-1.0, 10.0), (-5.0, 5.0))
+        
+        expected = []
+        for point in path_points:
+            for angle in np.linspace(0, 2 * np.pi, 12, endpoint=False):
+                for radius in np.linspace(0, 1.5, 3):
+                    candidate = point + [radius * np.cos(angle), radius * np.sin(angle), 0.0]
+                    if all(low <= value <= high for value, (low, high) in zip(candidate, bounds)):
+                        expected.append(candidate)
+        expected = np.unique(np.round(expected, 9), axis=0)
+        
+        removal_points = self.calculator.calculate_material_removal(path_points, 3.0, bounds)
+        self.assertEqual(len(removal_points), len(np.unique(np.round(removal_points, 9), axis=0)))
+        self.assertTrue(np.allclose(np.unique(np.round(removal_points, 9), axis=0), expected))
+    
+    def test_material_removal_follows_cutter_shape(self):
+        """Ball and bull nose footprints rise towards the rim; the tool's diameter wins."""
+        path_points = np.zeros((1, 3))
+        ball = ToolInfo("BAL_04.00_P15-120_L19O25_2.00AL2", 1)
+        bull = ToolInfo("BUL_04.00_P15-120_L19O25_0.50AL2", 2)
+        
+        ball_points = self.calculator.calculate_material_removal(path_points, 10.0, tool=ball)
+        radial = np.hypot(ball_points[:, 0], ball_points[:, 1])
+        self.assertAlmostEqual(radial.max(), 2.0)
+        self.assertTrue(np.allclose(ball_points[:, 2], 2.0 - np.sqrt(4.0 - radial ** 2)))
+        
+        bull_points = self.calculator.calculate_material_removal(path_points, 10.0, tool=bull)
+        self.assertTrue(np.allclose(bull_points[np.isclose(np.hypot(bull_points[:, 0], bull_points[:, 1]), 1.0), 2], 0.0))
+        self.assertAlmostEqual(bull_points[:, 2].max(), 0.5)
+    
     def test_machining_time_calculation(self):
         """Test machining time estimation."""
         commands = [
@@ -78,6 +111,33 @@ class TestPathCalculator(unittest.TestCase):
         
         self.assertGreater(time, 0)
 
+    
+    def test_streaming_tool_path(self):
+        """Test chunked path calculation carries position across chunks."""
+        commands = [
+            GCodeCommand("G00", 0, 0, 5),
+            GCodeCommand("G01", 0, 0, 0),
+            GCodeCommand("G01", 10, 0, 0),
+            GCodeCommand("G02", 10, 10, 0, 0, 5),
+            GCodeCommand("G01", None, 20, None),
+        ]
+        expected = self.calculator.calculate_tool_path(commands)
+        
+        chunks = [commands[0:2], commands[2:3], commands[3:]]
+        streamed = np.vstack(list(self.calculator.iter_tool_path(iter(chunks))))
+        
+        self.assertTrue(np.array_equal(streamed, expected))
+    
+    def test_machining_time_from_iterator(self):
+        """Test machining time accepts a one-shot command stream."""
+        commands = [
+            GCodeCommand("G00", 10, 0, 0),
+            GCodeCommand("G01", 20, 0, 0, f=100),
+        ]
+        expected = self.calculator.calculate_machining_time(commands)
+        
+        self.assertEqual(self.calculator.calculate_machining_time(iter(commands)), expected)
+
 
 if __name__ == '__main__':
     unittest.main()
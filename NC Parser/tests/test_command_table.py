@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.gcode_parser import GCodeParser, GCodeCommand
+from src.command_table import CommandTable
+from src.interpolation import plan_segments, interpolate_plan
+
+
+class TestCommandTable(unittest.TestCase):
+    """Test cases for columnar command storage."""
+
+    def setUp(self):
+        self.parser = GCodeParser()
+        self.commands = [
+            GCodeCommand("G00", 0, 0, 5),
+            GCodeCommand("M03"),
+            GCodeCommand("G01", 10, None, -1, f=200),
+            GCodeCommand("C_CW", 0, -10, None, i=0, j=0, is_heidenhain=True, radius=10.0, direction='CW'),
+        ]
+        self.parser.commands = self.commands
+        self.table = self.parser.commands
+
+    def test_columns_and_opcodes(self):
+        """Missing words are stored as NaN in the coordinate columns."""
+        self.assertEqual(len(self.table), 4)
+        self.assertEqual(self.table.opcodes.dtype, np.int16)
+        self.assertTrue(np.isnan(self.table.y[2]))
+        self.assertEqual(self.table.f[2], 200.0)
+
+    def test_many_distinct_commands(self):
+        """Programs with more distinct words than int8 can number still parse and concatenate."""
+        commands = [GCodeCommand(f"M{n}") for n in range(300)] + [GCodeCommand("G01", 1, 2, 3)]
+        table = CommandTable.from_commands(commands)
+        self.assertEqual([view.command for view in table], [command.command for command in commands])
+        joined = CommandTable.concatenate([table, self.table])
+        self.assertEqual(joined[299].command, "M299")
+        self.assertEqual(joined[300].command, "G01")
+        self.assertEqual([view.command for view in joined[301:]], [view.command for view in self.table])
+
+    def test_view_matches_command(self):
+        """Row views expose the same fields as GCodeCommand."""
+        for view, command in zip(self.table, self.commands):
+            for field in ('command', 'x', 'y', 'z', 'i', 'j', 'k', 'f', 'is_heidenhain', 'radius', 'direction', 'tool'):
+                self.assertEqual(getattr(view, field), getattr(command, field))
+
+    def test_take_keeps_side_table(self):
+        """Selecting rows remaps the radius/direction side table."""
+        arcs = self.table.take(self.table.mask_for(['C_CW']))
+
+        self.assertEqual(len(arcs), 1)
+        self.assertEqual(arcs[0].radius, 10.0)
+        self.assertEqual(arcs[0].direction, 'CW')
+        self.assertEqual(self.table[-1].command, 'C_CW')
+
+    def test_table_plan_matches_command_plan(self):
+        """Planning from the table gives the same path as planning from commands."""
+        expected = interpolate_plan(plan_segments(self.commands, 0.5))
+        points = interpolate_plan(plan_segments(self.table, 0.5))
+
+        self.assertTrue(np.array_equal(points, expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
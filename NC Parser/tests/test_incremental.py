@@ -0,0 +1,99 @@
+import unittest
+import numpy as np
+import tempfile
+import shutil
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.gcode_parser import GCodeParser
+from src.path_calculator import PathCalculator
+from src.program_cache import ProgramCache
+from src.incremental import IncrementalPipeline
+
+
+def program_lines(depth):
+    lines = ["BEGIN PGM INCR MM\n",
+             "BLK FORM 0.1 Z X+0 Y+0 Z-10\n",
+             "BLK FORM 0.2 X+40 Y+30 Z+0\n",
+             "* - BUL_08.00_P15-120_L19O25_1.00AL3 T4\n",
+             "TOOL CALL 4 Z S9000\n",
+             "L X+5 Y+5 Z+2 FMAX\n"]
+    for step in range(12):
+        lines += [f"L Z{depth - step * 0.5:+.1f} F300\n",
+                  "L X+20 Y+5\n",
+                  "CC X+20 Y+10\n",
+                  "C X+20 Y+15 DR+\n",
+                  "L X+5 Y+15\n"]
+    lines.append("END PGM INCR MM\n")
+    return lines
+
+
+class TestIncrementalPipeline(unittest.TestCase):
+    """Test cases for checkpointed re-parsing of edited programs."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.nc_file = os.path.join(self.directory, 'program.h')
+        self.pipeline = IncrementalPipeline(ProgramCache(os.path.join(self.directory, 'cache')),
+                                            checkpoint_lines=8)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, lines):
+        with open(self.nc_file, 'w') as f:
+            f.writelines(lines)
+
+    def assert_matches_full_run(self, commands, path_points, parser):
+        reference_parser = GCodeParser()
+        reference = reference_parser.parse_file(self.nc_file)
+        calculator = PathCalculator(resolution=0.5)
+        self.assertEqual(len(commands), len(reference))
+        np.testing.assert_array_equal(commands.values, reference.values)
+        np.testing.assert_array_equal(commands.tools, reference.tools)
+        self.assertEqual([c.command for c in commands], [c.command for c in reference])
+        np.testing.assert_allclose(path_points, calculator.calculate_tool_path(reference, dense=True))
+        self.assertEqual(parser.tools.keys(), reference_parser.tools.keys())
+        self.assertEqual(parser.blk_form, reference_parser.blk_form)
+
+    def test_edit_reuses_unchanged_prefix(self):
+        """Only chunks from the first edited one are parsed again."""
+        lines = program_lines(-1.0)
+        self.write(lines)
+        parser = GCodeParser()
+        self.pipeline.run(self.nc_file, parser, 0.5)
+        self.assertEqual(self.pipeline.reused_chunks, 0)
+
+        lines[-3] = "C X+20 Y+15 DR-\n"
+        self.write(lines)
+        parser = GCodeParser()
+        commands, path_points = self.pipeline.run(self.nc_file, parser, 0.5)
+        self.assertEqual(self.pipeline.reused_chunks, (len(lines) - 3) // 8)
+        self.assert_matches_full_run(commands, path_points, parser)
+
+        lines += ["L X+0 Y+0 Z+20 FMAX\n"] * 3
+        self.write(lines)
+        commands, path_points = self.pipeline.run(self.nc_file, parser, 0.5)
+        self.assert_matches_full_run(commands, path_points, parser)
+
+    def test_unchanged_and_rewritten_files(self):
+        """An unchanged file is fully reused; an edit at the top reparses everything."""
+        self.write(program_lines(-1.0))
+        parser = GCodeParser()
+        first = self.pipeline.run(self.nc_file, parser, 0.5)
+        second = self.pipeline.run(self.nc_file, parser, 0.5)
+        self.assertEqual(self.pipeline.reused_chunks, self.pipeline.total_chunks)
+        np.testing.assert_array_equal(first[1], second[1])
+        self.assert_matches_full_run(*second, parser)
+
+        self.write(program_lines(-2.0))
+        commands, path_points = self.pipeline.run(self.nc_file, parser, 0.5)
+        self.assertEqual(self.pipeline.reused_chunks, 0)
+        self.assert_matches_full_run(commands, path_points, parser)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.interpolation import (plan_segments, interpolate_plan, interpolate_commands, fill_segments,
+                               split_segment_ranges)
+from src.path_calculator import PathCalculator
+from src.gcode_parser import GCodeCommand, GCodeParser
+
+
+class TestInterpolationEngine(unittest.TestCase):
+    """Test cases for the vectorized interpolation engine."""
+
+    def setUp(self):
+        self.calculator = PathCalculator(resolution=0.1)
+
+    def _assert_matches_reference(self, commands):
+        reference = np.array(self.calculator._calculate_path_sequential(commands)).reshape(-1, 3)
+        points = self.calculator.calculate_tool_path(commands)
+
+        self.assertEqual(points.shape, reference.shape)
+        self.assertTrue(np.allclose(points, reference, atol=1e-9))
+
+    def test_gcode_program_matches_reference(self):
+        """Lines and arcs produce the same points as the per-point implementation."""
+        commands = [
+            GCodeCommand("G00", 0, 0, 5),
+            GCodeCommand("G01", 0, 0, -1, f=100),
+            GCodeCommand("G01", 20, 0, -1),
+            GCodeCommand("M03"),
+            GCodeCommand("G02", 30, 10, -1, 0, 10),
+            GCodeCommand("G03", 20, 20, -2, -10, 0),
+            GCodeCommand("G01", None, 5, None),
+            GCodeCommand("G01", 20, 5, -2),  # Zero-length move
+        ]
+        self._assert_matches_reference(commands)
+
+    def test_heidenhain_program_matches_reference(self):
+        """Heidenhain arcs use the absolute CC centre stored in I/J."""
+        commands = [
+            GCodeCommand("L_RAPID", 10, 0, 2, is_heidenhain=True),
+            GCodeCommand("L_FEED", 10, 0, 0, f=500, is_heidenhain=True),
+            GCodeCommand("C_CW", 0, -10, 0, i=0, j=0, is_heidenhain=True),
+            GCodeCommand("C_CCW", 10, 0, -1, i=0, j=0, is_heidenhain=True),
+        ]
+        self._assert_matches_reference(commands)
+
+    def test_returns_contiguous_array(self):
+        """The tool path is a single contiguous (N, 3) float array."""
+        commands = [GCodeCommand("G01", 10, 0, 0), GCodeCommand("G02", 10, 10, 0, 0, 5)]
+        points = self.calculator.calculate_tool_path(commands)
+
+        self.assertEqual(points.dtype, np.float64)
+        self.assertEqual(points.shape[1], 3)
+        self.assertTrue(points.flags['C_CONTIGUOUS'])
+        self.assertTrue(np.allclose(self.calculator.current_position, [10, 10, 0]))
+
+    def test_blocked_fill_matches_single_block(self):
+        """Splitting the output into small blocks does not change the result."""
+        commands = [GCodeCommand("G01", 5 * k, (-1) ** k, 0) for k in range(1, 20)]
+        plan = plan_segments(commands, 0.1)
+
+        blocked = np.empty((plan.num_points, 3))
+        fill_segments(plan, blocked, block_points=7)
+
+        self.assertTrue(np.array_equal(blocked, interpolate_plan(plan)))
+
+    def test_segment_ranges_cover_plan(self):
+        """Parallel ranges are contiguous, disjoint and cover every segment."""
+        commands = [GCodeCommand("G01", 3 * k, 0, 0) for k in range(1, 50)]
+        plan = plan_segments(commands, 0.1)
+        ranges = split_segment_ranges(plan, 8)
+
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], plan.num_segments)
+        for (_, hi), (lo, _) in zip(ranges[:-1], ranges[1:]):
+            self.assertEqual(hi, lo)
+
+    def test_parallel_matches_sequential(self):
+        """Worker processes start every range from its resolved start point."""
+        commands = [GCodeCommand("G01", 10, 0, 0)]
+        for k in range(1, 40):
+            arc = "G02" if k % 2 else "G03"
+            commands.append(GCodeCommand(arc, 10 + 5 * k, 0, -0.1 * k, 2.5, 0))
+
+        expected = self.calculator.calculate_tool_path(commands)
+
+        self.calculator.num_threads = 2
+        self.calculator.parallel_threshold = 0
+        points = self.calculator.calculate_tool_path(commands)
+
+        self.assertTrue(np.array_equal(points, expected))
+
+    def test_tolerance_keeps_line_end_points(self):
+        """With a chordal tolerance, lines emit only their end point."""
+        commands = [GCodeCommand("G00", 500, 0, 0), GCodeCommand("G01", 500, 200, -5)]
+        self.calculator.tolerance = 0.01
+        points = self.calculator.calculate_tool_path(commands)
+
+        self.assertTrue(np.array_equal(points, [[500, 0, 0], [500, 200, -5]]))
+        self.assertEqual(len(self.calculator.calculate_tool_path(commands, dense=True)), 7000)
+
+    def test_tolerance_bounds_arc_chord_error(self):
+        """Arc chords stay within the tolerance and the table plan agrees with the command plan."""
+        commands = [GCodeCommand("G01", 20, 0, 0), GCodeCommand("G03", -20, 0, 0, -20, 0),
+                    GCodeCommand("C_CW", 20, 0, 0, i=0, j=0, is_heidenhain=True)]
+        plan = plan_segments(commands, 0.1, tolerance=0.005)
+        points = interpolate_plan(plan)
+
+        chords = np.vstack(([[20, 0, 0]], points[1:]))
+        midpoints = (chords[1:] + chords[:-1]) / 2
+        errors = 20 - np.linalg.norm(midpoints[:, :2], axis=1)
+        self.assertLessEqual(errors.max(), 0.005 + 1e-9)
+        self.assertLess(len(points), len(interpolate_plan(plan_segments(commands, 0.1))) / 5)
+
+        parser = GCodeParser()
+        parser.commands = commands
+        table_points = interpolate_plan(plan_segments(parser.commands, 0.1, tolerance=0.005))
+        self.assertTrue(np.array_equal(table_points, points))
+
+        wrapped, end_position = interpolate_commands(commands, 0.1, tolerance=0.005)
+        self.assertTrue(np.array_equal(wrapped, points))
+        self.assertTrue(np.array_equal(end_position, plan.end_position))
+
+    def test_empty_program(self):
+        """Programs without motion produce an empty (0, 3) array."""
+        points = self.calculator.calculate_tool_path([GCodeCommand("M03")])
+        self.assertEqual(points.shape, (0, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
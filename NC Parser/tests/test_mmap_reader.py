@@ -0,0 +1,115 @@
+import unittest
+import numpy as np
+import tempfile
+import shutil
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.gcode_parser import GCodeParser
+from src.mmap_reader import map_file, iter_mapped_lines, count_lines, split_byte_ranges
+
+
+def heidenhain_program():
+    lines = ["BEGIN PGM RANGES MM", "BLK FORM 0.1 Z X+0 Y+0 Z-10", "BLK FORM 0.2 X+40 Y+30 Z+0",
+             "* - BEM_06.00_P15-120_L19O25_0.00AL3 T1", "* - BUL_08.00_P15-120_L19O25_1.00AL3 T2",
+             "TOOL CALL 1 Z S9000", "L X+5 Y+5 Z+2 FMAX", "L Z-1 F300", "CC X+20 Y+10"]
+    for n in range(60):
+        lines.append(f"C X+{20 + (n % 2) * 5} Y+{10 + (n % 3)} DR{'-+'[n % 2]}")
+        lines.append(f"L X+{n % 7} Y+{n % 5} F{400 + n}")
+        if n == 25:
+            lines += ["TOOL CALL 2 Z S12000", "CC X+15"]
+    lines.append("END PGM RANGES MM")
+    return lines
+
+
+def gcode_program():
+    lines = ["G21 G90", "T3 M06", "S8000 M03", "G00 X0 Y0 Z5"]
+    for n in range(80):
+        lines.append(f"G01 X{n % 9} Y{n % 4} Z-1 F{300 + n} (pass {n})")
+        lines.append(f"G02 X{n % 9 + 2} Y{n % 4} I1 J0")
+        if n == 50:
+            lines.append("T4 M06")
+    lines.append("M30")
+    return lines
+
+
+class TestMmapReader(unittest.TestCase):
+    """Test cases for memory-mapped reading and range-parallel parsing."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, lines):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        return path
+
+    def test_lines_and_ranges(self):
+        """Small decode blocks and byte ranges reproduce the file's lines."""
+        lines = gcode_program()
+        path = self.write('program.nc', lines)
+        with map_file(path) as buffer:
+            self.assertEqual(list(iter_mapped_lines(buffer, block_bytes=7)), lines)
+            ranges = split_byte_ranges(buffer, 5)
+            self.assertEqual(len(ranges), 5)
+            self.assertEqual(ranges[0][0], 0)
+            self.assertEqual(ranges[-1][1], len(buffer))
+            pieces = [list(iter_mapped_lines(buffer, start, stop, block_bytes=64)) for start, stop in ranges]
+            self.assertEqual(sum(pieces, []), lines)
+            self.assertEqual(sum(count_lines(buffer, start, stop) for start, stop in ranges), len(lines))
+        empty = os.path.join(self.directory, 'empty.nc')
+        open(empty, 'w').close()
+        with map_file(empty) as buffer:
+            self.assertEqual(split_byte_ranges(buffer, 4), [])
+        self.assertEqual(len(GCodeParser().parse_file_parallel(empty, 4)), 0)
+
+    def test_parallel_parse_matches_sequential(self):
+        """Tools and circle centres are carried across range boundaries."""
+        for name, lines in (('program.h', heidenhain_program()), ('program.nc', gcode_program())):
+            path = self.write(name, lines)
+            sequential = GCodeParser()
+            expected = sequential.parse_file(path)
+            for workers in (2, 7):
+                parallel = GCodeParser()
+                table = parallel.parse_file_parallel(path, workers)
+                np.testing.assert_array_equal(table.values, expected.values)
+                np.testing.assert_array_equal(table.tools, expected.tools)
+                self.assertEqual([c.command for c in table], [c.command for c in expected])
+                self.assertEqual({row: (round(r, 9) if r is not None else r, d) for row, (r, d) in table.extras.items()},
+                                 {row: (round(r, 9) if r is not None else r, d) for row, (r, d) in expected.extras.items()})
+                self.assertEqual(parallel.get_state(), sequential.get_state())
+
+    def test_tool_call_after_comment_uses_earlier_range_tool(self):
+        """A TOOL CALL for a tool defined in an earlier range overrides the range's own tool comment."""
+        lines = ["BEGIN PGM SPLIT MM", "* - BEM_06.00_P15-120_L19O25_0.00AL3 T1", "TOOL CALL 1 Z S9000"]
+        lines += [f"L X+{n % 7} Y+{n % 5} F{400 + n}" for n in range(40)]
+        lines += ["* - BUL_08.00_P15-120_L19O25_1.00AL3 T2", "TOOL CALL 1 Z S8000", "L X+3 Y+3 F500",
+                  "END PGM SPLIT MM"]
+        path = self.write('split.h', lines)
+        with map_file(path) as buffer:
+            (_, first_stop), (second_start, _) = split_byte_ranges(buffer, 2)
+            first_range = list(iter_mapped_lines(buffer, 0, first_stop))
+            second_range = list(iter_mapped_lines(buffer, second_start, len(buffer)))
+        self.assertIn("* - BEM_06.00_P15-120_L19O25_0.00AL3 T1", first_range)
+        self.assertIn("* - BUL_08.00_P15-120_L19O25_1.00AL3 T2", second_range)
+
+        sequential = GCodeParser()
+        expected = sequential.parse_file(path)
+        parallel = GCodeParser()
+        table = parallel.parse_file_parallel(path, 2)
+        np.testing.assert_array_equal(table.tools, expected.tools)
+        self.assertEqual(parallel.get_current_tool().tool_number, 1)
+        self.assertEqual(parallel.get_state(), sequential.get_state())
+        self.assertEqual([(s.tool_number, s.start, s.stop, s.tool_info.raw_string) for s in parallel.get_tool_segments()],
+                         [(s.tool_number, s.start, s.stop, s.tool_info.raw_string) for s in sequential.get_tool_segments()])
+
+
+if __name__ == '__main__':
+    unittest.main()
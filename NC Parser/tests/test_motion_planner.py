@@ -0,0 +1,131 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.motion_planner import MachineLimits, plan_motion, segment_geometry
+from src.path_calculator import PathCalculator, plan_cycle_time
+from src.interpolation import plan_segments
+from src.command_table import CommandTable
+from src.gcode_parser import GCodeCommand, GCodeParser
+
+
+class TestMotionPlanner(unittest.TestCase):
+    """Test cases for the kinematic cycle-time estimator."""
+
+    def setUp(self):
+        self.x_axis = np.array([[1.0, 0.0, 0.0]])
+
+    def test_single_line_profiles(self):
+        """A long line matches the analytic trapezoidal and S-curve times."""
+        lengths, feeds, rapid = np.array([100.0]), np.array([6000.0]), np.array([False])
+
+        trapezoid = plan_motion(lengths, self.x_axis, self.x_axis, feeds, rapid, MachineLimits(max_jerk=None))
+        self.assertAlmostEqual(trapezoid.total_time, 100 / 100 + 100 / 1500)
+
+        s_curve = plan_motion(lengths, self.x_axis, self.x_axis, feeds, rapid, MachineLimits(max_jerk=30000))
+        self.assertAlmostEqual(s_curve.total_time, 100 / 100 + 100 / 1500 + 1500 / 30000)
+
+    def test_short_line_never_reaches_feed(self):
+        """Short segments accelerate and decelerate without cruising."""
+        profile = plan_motion(np.array([1.0]), self.x_axis, self.x_axis, np.array([6000.0]),
+                              np.array([False]), MachineLimits(max_jerk=None))
+        self.assertAlmostEqual(profile.peak_speeds[0], np.sqrt(1500), places=6)
+        self.assertAlmostEqual(profile.total_time, 2 * np.sqrt(1 / 1500), places=6)
+
+    def test_look_ahead_matches_sequential_passes(self):
+        """The scan-based look-ahead equals classic backward/forward passes."""
+        rng = np.random.default_rng(5)
+        count = 500
+        directions = np.repeat(self.x_axis, count, axis=0)
+        lengths = rng.uniform(0.01, 3.0, count)
+        feeds = rng.uniform(500, 5000, count)
+        limits = MachineLimits(max_jerk=None)
+        profile = plan_motion(lengths, directions, directions, feeds, np.zeros(count, dtype=bool), limits)
+
+        # Reference: straight junctions are limited by the slower neighbour only
+        speed = feeds / 60.0
+        limit = np.concatenate(([0.0], np.minimum(speed[:-1], speed[1:]), [0.0]))
+        accel = limits.max_accelerations[0]
+        for k in range(count - 1, -1, -1):
+            limit[k] = min(limit[k], np.sqrt(limit[k + 1] ** 2 + 2 * accel * lengths[k]))
+        for k in range(count):
+            limit[k + 1] = min(limit[k + 1], np.sqrt(limit[k] ** 2 + 2 * accel * lengths[k]))
+        self.assertTrue(np.allclose(limit[:-1], profile.entry_speeds))
+        self.assertTrue(np.allclose(limit[1:], profile.exit_speeds))
+
+    def test_helix_geometry(self):
+        """Arc lengths include the helix pitch and tangents follow the arc."""
+        lengths, entry, exit_, _, curvature = segment_geometry(
+            np.array([[10.0, 0.0, 0.0]]), np.array([[-10.0, 0.0, -5.0]]),
+            np.array([True]), np.array([10.0]), np.array([0.0]), np.array([np.pi]))
+
+        self.assertAlmostEqual(lengths[0], np.hypot(10 * np.pi, 5))
+        self.assertGreater(entry[0, 1], 0)  # Counter-clockwise from +X starts towards +Y
+        self.assertLess(exit_[0, 1], 0)
+        self.assertEqual(curvature[0], 10.0)
+
+    def test_program_estimate(self):
+        """Estimates exceed the ideal feed time and count tool changes."""
+        commands = [
+            GCodeCommand("G00", 0, 0, 5, tool=1),
+            GCodeCommand("G01", 0, 0, -1, f=600, tool=1),
+            GCodeCommand("G01", 50, 0, -1, tool=1),
+            GCodeCommand("G02", 60, 10, -1, 0, 10, tool=1),
+            GCodeCommand("G00", 0, 0, 5, tool=2),
+            GCodeCommand("G01", 0, 20, 5, tool=2),
+        ]
+        limits = MachineLimits(tool_change_time=10.0)
+        calculator = PathCalculator(resolution=0.1)
+        profile = calculator.estimate_cycle_time(commands, limits)
+
+        self.assertEqual(profile.tool_changes, 1)
+        feed_length = 6 + 50 + 10 * np.pi / 2 + 20
+        self.assertGreater(profile.feed_time, feed_length / 10.0)
+        self.assertAlmostEqual(profile.total_time, profile.rapid_time + profile.feed_time + 10.0)
+        self.assertEqual(profile.entry_speeds[4], 0.0)  # Stop at the tool change
+        self.assertAlmostEqual(calculator.estimate_cycle_time(iter(commands), limits).total_time,
+                               profile.total_time)
+
+    def test_limits_from_dict(self):
+        """Unknown keys are ignored and missing keys keep their defaults."""
+        limits = MachineLimits.from_dict({'max_jerk': None, 'rapid_rates': [1, 2, 3], 'name': 'mill'})
+        self.assertIsNone(limits.max_jerk)
+        self.assertEqual(limits.rapid_rates.tolist(), [1, 2, 3])
+        self.assertEqual(MachineLimits.from_dict(limits.to_dict()).to_dict(), limits.to_dict())
+
+    def test_program_without_tool_call(self):
+        """A program that never calls a tool has no tool changes and no tool change time."""
+        sample = os.path.join(os.path.dirname(__file__), '..', 'examples', 'sample.nc')
+        limits = MachineLimits(tool_change_time=10.0)
+        profile = PathCalculator(resolution=0.5).estimate_cycle_time(GCodeParser().parse_file(sample), limits)
+
+        self.assertEqual(profile.tool_changes, 0)
+        self.assertAlmostEqual(profile.total_time, profile.rapid_time + profile.feed_time)
+
+    def test_tool_changes_between_known_tools(self):
+        """Moves without a tool do not make the first tool load a change, unless a change is carried in."""
+        commands = [
+            GCodeCommand("G00", 0, 0, 50),
+            GCodeCommand("G00", 0, 0, 5, tool=1),
+            GCodeCommand("G01", 20, 0, 5, f=600, tool=1),
+            GCodeCommand("G00", 0, 0, 5, tool=2),
+        ]
+        table = CommandTable.from_commands(commands)
+        plan = plan_segments(table, 0.1)
+        limits = MachineLimits(tool_change_time=10.0)
+
+        profile = plan_cycle_time(table, plan, limits)
+        self.assertEqual(profile.tool_changes, 1)
+        self.assertAlmostEqual(profile.total_time, profile.rapid_time + profile.feed_time + 10.0)
+
+        continued = plan_cycle_time(table, plan, limits, tool_change_at_start=True)
+        self.assertEqual(continued.tool_changes, 2)
+        self.assertAlmostEqual(continued.total_time, profile.total_time + 10.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
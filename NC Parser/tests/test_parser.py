@@ -2,11 +2,12 @@ import unittest
 import numpy as np
 import sys
 import os
+import tempfile
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from src.gcode_parser import GCodeParser, GCodeCommand
+from src.gcode_parser import GCodeParser, GCodeCommand, tokenize_line
 
 
 class TestGCodeParser(unittest.TestCase):
@@ -85,6 +86,51 @@ class TestGCodeParser(unittest.TestCase):
         self.assertEqual(bbox['y'], (-10, 20))
         self.assertEqual(bbox['z'], (-2, 8))
 
+    
+    def test_tokenize_line(self):
+        """Test single-pass tokenizer keeps the first command and first value per word."""
+        command, words = tokenize_line("N10 G01X-.5 Y+2. G02 X7 F100")
+        
+        self.assertEqual(command, "G01")
+        self.assertEqual(words['X'], -0.5)
+        self.assertEqual(words['Y'], 2.0)
+        self.assertEqual(words['F'], 100.0)
+    
+    def test_parse_heidenhain_line(self):
+        """Test Heidenhain linear move parsing through the tokenizer."""
+        command = self.parser.parse_heidenhain_line("L X+15.9092 Y-70.2758 R0 FMAX M91")
+        
+        self.assertEqual(command.command, "L_RAPID")
+        self.assertEqual(command.x, 15.9092)
+        self.assertEqual(command.y, -70.2758)
+        self.assertIsNone(command.z)
+        self.assertIsNone(command.f)
+    
+    def test_iter_commands_matches_parse_file(self):
+        """Test streaming parse yields the same commands as parse_file."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "stream.nc")
+            with open(file_path, 'w') as f:
+                f.write("G00 X0 Y0 Z5\n; comment\nG01 Z-1 F100\nG01 X10\nG02 X20 Y0 I5 J0\nM30\n")
+            
+            streamed = list(self.parser.iter_commands(file_path))
+            self.assertEqual(len(self.parser.commands), 0)
+            
+            parsed = self.parser.parse_file(file_path)
+            self.assertEqual([c.command for c in streamed], [c.command for c in parsed])
+            self.assertEqual([c.x for c in streamed], [c.x for c in parsed])
+    
+    def test_iter_commands_chunks(self):
+        """Test chunked streaming parse."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "chunks.nc")
+            with open(file_path, 'w') as f:
+                f.write("".join(f"G01 X{k} Y0\n" for k in range(7)))
+            
+            chunks = list(self.parser.iter_commands(file_path, chunk_size=3))
+            self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+            self.assertEqual(chunks[2][0].x, 6.0)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.path_lod import PathLOD, douglas_peucker_significance, prethin
+from src.visualizer import Visualizer
+
+
+def douglas_peucker(points, tolerance):
+    """Reference recursive Douglas-Peucker (first farthest point on ties)."""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        lo, hi = stack.pop()
+        if hi - lo < 2:
+            continue
+        chord = points[hi] - points[lo]
+        offsets = points[lo + 1:hi] - points[lo]
+        distances = np.linalg.norm(np.cross(offsets, chord), axis=1) / np.linalg.norm(chord)
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = lo + 1 + farthest
+            keep[split] = True
+            stack += [(lo, split), (split, hi)]
+    return keep
+
+
+def max_deviation(points, indices):
+    """Largest distance of any path point from the simplified polyline through `indices`."""
+    segment = np.clip(np.searchsorted(indices, np.arange(len(points)), side='right') - 1, 0, len(indices) - 2)
+    starts, ends = points[indices[segment]], points[indices[segment + 1]]
+    chords = ends - starts
+    t = np.clip(np.einsum('ij,ij->i', points - starts, chords) / np.einsum('ij,ij->i', chords, chords), 0, 1)
+    return np.linalg.norm(points - starts - t[:, None] * chords, axis=1).max()
+
+
+class TestPathLOD(unittest.TestCase):
+    """Test cases for tool path level-of-detail decimation."""
+
+    def setUp(self):
+        # Zig-zag passes joined by dense half circles, stepping down in Z
+        passes = []
+        for layer, z in enumerate((-1.0, -2.0)):
+            for block in range(20):
+                x = 5.0 * block
+                y0, y1 = (0.0, 50.0) if block % 2 == 0 else (50.0, 0.0)
+                line = np.column_stack([np.full(500, x), np.linspace(y0, y1, 500), np.full(500, z)])
+                angle = np.linspace(np.pi, 0, 200) if block % 2 == 0 else np.linspace(-np.pi, 0, 200)
+                arc = np.column_stack([x + 2.5 + 2.5 * np.cos(angle), y1 + 2.5 * np.sin(angle), np.full(200, z)])
+                passes += [line, arc[1:]]
+        self.path = np.vstack(passes)
+
+    def test_significance_matches_douglas_peucker(self):
+        """Without split slack, thresholding the significance equals classic Douglas-Peucker."""
+        rng = np.random.default_rng(11)
+        for _ in range(5):
+            points = np.cumsum(rng.normal(size=(300, 3)), axis=0)
+            significance = douglas_peucker_significance(points, slack=0.0)
+            for tolerance in (0.2, 1.0, 4.0):
+                self.assertTrue(np.array_equal(significance > tolerance, douglas_peucker(points, tolerance)))
+
+    def test_levels_bound_deviation(self):
+        """Every level stays within its tolerance plus the pre-thinning budget."""
+        lod = PathLOD(self.path)
+        counts = [len(level) for level in lod.levels]
+        self.assertEqual(counts[0], len(self.path))
+        self.assertEqual(counts, sorted(counts, reverse=True))
+        for level, tolerance in enumerate(lod.tolerances, start=1):
+            self.assertLessEqual(max_deviation(self.path, lod.levels[level]), tolerance + lod.tolerances[0] / 2)
+
+    def test_z_transitions_are_kept(self):
+        """Points on both sides of a step-down survive at every level."""
+        lod = PathLOD(self.path, z_step=0.5)
+        step = np.flatnonzero(np.diff(self.path[:, 2]) != 0)[0]
+        for level in lod.levels:
+            self.assertIn(step, level)
+            self.assertIn(step + 1, level)
+
+    def test_prethin_keeps_fixed_points(self):
+        """Pre-thinning drops collinear points but never fixed ones."""
+        line = np.column_stack([np.linspace(0, 10, 101), np.zeros(101), np.zeros(101)])
+        fixed = np.zeros(101, dtype=bool)
+        fixed[[0, 37, 100]] = True
+        kept = prethin(line, np.arange(101), fixed, budget=1e-6)
+        self.assertTrue(set([0, 37, 100]) <= set(kept.tolist()))
+        self.assertLess(len(kept), 20)
+
+    def test_select_respects_budget(self):
+        """The visualizer draws at most its point budget, keeping the path ends."""
+        visualizer = Visualizer(backend='plotly', point_budget=500)
+        shown = visualizer._level_of_detail(self.path, 'plotly')
+        self.assertLessEqual(len(shown), 500)
+        self.assertTrue(np.array_equal(shown[0], self.path[0]))
+        self.assertTrue(np.array_equal(shown[-1], self.path[-1]))
+        self.assertEqual(len(visualizer.path_lod.select(10)), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
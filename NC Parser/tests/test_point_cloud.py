@@ -0,0 +1,58 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.point_cloud import PointCloudGenerator, axis_samples, shell_points
+
+
+class TestWorkpiecePoints(unittest.TestCase):
+    """Test cases for lattice workpiece generation."""
+
+    def setUp(self):
+        self.generator = PointCloudGenerator()
+        self.bounds = ((0.0, 10.0), (-5.0, 5.0), (-4.0, 0.0))
+
+    def test_small_stock_is_full_lattice(self):
+        """Stock within the budget is every lattice point exactly once."""
+        points = self.generator.create_workpiece_points(self.bounds, resolution=1.0)
+
+        self.assertEqual(points.shape, (11 * 11 * 5, 3))
+        self.assertEqual(len(np.unique(points, axis=0)), len(points))
+        self.assertTrue(np.allclose(points.min(axis=0), [0, -5, -4]))
+        self.assertTrue(np.allclose(points.max(axis=0), [10, 5, 0]))
+        self.assertTrue(np.allclose(axis_samples(0.0, 1.0, 0.3), [0, 0.25, 0.5, 0.75, 1.0]))
+
+    def test_shell_matches_lattice_boundary(self):
+        """The shell is exactly the lattice points within `layers` steps of a face."""
+        xs, ys, zs = np.arange(9.0), np.arange(7.0), np.arange(6.0)
+        full = np.stack(np.meshgrid(xs, ys, zs, indexing='ij'), axis=-1).reshape(-1, 3)
+        for layers in (1, 2):
+            distance = np.minimum(full, [8, 6, 5] - full).min(axis=1)
+            expected = full[distance < layers]
+            shell = shell_points(xs, ys, zs, layers)
+            self.assertEqual(len(shell), len(expected))
+            self.assertEqual(len(np.unique(shell, axis=0)), len(shell))
+            self.assertTrue(np.array_equal(np.unique(shell, axis=0), np.unique(expected, axis=0)))
+
+    def test_large_stock_keeps_surface_and_thins_interior(self):
+        """Over the budget, faces stay at full resolution and the interior is coarser."""
+        bounds = ((0.0, 100.0), (0.0, 100.0), (-20.0, 0.0))
+        points = self.generator.create_workpiece_points(bounds, resolution=0.5, max_points=500_000)
+        surface = self.generator.create_workpiece_points(bounds, resolution=0.5, surface_only=True)
+
+        self.assertLessEqual(len(points), 500_000)
+        self.assertGreater(len(points), len(surface))
+        top = points[points[:, 2] == 0.0]
+        self.assertEqual(len(top), 201 * 201)
+        self.assertEqual(len(np.unique(points, axis=0)), len(points))
+
+        detailed = self.generator.create_detailed_workpiece_points(bounds, resolution=0.5, surface_only=True)
+        self.assertEqual(len(detailed[detailed[:, 2] == -19.0]), 201 * 201)  # Third layer from the bottom
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+import tempfile
+import shutil
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.point_io import write_ply, read_ply, save_points, load_points, load_point_archive
+
+
+class TestPointIO(unittest.TestCase):
+    """Test cases for point cloud export and reload."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.points = np.random.default_rng(3).uniform(-50, 50, (1000, 3))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_binary_ply_round_trip(self):
+        """Binary PLY stores float32 little-endian vertices, also through a memmap."""
+        for use_memmap in (False, True):
+            path = self._path(f"part_{use_memmap}.ply")
+            write_ply(self.points, path, use_memmap=use_memmap)
+
+            with open(path, 'rb') as f:
+                self.assertIn(b"format binary_little_endian 1.0", f.read(100))
+            self.assertTrue(np.array_equal(read_ply(path), self.points.astype(np.float32)))
+            self.assertTrue(np.array_equal(read_ply(path, mmap=True), self.points.astype(np.float32)))
+
+    def test_ascii_ply_round_trip(self):
+        """ASCII PLY keeps six decimals."""
+        path = self._path("part.ply")
+        write_ply(self.points, path, binary=False)
+        self.assertTrue(np.allclose(load_points(path), self.points, atol=1e-6))
+
+    def test_extra_vertex_properties(self):
+        """Vertices with colour properties still load their coordinates."""
+        path = self._path("colour.ply")
+        vertices = np.zeros(3, dtype=[('x', '<f8'), ('y', '<f8'), ('z', '<f8'), ('red', 'u1')])
+        vertices['x'], vertices['y'], vertices['z'] = [1, 2, 3], [4, 5, 6], [7, 8, 9]
+        header = ("ply\nformat binary_little_endian 1.0\ncomment test\nelement vertex 3\n"
+                  "property double x\nproperty double y\nproperty double z\nproperty uchar red\nend_header\n")
+        with open(path, 'wb') as f:
+            f.write(header.encode('ascii'))
+            vertices.tofile(f)
+
+        self.assertTrue(np.array_equal(read_ply(path), [[1, 4, 7], [2, 5, 8], [3, 6, 9]]))
+
+    def test_numpy_formats(self):
+        """.npy keeps full precision (optionally memory-mapped) and .npz carries extra arrays."""
+        save_points(self.points, self._path("part.npy"), use_memmap=True)
+        self.assertTrue(np.array_equal(load_points(self._path("part.npy"), mmap=True), self.points))
+
+        save_points(self.points, self._path("part.npz"), heights=self.points[:, 2])
+        self.assertTrue(np.array_equal(load_points(self._path("part.npz")), self.points))
+        self.assertEqual(sorted(load_point_archive(self._path("part.npz"))), ['heights', 'points'])
+
+    def test_unsupported_extension(self):
+        """Unknown extensions are rejected."""
+        with self.assertRaises(ValueError):
+            save_points(self.points, self._path("part.xyz"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import tempfile
+import shutil
+import json
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.profiling import ProfileReport
+
+
+class TestProfileReport(unittest.TestCase):
+    """Test cases for the stage profiler."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_nested_stages_and_counters(self):
+        """Stages nest, keep their counters and record failures."""
+        report = ProfileReport('program.nc')
+        with report.stage('parse', bytes=100) as stage:
+            stage.count(commands=5)
+            with report.stage('tokenize'):
+                pass
+        with self.assertRaises(ValueError):
+            with report.stage('path'):
+                raise ValueError("no points")
+
+        parse, tokenize, path = report.stages
+        self.assertEqual(parse.counters, {'bytes': 100, 'commands': 5})
+        self.assertEqual((parse.depth, tokenize.depth), (0, 1))
+        self.assertLessEqual(tokenize.seconds, parse.seconds)
+        self.assertEqual(path.error, "ValueError: no points")
+        self.assertAlmostEqual(report.total_seconds, parse.seconds + path.seconds)
+        self.assertIn('failed: ValueError: no points', report.summary())
+
+    def test_memory_and_chrome_trace(self):
+        """Traced stages report allocations; the trace holds one complete event per stage."""
+        report = ProfileReport('program.nc', trace_memory=True)
+        with report.stage('outer'):
+            with report.stage('allocate'):
+                block = bytearray(4_000_000)
+            del block
+
+        outer, allocate = report.stages
+        self.assertGreaterEqual(allocate.peak_bytes, 4_000_000)
+        self.assertGreaterEqual(allocate.net_bytes, 4_000_000)
+        self.assertGreaterEqual(outer.peak_bytes, allocate.peak_bytes)
+        self.assertLess(outer.net_bytes, 1_000_000)
+
+        path = os.path.join(self.directory, 'trace.json')
+        report.write_chrome_trace(path)
+        with open(path) as f:
+            events = [event for event in json.load(f)['traceEvents'] if event['ph'] == 'X']
+        self.assertEqual([event['name'] for event in events], ['outer', 'allocate'])
+        self.assertGreaterEqual(events[1]['ts'], events[0]['ts'])
+        self.assertLessEqual(events[1]['ts'] + events[1]['dur'], events[0]['ts'] + events[0]['dur'])
+        self.assertGreaterEqual(events[1]['args']['peak_bytes'], 4_000_000)
+
+
+if __name__ == '__main__':
+    unittest.main()
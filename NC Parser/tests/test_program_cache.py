@@ -0,0 +1,95 @@
+import unittest
+import numpy as np
+import tempfile
+import shutil
+import time
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.gcode_parser import GCodeParser
+from src.path_calculator import PathCalculator
+from src.program_cache import ProgramCache
+
+
+HEIDENHAIN_PROGRAM = """BEGIN PGM CACHE MM
+BLK FORM 0.1 Z X+0 Y+0 Z-10
+BLK FORM 0.2 X+40 Y+30 Z+0
+* - BUL_08.00_P15-120_L19O25_1.00AL3 T4
+TOOL CALL 4 Z S9000
+L X+5 Y+5 Z+2 FMAX
+L Z-1 F300
+CC X+20 Y+5
+C X+35 Y+5 DR-
+END PGM CACHE MM
+"""
+
+
+class TestProgramCache(unittest.TestCase):
+    """Test cases for the on-disk program cache."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.nc_file = os.path.join(self.directory, 'program.h')
+        with open(self.nc_file, 'w') as f:
+            f.write(HEIDENHAIN_PROGRAM)
+        self.cache = ProgramCache(os.path.join(self.directory, 'cache'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _parse_and_store(self, resolution=0.1):
+        parser = GCodeParser()
+        table = parser.parse_file(self.nc_file)
+        path_points = PathCalculator(resolution).calculate_tool_path(table)
+        self.cache.store(self.nc_file, resolution, parser, path_points)
+        return parser, path_points
+
+    def test_hit_restores_program(self):
+        """A cache hit restores commands, tools, stock and tool path."""
+        parser, path_points = self._parse_and_store()
+
+        restored = GCodeParser()
+        cached_points = self.cache.load(self.nc_file, 0.1, restored)
+
+        self.assertTrue(np.array_equal(cached_points, path_points))
+        self.assertTrue(np.array_equal(restored.commands.values, parser.commands.values, equal_nan=True))
+        self.assertEqual([c.command for c in restored.commands], [c.command for c in parser.commands])
+        self.assertEqual(restored.commands[-1].direction, parser.commands[-1].direction)
+        self.assertEqual(restored.get_stock_bounds(), parser.get_stock_bounds())
+        self.assertEqual(restored.get_tools()[4].corner_radius, 1.0)
+        self.assertEqual(restored.get_statistics(), parser.get_statistics())
+
+    def test_key_depends_on_content_and_resolution(self):
+        """Other resolutions and edited files miss the cache."""
+        self._parse_and_store()
+
+        self.assertIsNone(self.cache.load(self.nc_file, 0.2, GCodeParser()))
+        with open(self.nc_file, 'a') as f:
+            f.write("L X+0 Y+0 FMAX\n")
+        self.assertIsNone(self.cache.load(self.nc_file, 0.1, GCodeParser()))
+
+    def test_lru_eviction(self):
+        """Least recently used entries are evicted once the size limit is exceeded."""
+        self._parse_and_store(0.1)
+        self._parse_and_store(0.2)
+        entry_size = max(os.path.getsize(os.path.join(self.cache.directory, name))
+                         for name in os.listdir(self.cache.directory))
+
+        # Make the 0.1 entry the most recently used one
+        old = time.time() - 100
+        os.utime(os.path.join(self.cache.directory, self.cache.key(self.nc_file, 0.2) + '.npz'), (old, old))
+        self.assertIsNotNone(self.cache.load(self.nc_file, 0.1, GCodeParser()))
+
+        self.cache.max_bytes = entry_size * 2
+        self._parse_and_store(0.5)
+
+        self.assertIsNone(self.cache.load(self.nc_file, 0.2, GCodeParser()))
+        self.assertIsNotNone(self.cache.load(self.nc_file, 0.1, GCodeParser()))
+        self.assertIsNotNone(self.cache.load(self.nc_file, 0.5, GCodeParser()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.spatial_index import UniformGridIndex, points_within_radius
+from src.point_cloud import PointCloudGenerator
+
+
+def brute_force_within(points, centers, radius):
+    """Reference: test every point against every center."""
+    return np.array([np.any(np.linalg.norm(centers - point, axis=1) <= radius) for point in points])
+
+
+class TestSpatialIndex(unittest.TestCase):
+    """Test cases for grid-indexed radius queries and material removal."""
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.points = rng.uniform(-20, 20, (2000, 3))
+        self.centers = rng.uniform(-20, 20, (300, 3))
+
+    def test_matches_brute_force(self):
+        """Radius queries agree with the all-pairs test."""
+        for radius in (0.5, 2.0, 4.0):
+            expected = brute_force_within(self.points, self.centers, radius)
+            mask = points_within_radius(self.points, self.centers, radius)
+            self.assertTrue(np.array_equal(mask, expected))
+
+    def test_small_pair_batches(self):
+        """Limiting the candidate pairs per batch does not change the result."""
+        index = UniformGridIndex(self.centers, 3.0)
+        expected = index.any_within(self.points, 3.0)
+        self.assertTrue(np.array_equal(index.any_within(self.points, 3.0, max_pairs=5), expected))
+
+    def test_points_on_radius_are_removed(self):
+        """Grid points exactly one radius away count as inside, like the old check."""
+        grid = np.stack(np.meshgrid(*[np.arange(0.0, 8.0)] * 3, indexing='ij'), axis=-1).reshape(-1, 3)
+        centers = grid[::11]
+        mask = points_within_radius(grid, centers, 1.0)
+        self.assertTrue(np.array_equal(mask, brute_force_within(grid, centers, 1.0)))
+
+    def test_removal_uses_all_points(self):
+        """Full-size stock is simulated without sampling and layers agree with the flat query."""
+        generator = PointCloudGenerator()
+        workpiece = np.stack(np.meshgrid(np.arange(0.0, 30.0), np.arange(0.0, 30.0), np.arange(0.0, 10.0),
+                                         indexing='ij'), axis=-1).reshape(-1, 3)
+        tool_path = np.column_stack([np.linspace(0, 29, 3000), np.full(3000, 15.0), np.full(3000, 9.0)])
+
+        remaining = generator.simulate_removal_simple(workpiece, tool_path, 3.0)
+        expected = workpiece[~brute_force_within(workpiece, tool_path, 3.0)]
+
+        self.assertGreater(len(workpiece), 8000)
+        self.assertTrue(np.array_equal(remaining, expected))
+        self.assertTrue(np.array_equal(generator.simulate_advanced_removal(workpiece, tool_path, 3.0), remaining))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import numpy as np
+import tempfile
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.gcode_parser import GCodeParser, GCodeCommand, ToolInfo
+from src.stock_model import DexelStock, cutter_profile
+
+
+HEIDENHAIN_PROGRAM = """BEGIN PGM STOCK MM
+BLK FORM 0.1 Z X+0 Y+0 Z-20
+BLK FORM 0.2 X+60 Y+40 Z+0
+* - SEM_06.00_P15-120_L19O25_0.00AL3 T1
+* - BAL_04.00_P15-120_L19O25_2.00AL2 T2
+TOOL CALL 1 Z S8000
+L X+10 Y+20 Z+5 FMAX
+L Z-2 F300
+L X+50 F1000
+TOOL CALL 2 Z S12000
+L Z+5 FMAX
+L X+10 Y+10 FMAX
+L Z-1 F300
+L X+50 F1000
+END PGM STOCK MM
+"""
+
+
+class TestStockModel(unittest.TestCase):
+    """Test cases for the dexel stock model."""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.h')
+        with os.fdopen(handle, 'w') as f:
+            f.write(HEIDENHAIN_PROGRAM)
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_blk_form_and_tool_column(self):
+        """BLK FORM corners give the stock bounds and every command records its tool."""
+        parser = GCodeParser()
+        table = parser.parse_file(self.path)
+
+        self.assertEqual(parser.get_stock_bounds(), ((0.0, 60.0), (0.0, 40.0), (-20.0, 0.0)))
+        self.assertEqual(table.tools.tolist(), [1, 1, 1, 2, 2, 2, 2])
+        self.assertEqual(table[-1].tool, 2)
+
+    def test_flat_slot_volume(self):
+        """A straight flat end mill slot removes its rectangle plus two half discs."""
+        stock = DexelStock(((0, 100), (0, 50), (-10, 0)), resolution=0.1)
+        path = np.column_stack([np.linspace(20, 70, 5001), np.full(5001, 25.0), np.full(5001, -2.0)])
+
+        removed = stock.carve(path, 3.0, tool_number=1)
+
+        expected = 6 * 2 * 50 + np.pi * 9 * 2
+        self.assertAlmostEqual(removed, expected, delta=0.01 * expected)
+        self.assertAlmostEqual(stock.removed_volume_by_tool[1], removed)
+        self.assertAlmostEqual(stock.volume() + removed, 100 * 50 * 10, places=6)
+
+    def test_cutter_profiles(self):
+        """Ball, bull nose and drill tips rise above the tool tip away from the axis."""
+        distances = np.array([0.0, 2.0, 3.0])
+        self.assertTrue(np.allclose(cutter_profile(distances, 3.0, 'SEM'), 0.0))
+        self.assertTrue(np.allclose(cutter_profile(distances, 3.0, 'BAL'), [0.0, 3 - np.sqrt(5), 3.0]))
+        self.assertTrue(np.allclose(cutter_profile(distances, 3.0, 'BUL', 1.0), [0.0, 0.0, 1.0]))
+        self.assertAlmostEqual(cutter_profile(np.array([1.0]), 3.0, 'CHM')[0], 1.0)
+
+    def test_streamed_chunks_match_whole_program(self):
+        """Carving chunk by chunk gives the same stock and per-tool volumes."""
+        parser = GCodeParser()
+        table = parser.parse_file(self.path)
+        whole = DexelStock(parser.get_stock_bounds(), resolution=0.25)
+        whole.carve_commands(table, parser.get_tools())
+
+        stream_parser = GCodeParser()
+        streamed = DexelStock(parser.get_stock_bounds(), resolution=0.25)
+        streamed.simulate(stream_parser.iter_commands(self.path, chunk_size=2), stream_parser.get_tools())
+
+        self.assertTrue(np.array_equal(whole.top, streamed.top))
+        self.assertEqual(set(whole.removed_volume_by_tool), {1, 2})
+        for tool, volume in whole.removed_volume_by_tool.items():
+            self.assertAlmostEqual(streamed.removed_volume_by_tool[tool], volume)
+        self.assertGreater(whole.removed_volume_by_tool[2], 0.0)
+
+    def test_default_diameter_without_tool_info(self):
+        """Commands without tool data are cut with the default diameter."""
+        stock = DexelStock(((0, 20), (0, 20), (-5, 0)), resolution=0.5)
+        stock.carve_commands([GCodeCommand("G00", 10, 10, 5), GCodeCommand("G01", 10, 10, -1)],
+                             default_diameter=4.0)
+
+        self.assertAlmostEqual(stock.top.min(), -1.0)
+        self.assertEqual(list(stock.removed_volume_by_tool), [None])
+
+
+if __name__ == '__main__':
+    unittest.main()
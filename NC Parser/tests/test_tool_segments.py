@@ -0,0 +1,146 @@
+import unittest
+import numpy as np
+import tempfile
+import shutil
+import sys
+import os
+from unittest import mock
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.gcode_parser import GCodeParser
+from src import path_calculator
+from src.path_calculator import PathCalculator
+from src.motion_planner import MachineLimits, MotionProfile
+
+
+MULTI_TOOL_PROGRAM = """BEGIN PGM TOOLS MM
+* - SEM_06.00_P15-120_L19O25_0.00AL3 T1
+* - BAL_04.00_P15-120_L19O25_2.00AL2 T2
+TOOL CALL 1 Z S9000
+L X+0 Y+0 Z+5 FMAX
+L Z-1 F300
+L X+40
+CC X+40 Y+10
+C X+40 Y+20 DR+
+L Z+5 FMAX
+TOOL CALL 2 Z S9000
+L X+10 Y+10 FMAX
+L Z-2 F500
+L X+30 Y+15
+TOOL CALL 1 Z
+L X+0 Y+0 Z+5 FMAX
+L Z-0.5
+L X+20
+END PGM TOOLS MM
+"""
+
+
+class TestToolSegments(unittest.TestCase):
+    """Test cases for per-tool program segmentation and simulation."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        path = os.path.join(self.directory, 'tools.h')
+        with open(path, 'w') as f:
+            f.write(MULTI_TOOL_PROGRAM)
+        self.parser = GCodeParser()
+        self.table = self.parser.parse_file(path)
+        self.calculator = PathCalculator(resolution=0.1)
+        self.limits = MachineLimits(tool_change_time=5.0)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_segments_split_at_tool_changes(self):
+        """Every tool call starts a segment carrying its tool's geometry."""
+        segments = self.parser.get_tool_segments()
+
+        self.assertEqual([(s.tool_number, s.start, s.stop) for s in segments], [(1, 0, 5), (2, 5, 8), (1, 8, 11)])
+        self.assertEqual([s.diameter(10.0) for s in segments], [6.0, 4.0, 6.0])
+        self.assertEqual(segments[1].tool_info.cutter_type, 'BAL')
+
+    def test_preamble_has_unknown_tool(self):
+        """Moves before the first tool call form an unknown-tool segment, not a T1 segment."""
+        path = os.path.join(self.directory, 'preamble.h')
+        lines = MULTI_TOOL_PROGRAM.splitlines()
+        lines[3:3] = ["L Z+100 R0 FMAX", "L X+0 Y+0 FMAX"] + [f"L X+{n % 9} Y+{n % 4} FMAX" for n in range(30)]
+        with open(path, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+
+        sequential = GCodeParser()
+        table = sequential.parse_file(path)
+        segments = sequential.get_tool_segments()
+        self.assertEqual([(s.tool_number, s.start, s.stop) for s in segments],
+                         [(None, 0, 32), (1, 32, 37), (2, 37, 40), (1, 40, 43)])
+        self.assertIsNone(segments[0].tool_info)
+        self.assertEqual(segments[0].diameter(10.0), 10.0)
+        self.assertIsNone(table[0].tool)
+
+        parallel = GCodeParser()
+        np.testing.assert_array_equal(parallel.parse_file_parallel(path, 3).tools, table.tools)
+        self.assertEqual([(s.tool_number, s.start, s.stop) for s in parallel.get_tool_segments()],
+                         [(s.tool_number, s.start, s.stop) for s in segments])
+
+        # Only the changes between known tools take time, in the segments as in the whole program
+        results = self.calculator.simulate_tool_segments(table, segments, limits=self.limits)
+        whole = self.calculator.estimate_cycle_time(table, self.limits)
+        self.assertEqual([result.profile.tool_changes for result in results], [0, 0, 1, 1])
+        self.assertEqual(whole.tool_changes, 2)
+        self.assertAlmostEqual(sum(result.profile.total_time for result in results), whole.total_time)
+
+    def test_segments_reproduce_whole_program(self):
+        """Separately simulated segments join into the whole program's time and path."""
+        results = self.calculator.simulate_tool_segments(self.table, self.parser.get_tool_segments(),
+                                                         limits=self.limits)
+        whole = self.calculator.estimate_cycle_time(self.table, self.limits)
+        joined = MotionProfile.concatenate([result.profile for result in results])
+
+        self.assertTrue(np.allclose(joined.times, whole.times))
+        self.assertAlmostEqual(joined.total_time, whole.total_time)
+        self.assertEqual(joined.tool_changes, 2)
+        self.assertEqual(sum(result.path_points for result in results),
+                         len(self.calculator.calculate_tool_path(self.table)))
+
+        # The third segment starts where the second ended
+        self.assertAlmostEqual(results[2].profile.lengths[0], np.linalg.norm([30, 15, 7]))
+        self.assertEqual([(result.diameter, result.cutter_type) for result in results],
+                         [(6.0, 'SEM'), (4.0, 'BAL'), (6.0, 'SEM')])
+        self.assertAlmostEqual(results[1].removal_points[:, 1].min(), 8.0)  # T2 footprint reaches 2mm below Y10
+
+    def test_segments_slice_the_program_path(self):
+        """Segments reuse slices of the program's dense path instead of interpolating their own."""
+        path = self.calculator.calculate_tool_path(self.table)
+        segments = self.parser.get_tool_segments()
+        expected = self.calculator.simulate_tool_segments(self.table, segments, limits=self.limits)
+
+        with mock.patch.object(path_calculator, 'plan_segments', wraps=path_calculator.plan_segments) as planned, \
+                mock.patch.object(path_calculator, 'interpolate_plan') as interpolated:
+            results = self.calculator.simulate_tool_segments(self.table, segments, limits=self.limits,
+                                                             path_points=path)
+        self.assertEqual(planned.call_count, 1)
+        interpolated.assert_not_called()
+
+        self.assertEqual(sum(result.path_points for result in results), len(path))
+        for result, reference in zip(results, expected):
+            self.assertTrue(np.array_equal(result.removal_points, reference.removal_points))
+            self.assertTrue(np.array_equal(result.profile.times, reference.profile.times))
+        with self.assertRaises(ValueError):
+            self.calculator.simulate_tool_segments(self.table, segments, path_points=path[:-1])
+
+    def test_parallel_matches_sequential(self):
+        """Worker processes give the same results as the sequential loop."""
+        segments = self.parser.get_tool_segments()
+        sequential = self.calculator.simulate_tool_segments(self.table, segments, limits=self.limits)
+        self.calculator.num_threads = 2
+        self.calculator.tool_parallel_threshold = 0
+        parallel = self.calculator.simulate_tool_segments(self.table, segments, limits=self.limits)
+
+        for a, b in zip(sequential, parallel):
+            self.assertTrue(np.array_equal(a.removal_points, b.removal_points))
+            self.assertTrue(np.array_equal(a.profile.times, b.profile.times))
+
+
+if __name__ == '__main__':
+    unittest.main()